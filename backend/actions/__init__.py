@@ -0,0 +1 @@
+# Actions package initialization
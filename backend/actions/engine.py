@@ -0,0 +1,381 @@
+from typing import Dict, Any, Optional, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import asyncio
+import functools
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import threading
+
+# Maximum concurrent executions per action type
+DEFAULT_CONCURRENCY = {
+    "email": 4,
+    "calendar": 4,
+    "slack": 8,
+    "task": 8,
+    "custom": 4,
+}
+
+# Per-action timeouts in seconds
+DEFAULT_TIMEOUTS = {
+    "email": 30.0,
+    "calendar": 30.0,
+    "slack": 15.0,
+    "task": 15.0,
+    "custom": 60.0,
+}
+
+# Idempotency record states
+KEY_STARTED = "started"
+KEY_COMPLETED = "completed"
+KEY_UNKNOWN = "unknown"
+
+
+class ActionTimeoutError(Exception):
+    """The action did not finish within its timeout; it may or may not have taken effect."""
+
+
+class ActionOutcomeUnknownError(Exception):
+    """An earlier execution with the same idempotency key never reported back."""
+
+
+class IdempotencyKeyReusedError(Exception):
+    """An idempotency key was sent again with different parameters."""
+
+
+def parameters_fingerprint(parameters: Dict[str, Any]) -> str:
+    """Stable hash of action parameters, stored with a claimed key to detect reuse."""
+    encoded = json.dumps(parameters, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+class IdempotencyStore:
+    """
+    Durable record of executions by idempotency key.
+
+    A key is claimed before the handler runs and marked completed with its
+    result afterwards, so a retried approval or a redelivered job returns the
+    stored result instead of executing the action again. The parameters'
+    fingerprint is stored with the key, so a key reused for different
+    parameters is rejected instead of returning another execution's result.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS action_executions ("
+            " key TEXT PRIMARY KEY, status TEXT NOT NULL, result TEXT,"
+            " created_at TEXT NOT NULL, updated_at TEXT NOT NULL, fingerprint TEXT)"
+        )
+        columns = [row[1] for row in self._connection().execute("PRAGMA table_info(action_executions)")]
+        if "fingerprint" not in columns:
+            self._connection().execute("ALTER TABLE action_executions ADD COLUMN fingerprint TEXT")
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute(
+            "SELECT status, result, fingerprint FROM action_executions WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {"status": row[0], "result": json.loads(row[1]) if row[1] else None, "fingerprint": row[2]}
+
+    def claim(self, key: str, fingerprint: Optional[str] = None) -> bool:
+        """Claim a key before executing. Returns False if it was already claimed."""
+        now = datetime.now().isoformat()
+        cursor = self._connection().execute(
+            "INSERT OR IGNORE INTO action_executions (key, status, created_at, updated_at, fingerprint)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (key, KEY_STARTED, now, now, fingerprint),
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, key: str, result: Any):
+        self._connection().execute(
+            "UPDATE action_executions SET status = ?, result = ?, updated_at = ? WHERE key = ?",
+            (KEY_COMPLETED, json.dumps(result, default=str), datetime.now().isoformat(), key),
+        )
+
+    def mark_unknown(self, key: str):
+        self._connection().execute(
+            "UPDATE action_executions SET status = ?, updated_at = ? WHERE key = ?",
+            (KEY_UNKNOWN, datetime.now().isoformat(), key),
+        )
+
+    def release(self, key: str):
+        """Forget a claim whose execution failed cleanly, so it can be retried."""
+        self._connection().execute("DELETE FROM action_executions WHERE key = ?", (key,))
+
+
+class ActionExecutionEngine:
+    """
+    Executes action handlers off the request path.
+
+    Each action type has its own concurrency limit and timeout. Async
+    handlers run on the event loop; synchronous ones run in a thread pool so
+    a slow provider call never blocks it. Executions carrying an idempotency
+    key run at most once.
+    """
+
+    def __init__(
+        self,
+        idempotency_store: Optional[IdempotencyStore] = None,
+        concurrency: Optional[Dict[str, int]] = None,
+        timeouts: Optional[Dict[str, float]] = None,
+        default_concurrency: int = 4,
+        default_timeout: float = 30.0,
+        thread_pool_size: int = 16,
+    ):
+        self.idempotency_store = idempotency_store
+        self.concurrency = {**DEFAULT_CONCURRENCY, **(concurrency or {})}
+        self.timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+        self.default_concurrency = default_concurrency
+        self.default_timeout = default_timeout
+        self._executor = ThreadPoolExecutor(max_workers=thread_pool_size, thread_name_prefix="action")
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        # Executions running in this process by idempotency key, with their parameters' fingerprint
+        self._in_flight: Dict[str, Tuple[asyncio.Future, str]] = {}
+
+    def _semaphore(self, action_type: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(action_type)
+        if semaphore is None:
+            limit = self.concurrency.get(action_type, self.default_concurrency)
+            semaphore = self._semaphores[action_type] = asyncio.Semaphore(limit)
+        return semaphore
+
+    async def _call(self, func, *args) -> Any:
+        """Await a coroutine function, or run a blocking one in the thread pool."""
+        if inspect.iscoroutinefunction(func):
+            return await func(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args))
+
+    async def _run(self, action_type: str, func, *args, timeout: Optional[float] = None) -> Any:
+        timeout = timeout or self.timeouts.get(action_type, self.default_timeout)
+        async with self._semaphore(action_type):
+            try:
+                return await asyncio.wait_for(self._call(func, *args), timeout)
+            except asyncio.TimeoutError:
+                raise ActionTimeoutError(f"{action_type} action timed out after {timeout:g}s")
+
+    async def execute(
+        self,
+        action_type: str,
+        handler,
+        parameters: Dict[str, Any],
+        idempotency_key: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Execute an action through its type's pool.
+
+        Args:
+            action_type: Action type, used to pick the concurrency pool and timeout
+            handler: Action handler whose `execute` may be sync or async
+            parameters: Action parameters
+            idempotency_key: Executions sharing a key run at most once
+            timeout: Override for the type's timeout in seconds
+
+        Returns:
+            The handler's result (or the stored result of an earlier execution)
+        """
+        if not idempotency_key:
+            return await self._run(action_type, handler.execute, parameters, timeout=timeout)
+
+        # A duplicate in this process waits for the original execution
+        fingerprint = parameters_fingerprint(parameters)
+        in_flight = self._in_flight_future(idempotency_key, fingerprint)
+        if in_flight is not None:
+            return await asyncio.shield(in_flight)
+
+        # Register before any await so concurrent duplicates find this execution
+        future = asyncio.get_running_loop().create_future()
+        # Nobody may be waiting on the future; don't warn about unretrieved exceptions
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._in_flight[idempotency_key] = (future, fingerprint)
+        store = self.idempotency_store
+        try:
+            try:
+                if store is not None and not await asyncio.to_thread(store.claim, idempotency_key, fingerprint):
+                    # Another process or an earlier attempt already ran this action
+                    record = await asyncio.to_thread(store.get, idempotency_key)
+                    if record and record["fingerprint"] not in (None, fingerprint):
+                        raise IdempotencyKeyReusedError(
+                            f"Idempotency key {idempotency_key} was already used with different parameters"
+                        )
+                    if record and record["status"] == KEY_COMPLETED:
+                        future.set_result(record["result"])
+                        return record["result"]
+                    raise ActionOutcomeUnknownError(
+                        f"Action with idempotency key {idempotency_key} was already started and did not report a result"
+                    )
+            except Exception as e:
+                future.set_exception(e)
+                raise
+
+            try:
+                result = await self._run(action_type, handler.execute, parameters, timeout=timeout)
+            except ActionTimeoutError as e:
+                if store is not None:
+                    await asyncio.to_thread(store.mark_unknown, idempotency_key)
+                future.set_exception(e)
+                raise
+            except Exception as e:
+                if store is not None:
+                    await asyncio.to_thread(store.release, idempotency_key)
+                future.set_exception(e)
+                raise
+
+            if store is not None:
+                await asyncio.to_thread(store.complete, idempotency_key, result)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            if not future.done():
+                future.cancel()
+            raise
+        finally:
+            self._in_flight.pop(idempotency_key, None)
+
+    async def execute_batch(
+        self,
+        action_type: str,
+        handler,
+        items: List[Tuple[Optional[str], Dict[str, Any]]],
+        timeout: Optional[float] = None,
+    ) -> List[Any]:
+        """
+        Execute several compatible actions with one `handler.execute_batch` call.
+
+        Args:
+            action_type: Action type, used to pick the concurrency pool and timeout
+            handler: Action handler implementing `execute_batch(parameters_list)`
+            items: (idempotency_key, parameters) pairs
+            timeout: Override for the type's timeout in seconds
+
+        Returns:
+            One entry per item, in order: the result, or the exception that item failed with
+        """
+        store = self.idempotency_store
+        loop = asyncio.get_running_loop()
+        outcomes: List[Any] = [None] * len(items)
+        pending: List[int] = []
+        futures: Dict[int, asyncio.Future] = {}
+        # Items repeating an earlier item's key in this batch share its outcome
+        batch_keys: Dict[str, int] = {}
+        repeats: Dict[int, int] = {}
+
+        try:
+            for index, (key, parameters) in enumerate(items):
+                fingerprint = parameters_fingerprint(parameters)
+                if key in batch_keys:
+                    first = batch_keys[key]
+                    if self._in_flight[key][1] != fingerprint:
+                        outcomes[index] = IdempotencyKeyReusedError(
+                            f"Idempotency key {key} was already used with different parameters"
+                        )
+                    else:
+                        repeats[index] = first
+                    continue
+                if key and (key in self._in_flight or (
+                    store is not None and not await asyncio.to_thread(store.claim, key, fingerprint)
+                )):
+                    # Already executed (or executing) on its own; resolve it through the single path
+                    try:
+                        outcomes[index] = await self.execute(action_type, handler, parameters, idempotency_key=key)
+                    except Exception as e:
+                        outcomes[index] = e
+                    continue
+
+                pending.append(index)
+                if key:
+                    # Duplicates of the batched actions arriving meanwhile wait for the batch
+                    future = futures[index] = loop.create_future()
+                    future.add_done_callback(lambda f: f.cancelled() or f.exception())
+                    self._in_flight[key] = (future, fingerprint)
+                    batch_keys[key] = index
+
+            if pending:
+                await self._run_batch(action_type, handler, items, pending, outcomes, timeout)
+            for index, first in repeats.items():
+                outcomes[index] = outcomes[first]
+        finally:
+            for index, future in futures.items():
+                self._in_flight.pop(items[index][0], None)
+                if not future.done():
+                    outcome = outcomes[index]
+                    if isinstance(outcome, Exception):
+                        future.set_exception(outcome)
+                    elif outcome is None:
+                        future.cancel()
+                    else:
+                        future.set_result(outcome)
+        return outcomes
+
+    def _in_flight_future(self, idempotency_key: str, fingerprint: str) -> Optional[asyncio.Future]:
+        """The running execution with this key, if any; raises if it has other parameters."""
+        in_flight = self._in_flight.get(idempotency_key)
+        if in_flight is None:
+            return None
+        future, in_flight_fingerprint = in_flight
+        if in_flight_fingerprint != fingerprint:
+            raise IdempotencyKeyReusedError(
+                f"Idempotency key {idempotency_key} was already used with different parameters"
+            )
+        return future
+
+    async def _run_batch(self, action_type, handler, items, pending, outcomes, timeout):
+        """Run the pending items as one handler call and settle their idempotency keys."""
+        store = self.idempotency_store
+        try:
+            results = await self._run(
+                action_type, handler.execute_batch, [items[index][1] for index in pending], timeout=timeout
+            )
+            if len(results) != len(pending):
+                raise ValueError(f"Batch handler returned {len(results)} results for {len(pending)} actions")
+        except Exception as e:
+            for index in pending:
+                key = items[index][0]
+                if key and store is not None:
+                    if isinstance(e, ActionTimeoutError):
+                        await asyncio.to_thread(store.mark_unknown, key)
+                    else:
+                        await asyncio.to_thread(store.release, key)
+                outcomes[index] = e
+            return
+
+        for index, result in zip(pending, results):
+            key = items[index][0]
+            if key and store is not None:
+                if isinstance(result, Exception):
+                    await asyncio.to_thread(store.release, key)
+                else:
+                    await asyncio.to_thread(store.complete, key, result)
+            outcomes[index] = result
+
+
+# Singleton instance, created on first use
+_action_engine: Optional[ActionExecutionEngine] = None
+
+
+def get_action_engine() -> ActionExecutionEngine:
+    """Get the process-wide action execution engine."""
+    global _action_engine
+    if _action_engine is None:
+        _action_engine = ActionExecutionEngine(
+            idempotency_store=IdempotencyStore(os.getenv("ACTION_IDEMPOTENCY_PATH", "data/actions.db")),
+            thread_pool_size=int(os.getenv("ACTION_THREAD_POOL_SIZE", "16")),
+        )
+    return _action_engine
@@ -0,0 +1,367 @@
+from typing import Dict, Any, Optional, List, Tuple
+from datetime import datetime, timedelta
+import asyncio
+import json
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+# Phrases signalling each action type. Matching is case-insensitive on word boundaries.
+INTENT_LEXICONS: Dict[str, List[str]] = {
+    "email": [
+        "email", "e-mail", "mail", "send", "reply", "respond to", "forward", "write to", "cc",
+    ],
+    "calendar": [
+        "schedule", "meeting", "meet", "calendar", "book", "appointment", "invite",
+        "reschedule", "set up a call", "call with", "sync with",
+    ],
+    "slack": [
+        "slack", "post in", "post to", "ping", "dm", "notify the channel", "message the team",
+    ],
+    "task": [
+        "todo", "to-do", "task", "remind me", "reminder", "follow up", "follow-up", "ticket",
+        "action item", "assign",
+    ],
+}
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+# Entity patterns. They come before the intents in the combined pattern so that
+# e.g. "mail" inside "jane@mail.com" is consumed as part of the address.
+ENTITY_PATTERNS: List[Tuple[str, str]] = [
+    ("email_address", r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+"),
+    ("channel", r"(?<![\w&])#[a-z0-9][\w-]*"),
+    ("mention", r"(?<![\w.])@\w+"),
+    ("iso_date", r"\b\d{4}-\d{2}-\d{2}\b"),
+    ("slash_date", r"\b\d{1,2}/\d{1,2}(?:/\d{2,4})?\b"),
+    ("relative_date", r"\b(?:today|tonight|tomorrow|(?:next\s+)?(?:" + "|".join(WEEKDAYS) + r"))\b"),
+    ("time", r"\b(?:noon|midnight|\d{1,2}(?::\d{2})?\s*(?:am|pm)|(?:[01]?\d|2[0-3]):[0-5]\d)\b"),
+]
+
+# Default meeting length when the message doesn't say
+DEFAULT_MEETING_MINUTES = 60
+
+# Hour used when a date is given without a time
+DEFAULT_HOUR = 9
+
+
+def _phrase_pattern(phrase: str) -> str:
+    return r"\b" + r"\s+".join(re.escape(word) for word in phrase.split()) + r"\b"
+
+
+def _build_matcher() -> "re.Pattern":
+    """Compile entities and every intent lexicon into a single alternation."""
+    parts = [f"(?P<{name}>{pattern})" for name, pattern in ENTITY_PATTERNS]
+    for action_type, phrases in INTENT_LEXICONS.items():
+        # Longest phrases first so "follow up" wins over a shorter overlapping phrase
+        alternation = "|".join(_phrase_pattern(p) for p in sorted(phrases, key=len, reverse=True))
+        parts.append(f"(?P<intent_{action_type}>{alternation})")
+    return re.compile("|".join(parts), re.IGNORECASE)
+
+
+_MATCHER = _build_matcher()
+
+
+def _parse_time(text: str) -> Optional[Tuple[int, int]]:
+    """Hour and minute of a time mention, or None if it isn't a valid time (e.g. "25pm")."""
+    text = text.lower().replace(" ", "")
+    if text == "noon":
+        return 12, 0
+    if text == "midnight":
+        return 0, 0
+    suffix = text[-2:] if text[-2:] in ("am", "pm") else None
+    if suffix:
+        text = text[:-2]
+    hour, _, minute = text.partition(":")
+    hour, minute = int(hour), int(minute or 0)
+    if hour > (12 if suffix else 23) or minute > 59:
+        return None
+    if suffix == "pm" and hour < 12:
+        hour += 12
+    elif suffix == "am" and hour == 12:
+        hour = 0
+    return hour, minute
+
+
+def _parse_date(kind: str, text: str, now: datetime) -> Optional[datetime]:
+    text = text.lower()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    try:
+        if kind == "iso_date":
+            return datetime.strptime(text, "%Y-%m-%d")
+        if kind == "slash_date":
+            month, day, *year = (int(part) for part in text.split("/"))
+            year = year[0] if year else now.year
+            if year < 100:
+                year += 2000
+            return datetime(year, month, day)
+    except ValueError:
+        return None
+    if text in ("today", "tonight"):
+        return today
+    if text == "tomorrow":
+        return today + timedelta(days=1)
+    weekday = WEEKDAYS.index(text.split()[-1])
+    days_ahead = (weekday - today.weekday()) % 7 or 7
+    return today + timedelta(days=days_ahead)
+
+
+class MessageAnalysis:
+    """Intents and entities found in a message by one scan of the combined matcher."""
+
+    def __init__(self):
+        self.intents: Dict[str, int] = {}
+        self.email_addresses: List[str] = []
+        self.channels: List[str] = []
+        self.mentions: List[str] = []
+        self.dates: List[datetime] = []
+        self.times: List[Tuple[int, int]] = []
+
+    def start_time(self, now: datetime) -> Optional[datetime]:
+        """Combine the first date and time mentioned into a start time, if any were."""
+        if not self.dates and not self.times:
+            return None
+        hour, minute = self.times[0] if self.times else (DEFAULT_HOUR, 0)
+        if self.dates:
+            return self.dates[0].replace(hour=hour, minute=minute)
+        start = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        # A bare time that already passed today means tomorrow
+        return start if start > now else start + timedelta(days=1)
+
+
+def analyze_message(message: str, now: Optional[datetime] = None) -> MessageAnalysis:
+    """Scan a message once, collecting intent hits and entities."""
+    now = now or datetime.now()
+    analysis = MessageAnalysis()
+    for match in _MATCHER.finditer(message):
+        kind = match.lastgroup
+        text = match.group()
+        if kind.startswith("intent_"):
+            action_type = kind[len("intent_"):]
+            analysis.intents[action_type] = analysis.intents.get(action_type, 0) + 1
+        elif kind == "email_address":
+            if text.lower() not in analysis.email_addresses:
+                analysis.email_addresses.append(text.lower())
+        elif kind == "channel":
+            analysis.channels.append(text)
+        elif kind == "mention":
+            analysis.mentions.append(text)
+        elif kind == "time":
+            parsed = _parse_time(text)
+            if parsed is not None:
+                analysis.times.append(parsed)
+        else:
+            date = _parse_date(kind, text, now)
+            if date is not None:
+                analysis.dates.append(date)
+    return analysis
+
+
+def _summary(message: str, limit: int = 60) -> str:
+    """First sentence of the message, shortened for use as a title or subject."""
+    first = re.split(r"(?<=[.!?])\s", message.strip(), maxsplit=1)[0]
+    return first if len(first) <= limit else first[:limit - 3].rstrip() + "..."
+
+
+class ActionExtractor:
+    """
+    Rule-based suggested-action extraction.
+
+    All intent lexicons and entity patterns are compiled into one regular
+    expression, so a message is scanned exactly once regardless of how many
+    intents are configured.
+    """
+
+    def extract(self, message: str, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """
+        Suggest actions for a user message.
+
+        Args:
+            message: The user's message
+            now: Reference time for relative dates, defaults to the current time
+
+        Returns:
+            Suggested actions, each with parameters that pass the type's validation
+        """
+        now = now or datetime.now()
+        analysis = analyze_message(message, now)
+        intents = dict(analysis.intents)
+        # Entities alone are strong signals of some intents
+        start_time = analysis.start_time(now)
+        if analysis.channels:
+            intents.setdefault("slack", 1)
+        if start_time and not intents:
+            intents["calendar"] = 1
+
+        suggestions = []
+        summary = _summary(message)
+        if intents.get("email"):
+            suggestions.append({
+                "type": "email",
+                "title": "Send Email",
+                "description": "Send an email to the mentioned recipients",
+                "parameters": {
+                    "to": analysis.email_addresses,
+                    "subject": summary,
+                    "body": message.strip(),
+                },
+            })
+
+        if intents.get("calendar"):
+            start_time = start_time or (now + timedelta(days=1)).replace(
+                hour=DEFAULT_HOUR, minute=0, second=0, microsecond=0
+            )
+            suggestions.append({
+                "type": "calendar",
+                "title": "Schedule Meeting",
+                "description": "Create a calendar event",
+                "parameters": {
+                    "title": summary,
+                    "start_time": start_time.isoformat(),
+                    "end_time": (start_time + timedelta(minutes=DEFAULT_MEETING_MINUTES)).isoformat(),
+                    "attendees": analysis.email_addresses,
+                },
+            })
+
+        if intents.get("slack"):
+            suggestions.append({
+                "type": "slack",
+                "title": "Send Slack Message",
+                "description": "Post a message to Slack",
+                "parameters": {
+                    "channel": analysis.channels[0] if analysis.channels else (
+                        analysis.mentions[0] if analysis.mentions else "#general"
+                    ),
+                    "message": message.strip(),
+                },
+            })
+
+        if intents.get("task"):
+            parameters = {"title": summary, "description": message.strip()}
+            if start_time:
+                parameters["due_date"] = start_time.isoformat()
+            suggestions.append({
+                "type": "task",
+                "title": "Create Task",
+                "description": "Add a task to your task list",
+                "parameters": parameters,
+            })
+
+        return suggestions
+
+
+class LLMActionExtractor:
+    """
+    Second extraction pass asking the LLM for actions the rules can't express.
+
+    Runs concurrently with answer generation; its suggestions are merged in
+    only if it finishes by the time the answer is ready.
+    """
+
+    SYSTEM_PROMPT = (
+        "Extract actions the user wants taken from their message. Reply with a JSON object "
+        '{"actions": [{"type": "email|calendar|slack|task", "title": str, "description": str, '
+        '"parameters": object}]}. Use ISO 8601 for times. Reply {"actions": []} if there are none.'
+    )
+
+    def __init__(self, api_key: str, model: str, api_url: str = "https://api.openai.com/v1/chat/completions"):
+        self.api_key = api_key
+        self.model = model
+        self.api_url = api_url
+
+    async def extract(self, message: str) -> List[Dict[str, Any]]:
+        # Imported here so the chat router doesn't pull in httpx at startup
+        from backend.utils.http_client import get_http_client
+        response = await get_http_client().post(
+            self.api_url,
+            headers={"Authorization": f"Bearer {self.api_key}"},
+            json={
+                "model": self.model,
+                "response_format": {"type": "json_object"},
+                "messages": [
+                    {"role": "system", "content": self.SYSTEM_PROMPT},
+                    {"role": "user", "content": message},
+                ],
+            },
+        )
+        response.raise_for_status()
+        content = response.json()["choices"][0]["message"]["content"]
+        actions = json.loads(content).get("actions", [])
+        return [action for action in actions if isinstance(action, dict) and action.get("type") in INTENT_LEXICONS]
+
+
+def merge_suggestions(rule_based: List[Dict[str, Any]], llm: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Fill in rule-based suggestions with LLM parameters and append actions the rules missed."""
+    merged = {suggestion["type"]: suggestion for suggestion in rule_based}
+    extra = []
+    for suggestion in llm:
+        existing = merged.get(suggestion["type"])
+        if existing is None:
+            extra.append({"description": "", "parameters": {}, **suggestion})
+            continue
+        parameters = dict(existing["parameters"])
+        for key, value in (suggestion.get("parameters") or {}).items():
+            if value and not parameters.get(key):
+                parameters[key] = value
+        existing["parameters"] = parameters
+    return rule_based + extra
+
+
+class SuggestionExtraction:
+    """Suggested-action extraction for one message, started before the answer is generated."""
+
+    def __init__(self, rule_based: List[Dict[str, Any]], llm_task: Optional[asyncio.Task], grace: float):
+        self.rule_based = rule_based
+        self.llm_task = llm_task
+        self.grace = grace
+
+    async def result(self) -> List[Dict[str, Any]]:
+        """Rule-based suggestions, plus the LLM's if it finishes within the grace period."""
+        if self.llm_task is None:
+            return self.rule_based
+        done, _ = await asyncio.wait({self.llm_task}, timeout=self.grace)
+        if not done:
+            self.llm_task.cancel()
+            return self.rule_based
+        try:
+            return merge_suggestions(self.rule_based, self.llm_task.result())
+        except Exception:
+            logger.exception("LLM action extraction failed")
+            return self.rule_based
+
+
+class SuggestedActionPipeline:
+    """Runs the rule-based extractor inline and the optional LLM pass in the background."""
+
+    def __init__(self, llm_extractor: Optional[LLMActionExtractor] = None, llm_grace: float = 0.05):
+        self.extractor = ActionExtractor()
+        self.llm_extractor = llm_extractor
+        self.llm_grace = llm_grace
+
+    def start(self, message: str) -> SuggestionExtraction:
+        """Start extracting suggestions; await `result()` once the answer is ready."""
+        llm_task = None
+        if self.llm_extractor is not None:
+            llm_task = asyncio.create_task(self.llm_extractor.extract(message))
+        return SuggestionExtraction(self.extractor.extract(message), llm_task, self.llm_grace)
+
+
+# Singleton instance, created on first use
+_suggested_action_pipeline: Optional[SuggestedActionPipeline] = None
+
+
+def get_suggested_action_pipeline() -> SuggestedActionPipeline:
+    """Get the suggested-action pipeline, with the LLM pass enabled by ACTION_EXTRACTION_LLM."""
+    global _suggested_action_pipeline
+    if _suggested_action_pipeline is None:
+        llm_extractor = None
+        api_key = os.getenv("OPENAI_API_KEY")
+        if os.getenv("ACTION_EXTRACTION_LLM", "false").lower() == "true" and api_key:
+            llm_extractor = LLMActionExtractor(api_key, os.getenv("MODEL_NAME", "gpt-3.5-turbo"))
+        _suggested_action_pipeline = SuggestedActionPipeline(
+            llm_extractor,
+            llm_grace=float(os.getenv("ACTION_EXTRACTION_LLM_GRACE", "0.05")),
+        )
+    return _suggested_action_pipeline
@@ -0,0 +1,275 @@
+from typing import Dict, Any, Optional, List, Tuple
+import base64
+import bisect
+import json
+import os
+import sqlite3
+import threading
+
+# Default and maximum page sizes for listing
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def _status_value(status: Any) -> str:
+    return getattr(status, "value", status)
+
+
+def encode_cursor(sort_key: Tuple[str, str]) -> str:
+    """Encode a (created_at, id) position as an opaque cursor."""
+    return base64.urlsafe_b64encode(json.dumps(list(sort_key)).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Decode a cursor produced by `encode_cursor`; raises ValueError if malformed."""
+    try:
+        created_at, action_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    return str(created_at), str(action_id)
+
+
+class ActionStore:
+    """
+    In-memory action store with secondary indexes.
+
+    Keeps, for every user, the (created_at, id) keys of their actions sorted
+    both overall and per status, plus running status counts. Listing a page
+    is a binary search plus a slice, and counts never touch the records, so
+    latency stays flat as action history grows.
+
+    Records are plain dicts. Status changes must go through `update` so the
+    indexes stay in sync.
+    """
+
+    def __init__(self):
+        self._actions: Dict[str, Dict[str, Any]] = {}
+        # (user_id, status or None for all) -> sorted [(created_at, id)]
+        self._index: Dict[Tuple[str, Optional[str]], List[Tuple[str, str]]] = {}
+        self._counts: Dict[str, Dict[str, int]] = {}
+
+    def __contains__(self, action_id: str) -> bool:
+        return action_id in self._actions
+
+    def __len__(self) -> int:
+        return len(self._actions)
+
+    def __getitem__(self, action_id: str) -> Dict[str, Any]:
+        return self._actions[action_id]
+
+    def get(self, action_id: str) -> Optional[Dict[str, Any]]:
+        return self._actions.get(action_id)
+
+    def values(self):
+        return self._actions.values()
+
+    def _sort_key(self, action: Dict[str, Any]) -> Tuple[str, str]:
+        return (action["created_at"], action["id"])
+
+    def _add_to_index(self, action: Dict[str, Any]):
+        user_id = action["user_id"]
+        status = _status_value(action["status"])
+        sort_key = self._sort_key(action)
+        for index_key in ((user_id, None), (user_id, status)):
+            bisect.insort(self._index.setdefault(index_key, []), sort_key)
+        counts = self._counts.setdefault(user_id, {})
+        counts[status] = counts.get(status, 0) + 1
+
+    def _remove_from_index(self, action: Dict[str, Any], statuses: Tuple[Optional[str], ...]):
+        user_id = action["user_id"]
+        sort_key = self._sort_key(action)
+        for status in statuses:
+            keys = self._index.get((user_id, status), [])
+            position = bisect.bisect_left(keys, sort_key)
+            if position < len(keys) and keys[position] == sort_key:
+                del keys[position]
+
+    def insert(self, action: Dict[str, Any]) -> Dict[str, Any]:
+        """Add a new action record."""
+        if action["id"] in self._actions:
+            raise ValueError(f"Action with ID {action['id']} already exists")
+        self._actions[action["id"]] = action
+        self._add_to_index(action)
+        return action
+
+    def update(self, action_id: str, **fields) -> Dict[str, Any]:
+        """Update fields of an action, re-indexing it if its status changes."""
+        action = self._actions[action_id]
+        new_status = fields.get("status")
+        old_status = _status_value(action["status"])
+        if new_status is not None and _status_value(new_status) != old_status:
+            self._remove_from_index(action, (old_status,))
+            counts = self._counts[action["user_id"]]
+            counts[old_status] -= 1
+            action.update(fields)
+            status = _status_value(new_status)
+            bisect.insort(self._index.setdefault((action["user_id"], status), []), self._sort_key(action))
+            counts[status] = counts.get(status, 0) + 1
+        else:
+            action.update(fields)
+        return action
+
+    def delete(self, action_id: str):
+        action = self._actions.pop(action_id)
+        status = _status_value(action["status"])
+        self._remove_from_index(action, (None, status))
+        self._counts[action["user_id"]][status] -= 1
+
+    def list(
+        self,
+        user_id: str,
+        status: Optional[Any] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        List a user's actions, newest first.
+
+        Args:
+            user_id: Owner of the actions
+            status: Optional status filter
+            limit: Maximum number of actions to return
+            cursor: Cursor returned by the previous page
+
+        Returns:
+            The page of actions and the cursor for the next page (None on the last page)
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        keys = self._index.get((user_id, _status_value(status) if status is not None else None), [])
+        end = len(keys)
+        if cursor:
+            end = bisect.bisect_left(keys, decode_cursor(cursor))
+        start = max(0, end - limit)
+        page = [self._actions[action_id] for _, action_id in reversed(keys[start:end])]
+        next_cursor = encode_cursor(keys[start]) if start > 0 else None
+        return page, next_cursor
+
+    def counts(self, user_id: str) -> Dict[str, int]:
+        """Number of actions per status for a user, without loading any records."""
+        return {status: count for status, count in self._counts.get(user_id, {}).items() if count}
+
+
+class SQLiteActionStore:
+    """
+    Action store shared by every worker process, with the same interface as ActionStore.
+
+    Listing uses keyset pagination over (user_id, status, created_at, id)
+    indexes, and counts are an indexed GROUP BY, so both stay fast as
+    history grows. Records returned are copies; change them through `update`.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        connection = self._connection()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS actions ("
+            " id TEXT PRIMARY KEY, user_id TEXT NOT NULL, status TEXT NOT NULL,"
+            " created_at TEXT NOT NULL, data TEXT NOT NULL)"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS actions_user ON actions (user_id, created_at, id)")
+        connection.execute("CREATE INDEX IF NOT EXISTS actions_user_status ON actions (user_id, status, created_at, id)")
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def __contains__(self, action_id: str) -> bool:
+        return self._connection().execute("SELECT 1 FROM actions WHERE id = ?", (action_id,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM actions").fetchone()[0]
+
+    def __getitem__(self, action_id: str) -> Dict[str, Any]:
+        action = self.get(action_id)
+        if action is None:
+            raise KeyError(action_id)
+        return action
+
+    def get(self, action_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute("SELECT data FROM actions WHERE id = ?", (action_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def values(self):
+        return (json.loads(row[0]) for row in self._connection().execute("SELECT data FROM actions").fetchall())
+
+    def insert(self, action: Dict[str, Any]) -> Dict[str, Any]:
+        """Add a new action record."""
+        try:
+            self._connection().execute(
+                "INSERT INTO actions (id, user_id, status, created_at, data) VALUES (?, ?, ?, ?, ?)",
+                (action["id"], action["user_id"], _status_value(action["status"]), action["created_at"],
+                 json.dumps(action, default=str)),
+            )
+        except sqlite3.IntegrityError:
+            raise ValueError(f"Action with ID {action['id']} already exists")
+        return action
+
+    def update(self, action_id: str, **fields) -> Dict[str, Any]:
+        """Update fields of an action atomically and return the updated record."""
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute("SELECT data FROM actions WHERE id = ?", (action_id,)).fetchone()
+            if row is None:
+                raise KeyError(action_id)
+            action = json.loads(row[0])
+            action.update(fields)
+            action = json.loads(json.dumps(action, default=str))
+            connection.execute(
+                "UPDATE actions SET status = ?, data = ? WHERE id = ?",
+                (_status_value(action["status"]), json.dumps(action), action_id),
+            )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return action
+
+    def delete(self, action_id: str):
+        if self._connection().execute("DELETE FROM actions WHERE id = ?", (action_id,)).rowcount == 0:
+            raise KeyError(action_id)
+
+    def list(
+        self,
+        user_id: str,
+        status: Optional[Any] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """List a user's actions, newest first; see ActionStore.list."""
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        query = "SELECT created_at, id, data FROM actions WHERE user_id = ?"
+        params: List[Any] = [user_id]
+        if status is not None:
+            query += " AND status = ?"
+            params.append(_status_value(status))
+        if cursor:
+            query += " AND (created_at, id) < (?, ?)"
+            params.extend(decode_cursor(cursor))
+        query += " ORDER BY created_at DESC, id DESC LIMIT ?"
+        params.append(limit + 1)
+        rows = self._connection().execute(query, params).fetchall()
+        page = rows[:limit]
+        next_cursor = encode_cursor((page[-1][0], page[-1][1])) if len(rows) > limit else None
+        return [json.loads(row[2]) for row in page], next_cursor
+
+    def counts(self, user_id: str) -> Dict[str, int]:
+        """Number of actions per status for a user."""
+        rows = self._connection().execute(
+            "SELECT status, COUNT(*) FROM actions WHERE user_id = ? GROUP BY status", (user_id,)
+        ).fetchall()
+        return {status: count for status, count in rows if count}
+
+
+def create_action_store():
+    """Action store on the backend chosen by STATE_BACKEND."""
+    if os.getenv("STATE_BACKEND", "memory") == "sqlite":
+        return SQLiteActionStore(os.getenv("STATE_DB_PATH", "data/state.db"))
+    return ActionStore()
@@ -1,11 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Query
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
 from enum import Enum
 from datetime import datetime
+import asyncio
 
 # Import authentication dependencies
 from .auth import get_current_user, User
+from backend.utils.job_queue import get_job_queue, register_job_handler
+from backend.actions.engine import get_action_engine, ActionTimeoutError, ActionOutcomeUnknownError
+from backend.actions.store import create_action_store, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from backend.utils.events import event_bus
+from backend.utils.tracing import traced
+from backend.utils.state import new_id
+from backend.utils.responses import FastJSONResponse, model_fields, project
 
 router = APIRouter()
 
@@ -44,22 +52,50 @@ class Action(ActionBase):
 
 class ActionList(BaseModel):
     actions: List[Action]
+    next_cursor: Optional[str] = None
 
-# Mock database for actions
-fake_actions_db = {}
-action_id_counter = 0
+class ActionCounts(BaseModel):
+    counts: Dict[str, int]
+    total: int
+
+class ActionBatchIds(BaseModel):
+    action_ids: List[str]
+
+# Fields returned for each action, dropping internal ones such as job_id
+ACTION_FIELDS = model_fields(Action)
+
+# Mock database for actions, indexed by user, status and creation time
+action_store = create_action_store()
+
+# Maximum number of actions per batch approve/reject call
+MAX_BATCH_SIZE = 500
+
+# Action handlers are stateless, so one instance per type is shared by all requests
+_action_handlers: Dict[ActionType, "BaseActionHandler"] = {}
 
 # Helper functions
+def publish_action_event(event_type: str, action: Dict[str, Any]):
+    """Push an action's current state to the owner's event streams."""
+    event_bus.publish(action["user_id"], event_type, {"action": project([action], ACTION_FIELDS)[0]})
+
+def update_action(action_id: str, **fields) -> Dict[str, Any]:
+    """Update an action record, notifying the owner when its status changes."""
+    action = action_store.update(action_id, **fields)
+    if "status" in fields:
+        publish_action_event("action.updated", action)
+    return action
+
 def get_action_handler(action_type: ActionType):
     """Get the appropriate action handler based on type."""
-    handlers = {
-        ActionType.EMAIL: EmailActionHandler(),
-        ActionType.CALENDAR: CalendarActionHandler(),
-        ActionType.SLACK: SlackActionHandler(),
-        ActionType.TASK: TaskActionHandler(),
-        ActionType.CUSTOM: CustomActionHandler(),
-    }
-    return handlers.get(action_type)
+    if not _action_handlers:
+        _action_handlers.update({
+            ActionType.EMAIL: EmailActionHandler(),
+            ActionType.CALENDAR: CalendarActionHandler(),
+            ActionType.SLACK: SlackActionHandler(),
+            ActionType.TASK: TaskActionHandler(),
+            ActionType.CUSTOM: CustomActionHandler(),
+        })
+    return _action_handlers.get(action_type)
 
 # Base action handler class
 class BaseActionHandler:
@@ -68,7 +104,25 @@ class BaseActionHandler:
         raise NotImplementedError()
     
     def execute(self, parameters: Dict[str, Any]):
-        """Execute the action."""
+        """
+        Execute the action.
+
+        May be a coroutine; blocking implementations are run in the
+        execution engine's thread pool.
+        """
+        raise NotImplementedError()
+    
+    def batch_key(self, parameters: Dict[str, Any]) -> Optional[str]:
+        """Key grouping actions that can go out in one provider call, or None if not batchable."""
+        return None
+    
+    def execute_batch(self, parameters_list: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Execute actions sharing a batch key in a single provider call.
+
+        Returns one result per action, in order; an Exception instance marks
+        an action the provider rejected.
+        """
         raise NotImplementedError()
 
 # Action handler implementations
@@ -123,6 +177,29 @@ class CalendarActionHandler(BaseActionHandler):
                 "event_id": "cal_123456"
             }
         }
+    
+    def batch_key(self, parameters: Dict[str, Any]) -> Optional[str]:
+        # Events for the same calendar can share one batch request
+        return parameters.get("calendar_id", "primary")
+    
+    def execute_batch(self, parameters_list: List[Dict[str, Any]]) -> List[Any]:
+        # In a real implementation, use the calendar API's batch endpoint
+        return [
+            {
+                "status": "success",
+                "message": f"Meeting '{parameters['title']}' scheduled",
+                "details": {
+                    "title": parameters["title"],
+                    "start_time": parameters["start_time"],
+                    "end_time": parameters["end_time"],
+                    "attendees": parameters.get("attendees", []),
+                    "calendar_id": parameters.get("calendar_id", "primary"),
+                    "event_id": f"cal_123456_{index}",
+                    "batch_size": len(parameters_list)
+                }
+            }
+            for index, parameters in enumerate(parameters_list)
+        ]
 
 class SlackActionHandler(BaseActionHandler):
     def validate(self, parameters: Dict[str, Any]):
@@ -144,6 +221,27 @@ class SlackActionHandler(BaseActionHandler):
                 "message_id": "slack_123456"
             }
         }
+    
+    def batch_key(self, parameters: Dict[str, Any]) -> Optional[str]:
+        # Messages to the same channel go out in one call
+        return parameters["channel"]
+    
+    def execute_batch(self, parameters_list: List[Dict[str, Any]]) -> List[Any]:
+        # In a real implementation, use the Slack API
+        sent_at = datetime.now().isoformat()
+        return [
+            {
+                "status": "success",
+                "message": f"Message sent to Slack channel {parameters['channel']}",
+                "details": {
+                    "channel": parameters["channel"],
+                    "sent_at": sent_at,
+                    "message_id": f"slack_123456_{index}",
+                    "batch_size": len(parameters_list)
+                }
+            }
+            for index, parameters in enumerate(parameters_list)
+        ]
 
 class TaskActionHandler(BaseActionHandler):
     def validate(self, parameters: Dict[str, Any]):
@@ -183,15 +281,27 @@ class CustomActionHandler(BaseActionHandler):
 @router.get("/", response_model=ActionList)
 async def list_actions(
     status: Optional[ActionStatus] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user)
 ):
-    """List all actions for the current user."""
-    user_actions = [
-        action for action in fake_actions_db.values()
-        if action["user_id"] == current_user.email and
-        (status is None or action["status"] == status)
-    ]
-    return {"actions": user_actions}
+    """List actions for the current user, newest first, one page at a time."""
+    try:
+        user_actions, next_cursor = action_store.list(
+            current_user.email, status=status, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
+    return FastJSONResponse({"actions": project(user_actions, ACTION_FIELDS), "next_cursor": next_cursor})
+
+@router.get("/counts", response_model=ActionCounts)
+async def count_actions(current_user: User = Depends(get_current_user)):
+    """Count the current user's actions by status."""
+    counts = action_store.counts(current_user.email)
+    return {"counts": counts, "total": sum(counts.values())}
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
 async def create_action(
@@ -199,9 +309,6 @@ async def create_action(
     current_user: User = Depends(get_current_user)
 ):
     """Create a new action."""
-    global action_id_counter
-    action_id_counter += 1
-    
     # Validate action parameters
     action_handler = get_action_handler(action.type)
     if not action_handler:
@@ -219,7 +326,7 @@ async def create_action(
         )
     
     # Create action record
-    action_id = str(action_id_counter)
+    action_id = new_id()
     action_record = {
         "id": action_id,
         "type": action.type,
@@ -234,51 +341,148 @@ async def create_action(
         "result": None
     }
     
-    fake_actions_db[action_id] = action_record
+    action_store.insert(action_record)
+    publish_action_event("action.created", action_record)
     
     return action_record
 
-@router.get("/{action_id}")
+def validate_batch_ids(action_ids: List[str], user_email: str):
+    """Check that every action in a batch exists, belongs to the user and is pending, before changing any."""
+    if len(action_ids) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch size {len(action_ids)} exceeds the maximum of {MAX_BATCH_SIZE}"
+        )
+    
+    errors = []
+    seen = set()
+    for index, action_id in enumerate(action_ids):
+        action = action_store.get(action_id)
+        if action_id in seen:
+            errors.append({"index": index, "id": action_id, "error": "Duplicate action ID in batch"})
+        elif action is None:
+            errors.append({"index": index, "id": action_id, "error": f"Action with ID {action_id} not found"})
+        elif action["user_id"] != user_email:
+            errors.append({"index": index, "id": action_id, "error": "Not authorized to access this action"})
+        elif action["status"] != ActionStatus.PENDING:
+            errors.append({
+                "index": index,
+                "id": action_id,
+                "error": f"Action is not in PENDING state, current state: {action['status']}"
+            })
+        seen.add(action_id)
+    
+    if errors:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"message": "Batch validation failed, no actions were changed", "errors": errors}
+        )
+
+@router.post("/batch/approve")
+async def approve_actions_batch(
+    batch: ActionBatchIds,
+    current_user: User = Depends(get_current_user)
+):
+    """Approve many actions at once; compatible actions are executed together."""
+    validate_batch_ids(batch.action_ids, current_user.email)
+    
+    now = datetime.now().isoformat()
+    for action_id in batch.action_ids:
+        update_action(
+            action_id,
+            status=ActionStatus.APPROVED,
+            idempotency_key=f"action:{action_id}",
+            updated_at=now
+        )
+    
+    # One job executes the whole batch so compatible actions can be coalesced
+    job_id = get_job_queue().enqueue("action.execute_batch", {"action_ids": batch.action_ids})
+    
+    return {
+        "job_id": job_id,
+        "results": [
+            {"id": action_id, "status": ActionStatus.APPROVED}
+            for action_id in batch.action_ids
+        ]
+    }
+
+@router.post("/batch/reject")
+async def reject_actions_batch(
+    batch: ActionBatchIds,
+    current_user: User = Depends(get_current_user)
+):
+    """Reject many actions at once."""
+    validate_batch_ids(batch.action_ids, current_user.email)
+    
+    now = datetime.now().isoformat()
+    for action_id in batch.action_ids:
+        update_action(action_id, status=ActionStatus.REJECTED, updated_at=now)
+    
+    return {
+        "results": [
+            {"id": action_id, "status": ActionStatus.REJECTED}
+            for action_id in batch.action_ids
+        ]
+    }
+
+@router.get("/{action_id}", response_model=Action)
 async def get_action(
     action_id: str,
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific action."""
-    if action_id not in fake_actions_db:
+    if action_id not in action_store:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Action with ID {action_id} not found"
         )
     
-    action = fake_actions_db[action_id]
+    action = action_store[action_id]
     if action["user_id"] != current_user.email:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to access this action"
         )
     
-    return action
+    # Internal fields (idempotency key, job ID) stay out of the response, as in the list route
+    return FastJSONResponse(project([action], ACTION_FIELDS)[0])
 
 @router.post("/{action_id}/approve")
 async def approve_action(
     action_id: str,
-    background_tasks: BackgroundTasks,
+    idempotency_key: Optional[str] = Header(None),
     current_user: User = Depends(get_current_user)
 ):
-    """Approve an action for execution."""
-    if action_id not in fake_actions_db:
+    """
+    Approve an action for execution.
+
+    Retrying with the same `Idempotency-Key` header returns the original
+    approval instead of failing, and the action is still executed only once.
+    Keys are scoped to the user and the action, so another client reusing
+    a key never sees this execution's result.
+    """
+    if action_id not in action_store:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Action with ID {action_id} not found"
         )
     
-    action = fake_actions_db[action_id]
+    action = action_store[action_id]
     if action["user_id"] != current_user.email:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to approve this action"
         )
     
+    if idempotency_key:
+        idempotency_key = f"{current_user.email}:{action_id}:{idempotency_key}"
+    if idempotency_key and action.get("idempotency_key") == idempotency_key:
+        return {
+            "message": f"Action {action_id} already approved",
+            "action": project([action], ACTION_FIELDS)[0],
+            "job_id": action.get("job_id")
+        }
+    
     if action["status"] != ActionStatus.PENDING:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -286,15 +490,21 @@ async def approve_action(
         )
     
     # Update action status
-    action["status"] = ActionStatus.APPROVED
-    action["updated_at"] = datetime.now().isoformat()
+    action = update_action(
+        action_id,
+        status=ActionStatus.APPROVED,
+        idempotency_key=idempotency_key or f"action:{action_id}",
+        updated_at=datetime.now().isoformat()
+    )
     
-    # Execute action in background
-    background_tasks.add_task(execute_action, action_id)
+    # Queue execution on the durable job queue
+    job_id = get_job_queue().enqueue("action.execute", {"action_id": action_id})
+    action = action_store.update(action_id, job_id=job_id)
     
     return {
         "message": f"Action {action_id} approved and queued for execution",
-        "action": action
+        "action": project([action], ACTION_FIELDS)[0],
+        "job_id": job_id
     }
 
 @router.post("/{action_id}/reject")
@@ -303,13 +513,13 @@ async def reject_action(
     current_user: User = Depends(get_current_user)
 ):
     """Reject an action."""
-    if action_id not in fake_actions_db:
+    if action_id not in action_store:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Action with ID {action_id} not found"
         )
     
-    action = fake_actions_db[action_id]
+    action = action_store[action_id]
     if action["user_id"] != current_user.email:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -323,47 +533,116 @@ async def reject_action(
         )
     
     # Update action status
-    action["status"] = ActionStatus.REJECTED
-    action["updated_at"] = datetime.now().isoformat()
+    action = update_action(action_id, status=ActionStatus.REJECTED, updated_at=datetime.now().isoformat())
     
     return {
         "message": f"Action {action_id} rejected",
-        "action": action
+        "action": project([action], ACTION_FIELDS)[0]
     }
 
-# Helper function for executing actions
+# Helper functions for executing actions
+def record_action_outcome(action: Dict[str, Any], outcome: Any):
+    """Store an execution result, or the exception it failed with, on the action record."""
+    now = datetime.now().isoformat()
+    if isinstance(outcome, (ActionTimeoutError, ActionOutcomeUnknownError)):
+        # The provider may or may not have acted; don't retry automatically
+        update_action(
+            action["id"],
+            status=ActionStatus.FAILED,
+            result={"error": str(outcome), "outcome_unknown": True},
+            updated_at=now
+        )
+    elif isinstance(outcome, Exception):
+        update_action(
+            action["id"],
+            status=ActionStatus.FAILED,
+            result={"error": str(outcome)},
+            updated_at=now
+        )
+    else:
+        update_action(
+            action["id"],
+            status=ActionStatus.COMPLETED,
+            result=outcome,
+            completed_at=now,
+            updated_at=now
+        )
+
+@traced("execute_action")
 async def execute_action(action_id: str):
     """Execute an approved action."""
-    if action_id not in fake_actions_db:
+    if action_id not in action_store:
         return
     
-    action = fake_actions_db[action_id]
+    action = action_store[action_id]
     if action["status"] != ActionStatus.APPROVED:
         return
     
     # Get action handler
     action_handler = get_action_handler(action["type"])
     if not action_handler:
-        action["status"] = ActionStatus.FAILED
-        action["result"] = {
-            "error": f"Unsupported action type: {action['type']}"
-        }
-        action["updated_at"] = datetime.now().isoformat()
+        record_action_outcome(action, ValueError(f"Unsupported action type: {action['type']}"))
         return
     
     try:
-        # Execute action
-        result = action_handler.execute(action["parameters"])
-        
-        # Update action record
-        action["status"] = ActionStatus.COMPLETED
-        action["result"] = result
-        action["completed_at"] = datetime.now().isoformat()
-        action["updated_at"] = datetime.now().isoformat()
+        # Execute action through the engine's per-type pool; the key makes redelivered jobs a no-op
+        outcome = await get_action_engine().execute(
+            ActionType(action["type"]).value,
+            action_handler,
+            action["parameters"],
+            idempotency_key=action.get("idempotency_key") or f"action:{action_id}"
+        )
     except Exception as e:
-        # Handle execution error
-        action["status"] = ActionStatus.FAILED
-        action["result"] = {
-            "error": str(e)
-        }
-        action["updated_at"] = datetime.now().isoformat()
+        outcome = e
+    
+    record_action_outcome(action, outcome)
+
+@traced("execute_action_group")
+async def execute_action_group(action_type: ActionType, action_ids: List[str]):
+    """Execute compatible actions with a single batch provider call."""
+    actions = [action_store[action_id] for action_id in action_ids]
+    outcomes = await get_action_engine().execute_batch(
+        action_type.value,
+        get_action_handler(action_type),
+        [
+            (action.get("idempotency_key") or f"action:{action['id']}", action["parameters"])
+            for action in actions
+        ]
+    )
+    for action, outcome in zip(actions, outcomes):
+        record_action_outcome(action, outcome)
+
+async def execute_actions(action_ids: List[str]):
+    """Execute approved actions, coalescing compatible ones into batch provider calls."""
+    groups: Dict[Any, List[str]] = {}
+    singles = []
+    for action_id in action_ids:
+        action = action_store.get(action_id)
+        if action is None or action["status"] != ActionStatus.APPROVED:
+            continue
+        action_handler = get_action_handler(action["type"])
+        batch_key = action_handler.batch_key(action["parameters"]) if action_handler else None
+        if batch_key is None:
+            singles.append(action_id)
+        else:
+            groups.setdefault((ActionType(action["type"]), batch_key), []).append(action_id)
+    
+    executions = [execute_action(action_id) for action_id in singles]
+    for (action_type, _), group_ids in groups.items():
+        if len(group_ids) == 1:
+            executions.append(execute_action(group_ids[0]))
+        else:
+            executions.append(execute_action_group(action_type, group_ids))
+    await asyncio.gather(*executions)
+
+async def execute_action_job(payload: Dict[str, Any]):
+    """Job queue handler for approved actions."""
+    await execute_action(payload["action_id"])
+
+register_job_handler("action.execute", execute_action_job)
+
+async def execute_actions_job(payload: Dict[str, Any]):
+    """Job queue handler for batch-approved actions."""
+    await execute_actions(payload["action_ids"])
+
+register_job_handler("action.execute_batch", execute_actions_job)
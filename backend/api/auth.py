@@ -2,25 +2,34 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from typing import Dict, Any, Optional
 from datetime import datetime, timedelta
-from jose import JWTError, jwt
 from pydantic import BaseModel
+import os
+
+from backend.utils.cache import LRUCache
+from backend.auth.security import get_password_hasher, PasswordHasherBusyError
+from backend.utils.state import create_collection
 
 router = APIRouter()
 
 # Mock user database - in production, use a real database
-fake_users_db = {
-    "user@example.com": {
+fake_users_db = create_collection("users")
+if "user@example.com" not in fake_users_db:
+    fake_users_db["user@example.com"] = {
         "email": "user@example.com",
-        "hashed_password": "$2b$12$EixZaYVK1fsbw1ZfbX3OXePaWxn96p36WQoeG6Lruj3vjPGga31lW",  # "password"
+        "hashed_password": "$2b$12$/hnazIGlddw6StPi5N6JL.5BXLgWR5yckdPA5ono5BcGpljYV3fT6",  # "password"
         "full_name": "Test User",
     }
-}
 
 # JWT configuration
 SECRET_KEY = "YOUR_SECRET_KEY_HERE"  # In production, use a secure key and store in environment variables
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Verified tokens (token -> email, until the token expires) and looked-up users.
+# Set either size to 0 to disable that cache.
+token_cache = LRUCache(int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000")))
+user_cache = LRUCache(int(os.getenv("AUTH_USER_CACHE_SIZE", "10000")))
+
 # Models
 class Token(BaseModel):
     access_token: str
@@ -41,24 +50,53 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
 # Helper functions
 def verify_password(plain_password, hashed_password):
-    # In production, use proper password hashing like bcrypt
-    return plain_password == "password"  # Simplified for demo
+    """Blocking password check; request handlers use the password hasher's async `verify`."""
+    return get_password_hasher().verify_sync(plain_password, hashed_password)
+
+def hashing_busy_exception(e: PasswordHasherBusyError) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many login attempts in progress, please retry shortly",
+        headers={"Retry-After": str(e.retry_after)},
+    )
 
 def get_user(db, email: str):
-    if email in db:
-        user_dict = db[email]
+    user_dict = db.get(email)
+    if user_dict is not None:
         return UserInDB(**user_dict)
     return None
 
-def authenticate_user(fake_db, email: str, password: str):
+def get_cached_user(email: str):
+    """Look up a user through the user cache."""
+    user = user_cache.get(email)
+    if user is None:
+        user = get_user(fake_users_db, email)
+        if user is not None:
+            user_cache.set(email, user)
+    return user
+
+def invalidate_user(email: str):
+    """Drop a user from the cache; call whenever the user's record changes."""
+    user_cache.invalidate(email)
+
+async def authenticate_user(fake_db, email: str, password: str):
     user = get_user(fake_db, email)
-    if not user:
-        return False
-    if not verify_password(password, user.hashed_password):
+    verified, new_hash = await get_password_hasher().verify(
+        password, user.hashed_password if user else None
+    )
+    if not verified:
         return False
+    if new_hash:
+        # Stored with an outdated cost; upgrade now that we have the plain password
+        record = fake_db[email]
+        record["hashed_password"] = new_hash
+        fake_db[email] = record
+        invalidate_user(email)
     return user
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
+    # jose is imported on first use (or by startup warm-up) to keep cold start fast
+    from jose import jwt
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -68,21 +106,29 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def get_user_from_token(token: str):
+    """Resolve a bearer token to its user, or None if the token is invalid."""
+    # A token verified earlier stays valid until its own expiry, so skip the signature check
+    email = token_cache.get(token)
+    if email is None:
+        from jose import JWTError, jwt
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError:
+            return None
+        email = payload.get("sub")
+        if email is None:
+            return None
+        token_cache.set(token, email, expires_at=payload.get("exp"))
+    return get_cached_user(email)
+
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-        token_data = TokenData(email=email)
-    except JWTError:
-        raise credentials_exception
-    user = get_user(fake_users_db, email=token_data.email)
+    user = get_user_from_token(token)
     if user is None:
         raise credentials_exception
     return user
@@ -90,7 +136,10 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
 # Routes
 @router.post("/token", response_model=Token)
 async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()):
-    user = authenticate_user(fake_users_db, form_data.username, form_data.password)
+    try:
+        user = await authenticate_user(fake_users_db, form_data.username, form_data.password)
+    except PasswordHasherBusyError as e:
+        raise hashing_busy_exception(e)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -109,7 +158,22 @@ async def read_users_me(current_user: User = Depends(get_current_user)):
 
 @router.post("/register")
 async def register_user(email: str, password: str, full_name: str):
-    # In production, validate email, hash password, and store in database
+    # In production, validate email and store in a real database
+    if email in fake_users_db:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A user with this email already exists"
+        )
+    try:
+        hashed_password = await get_password_hasher().hash(password)
+    except PasswordHasherBusyError as e:
+        raise hashing_busy_exception(e)
+    fake_users_db[email] = {
+        "email": email,
+        "hashed_password": hashed_password,
+        "full_name": full_name,
+    }
+    invalidate_user(email)
     return {"message": "User registered successfully"}
 
 @router.get("/oauth/{provider}")
@@ -2,9 +2,15 @@ from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
 from datetime import datetime
+import asyncio
+import time
 
 # Import authentication dependencies
 from .auth import get_current_user, User
+from .connectors import connector_generations
+from backend.actions.extraction import get_suggested_action_pipeline
+from backend.utils.state import create_collection, new_id
+from backend.utils.responses import FastJSONResponse
 
 router = APIRouter()
 
@@ -24,6 +30,7 @@ class ChatResponse(BaseModel):
     conversation_id: str
     sources: Optional[List[Dict[str, Any]]] = None
     suggested_actions: Optional[List[Dict[str, Any]]] = None
+    cached: bool = False
 
 class Conversation(BaseModel):
     id: str
@@ -37,8 +44,7 @@ class ConversationList(BaseModel):
     conversations: List[Dict[str, Any]]
 
 # Mock database for conversations
-fake_conversations_db = {}
-conversation_id_counter = 0
+fake_conversations_db = create_collection("conversations", owner_field="user_id")
 
 # Helper functions
 def generate_response(message: str, conversation_id: Optional[str], connector_ids: Optional[List[str]]):
@@ -50,7 +56,8 @@ def generate_response(message: str, conversation_id: Optional[str], connector_id
     2. Format the prompt with the retrieved context
     3. Call the LLM API to generate a response
     4. Extract sources from the retrieved context
-    5. Identify potential actions from the user's message
+    
+    Suggested actions are extracted separately by the suggested-action pipeline.
     """
     # Mock response generation
     response = f"This is a response to: {message}"
@@ -75,39 +82,9 @@ def generate_response(message: str, conversation_id: Optional[str], connector_id
         }
     ]
     
-    # Mock suggested actions
-    suggested_actions = []
-    
-    # Check for action triggers in the message
-    if "email" in message.lower() or "send" in message.lower():
-        suggested_actions.append({
-            "type": "email",
-            "title": "Send Email",
-            "description": "Send an email to the mentioned recipients",
-            "parameters": {
-                "to": "john@example.com",
-                "subject": "Follow-up",
-                "body": "This is a follow-up email regarding our discussion."
-            }
-        })
-    
-    if "schedule" in message.lower() or "meeting" in message.lower():
-        suggested_actions.append({
-            "type": "calendar",
-            "title": "Schedule Meeting",
-            "description": "Create a calendar event",
-            "parameters": {
-                "title": "Follow-up Meeting",
-                "start_time": "2023-01-02T14:00:00Z",
-                "end_time": "2023-01-02T15:00:00Z",
-                "attendees": ["john@example.com", "jane@example.com"]
-            }
-        })
-    
     return {
         "message": response,
-        "sources": sources,
-        "suggested_actions": suggested_actions
+        "sources": sources
     }
 
 # Routes
@@ -117,16 +94,13 @@ async def chat(
     current_user: User = Depends(get_current_user)
 ):
     """Send a message and get a response."""
-    global conversation_id_counter
-    
     # Get or create conversation
     conversation_id = request.conversation_id
     if not conversation_id:
-        conversation_id_counter += 1
-        conversation_id = str(conversation_id_counter)
+        conversation_id = new_id()
         
         # Create new conversation
-        fake_conversations_db[conversation_id] = {
+        conversation = {
             "id": conversation_id,
             "user_id": current_user.email,
             "title": request.message[:30] + "..." if len(request.message) > 30 else request.message,
@@ -134,31 +108,53 @@ async def chat(
             "created_at": datetime.now().isoformat(),
             "updated_at": datetime.now().isoformat()
         }
-    elif conversation_id not in fake_conversations_db:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Conversation with ID {conversation_id} not found"
-        )
-    elif fake_conversations_db[conversation_id]["user_id"] != current_user.email:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this conversation"
-        )
+    else:
+        conversation = fake_conversations_db.get(conversation_id)
+        if conversation is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Conversation with ID {conversation_id} not found"
+            )
+        if conversation["user_id"] != current_user.email:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not authorized to access this conversation"
+            )
     
     # Add user message to conversation
-    conversation = fake_conversations_db[conversation_id]
     conversation["messages"].append({
         "role": "user",
         "content": request.message,
         "timestamp": datetime.now().isoformat()
     })
     
-    # Generate response
-    response_data = generate_response(
-        message=request.message,
-        conversation_id=conversation_id,
-        connector_ids=request.connector_ids
-    )
+    # Start extracting suggested actions; the LLM pass (if enabled) overlaps answer generation
+    extraction = get_suggested_action_pipeline().start(request.message)
+    
+    # Answer from the cache when the user asked nearly the same question over the same data
+    # (imported here so the router doesn't load numpy and the encoders at startup)
+    from backend.embedding.answer_cache import get_answer_cache
+    cache = get_answer_cache()
+    lookup = None
+    if cache is not None:
+        lookup = cache.lookup(
+            request.message,
+            current_user.email,
+            connector_generations(current_user.email, request.connector_ids),
+        )
+    if lookup is not None and lookup.answer is not None:
+        response_data = lookup.answer
+    else:
+        start = time.perf_counter()
+        # Generation blocks, so it runs off the event loop and the LLM extraction pass can overlap it
+        response_data = await asyncio.to_thread(
+            generate_response,
+            message=request.message,
+            conversation_id=conversation_id,
+            connector_ids=request.connector_ids
+        )
+        if lookup is not None:
+            lookup.store(response_data, time.perf_counter() - start)
     
     # Add assistant message to conversation
     conversation["messages"].append({
@@ -169,15 +165,24 @@ async def chat(
     
     # Update conversation
     conversation["updated_at"] = datetime.now().isoformat()
+    fake_conversations_db[conversation_id] = conversation
     
     # Return response
     return {
         "message": response_data["message"],
         "conversation_id": conversation_id,
         "sources": response_data["sources"],
-        "suggested_actions": response_data["suggested_actions"]
+        "suggested_actions": await extraction.result(),
+        "cached": lookup is not None and lookup.answer is not None
     }
 
+@router.get("/cache")
+async def answer_cache_stats(current_user: User = Depends(get_current_user)):
+    """Hit rate and generation time saved by the answer cache."""
+    from backend.embedding.answer_cache import get_answer_cache
+    cache = get_answer_cache()
+    return {"enabled": cache is not None, **(cache.stats() if cache is not None else {})}
+
 @router.get("/conversations", response_model=ConversationList)
 async def list_conversations(current_user: User = Depends(get_current_user)):
     """List all conversations for the current user."""
@@ -189,11 +194,10 @@ async def list_conversations(current_user: User = Depends(get_current_user)):
             "updated_at": conv["updated_at"],
             "message_count": len(conv["messages"])
         }
-        for conv in fake_conversations_db.values()
-        if conv["user_id"] == current_user.email
+        for conv in fake_conversations_db.for_owner(current_user.email)
     ]
     
-    return {"conversations": user_conversations}
+    return FastJSONResponse({"conversations": user_conversations})
 
 @router.get("/conversations/{conversation_id}", response_model=Conversation)
 async def get_conversation(
@@ -201,20 +205,20 @@ async def get_conversation(
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific conversation."""
-    if conversation_id not in fake_conversations_db:
+    conversation = fake_conversations_db.get(conversation_id)
+    if conversation is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Conversation with ID {conversation_id} not found"
         )
     
-    conversation = fake_conversations_db[conversation_id]
     if conversation["user_id"] != current_user.email:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to access this conversation"
         )
     
-    return conversation
+    return FastJSONResponse(conversation)
 
 @router.delete("/conversations/{conversation_id}")
 async def delete_conversation(
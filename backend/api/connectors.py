@@ -1,10 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from typing import List, Dict, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Dict, Any, Optional, Tuple, TYPE_CHECKING
 from pydantic import BaseModel
 from enum import Enum
+from datetime import datetime
+import asyncio
+import inspect
 
 # Import authentication dependencies
 from .auth import get_current_user, User
+from backend.connectors.telemetry import sync_run_store, current_sync_run
+from backend.utils.job_queue import get_job_queue, register_job_handler
+from backend.utils.events import event_bus
+from backend.utils.tracing import traced
+from backend.utils.state import create_collection, new_id
+from backend.utils.responses import FastJSONResponse
+
+if TYPE_CHECKING:
+    from backend.utils.http_client import PooledHTTPClient
 
 router = APIRouter()
 
@@ -37,32 +49,70 @@ class Connector(ConnectorBase):
     user_id: str
     status: ConnectorStatus
     last_sync: Optional[str] = None
+    sync_generation: int = 0
     created_at: str
     updated_at: str
 
 class ConnectorList(BaseModel):
     connectors: List[Connector]
 
-# Mock database for connectors
-fake_connectors_db = {}
-connector_id_counter = 0
+class ConnectorBatchCreate(BaseModel):
+    connectors: List[ConnectorCreate]
+
+class ConnectorBatchIds(BaseModel):
+    connector_ids: List[str]
+
+# Mock database for connectors, indexed by owner so listing doesn't scan every connector
+fake_connectors_db = create_collection("connectors", owner_field="user_id")
+
+# Batch operation limits
+MAX_BATCH_SIZE = 500
+BATCH_CONCURRENCY = 16
+
+# Connector handlers are stateless, so one instance per type is shared by all requests
+_connector_handlers: Dict[ConnectorType, "BaseConnector"] = {}
 
 # Helper functions
 def get_connector_handler(connector_type: ConnectorType):
     """Get the appropriate connector handler based on type."""
-    handlers = {
-        ConnectorType.GMAIL: GmailConnector(),
-        ConnectorType.SLACK: SlackConnector(),
-        ConnectorType.GOOGLE_DRIVE: GoogleDriveConnector(),
-        ConnectorType.NOTION: NotionConnector(),
-        ConnectorType.JIRA: JiraConnector(),
-        ConnectorType.GITHUB: GithubConnector(),
-        ConnectorType.CUSTOM: CustomConnector(),
-    }
-    return handlers.get(connector_type)
+    if not _connector_handlers:
+        _connector_handlers.update({
+            ConnectorType.GMAIL: GmailConnector(),
+            ConnectorType.SLACK: SlackConnector(),
+            ConnectorType.GOOGLE_DRIVE: GoogleDriveConnector(),
+            ConnectorType.NOTION: NotionConnector(),
+            ConnectorType.JIRA: JiraConnector(),
+            ConnectorType.GITHUB: GithubConnector(),
+            ConnectorType.CUSTOM: CustomConnector(),
+        })
+    return _connector_handlers.get(connector_type)
 
 # Base connector class
 class BaseConnector:
+    # Base URL of the provider's REST API
+    api_base_url: str = ""
+
+    @property
+    def http(self) -> "PooledHTTPClient":
+        """Shared pooled HTTP client used for all provider API calls."""
+        # Imported on first use (or by startup warm-up); httpx is slow to import
+        from backend.utils.http_client import get_http_client
+        return get_http_client()
+
+    async def api_request(self, method: str, path: str, **kwargs):
+        """Call the provider API through the shared HTTP client."""
+        response = await self.http.request(method, f"{self.api_base_url}{path}", **kwargs)
+        run = current_sync_run()
+        if run is not None:
+            run.record_api_call(len(response.content))
+        return response
+
+    async def api_get_json(self, path: str, **kwargs):
+        """GET a provider API resource and decode it, revalidating cached copies."""
+        response = await self.api_request("GET", path, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
     def connect(self, config: Dict[str, Any]):
         """Connect to the service."""
         raise NotImplementedError()
@@ -72,7 +122,13 @@ class BaseConnector:
         raise NotImplementedError()
     
     def sync(self):
-        """Sync data from the service."""
+        """
+        Sync data from the service.
+
+        Returns a dict with `items_synced` and optionally `items_skipped` and
+        `items_failed`. May be a coroutine; stages can be timed with
+        `current_sync_run().stage(name)`.
+        """
         raise NotImplementedError()
     
     def get_auth_url(self):
@@ -81,6 +137,8 @@ class BaseConnector:
 
 # Connector implementations
 class GmailConnector(BaseConnector):
+    api_base_url = "https://gmail.googleapis.com/gmail/v1"
+
     def connect(self, config: Dict[str, Any]):
         # Implement Gmail connection logic
         return {"status": "connected", "message": "Successfully connected to Gmail"}
@@ -97,6 +155,8 @@ class GmailConnector(BaseConnector):
         return "https://accounts.google.com/o/oauth2/auth?scope=https://www.googleapis.com/auth/gmail.readonly&response_type=code"
 
 class SlackConnector(BaseConnector):
+    api_base_url = "https://slack.com/api"
+
     def connect(self, config: Dict[str, Any]):
         # Implement Slack connection logic
         return {"status": "connected", "message": "Successfully connected to Slack"}
@@ -113,6 +173,8 @@ class SlackConnector(BaseConnector):
         return "https://slack.com/oauth/authorize"
 
 class GoogleDriveConnector(BaseConnector):
+    api_base_url = "https://www.googleapis.com/drive/v3"
+
     def connect(self, config: Dict[str, Any]):
         return {"status": "connected", "message": "Successfully connected to Google Drive"}
     
@@ -126,6 +188,8 @@ class GoogleDriveConnector(BaseConnector):
         return "https://accounts.google.com/o/oauth2/auth?scope=https://www.googleapis.com/auth/drive.readonly&response_type=code"
 
 class NotionConnector(BaseConnector):
+    api_base_url = "https://api.notion.com/v1"
+
     def connect(self, config: Dict[str, Any]):
         return {"status": "connected", "message": "Successfully connected to Notion"}
     
@@ -139,6 +203,8 @@ class NotionConnector(BaseConnector):
         return "https://api.notion.com/v1/oauth/authorize"
 
 class JiraConnector(BaseConnector):
+    api_base_url = "https://api.atlassian.com"
+
     def connect(self, config: Dict[str, Any]):
         return {"status": "connected", "message": "Successfully connected to Jira"}
     
@@ -152,6 +218,8 @@ class JiraConnector(BaseConnector):
         return "https://auth.atlassian.com/authorize"
 
 class GithubConnector(BaseConnector):
+    api_base_url = "https://api.github.com"
+
     def connect(self, config: Dict[str, Any]):
         return {"status": "connected", "message": "Successfully connected to GitHub"}
     
@@ -177,15 +245,146 @@ class CustomConnector(BaseConnector):
     def get_auth_url(self):
         return config.get("auth_url", "")
 
+@traced("connector.sync")
+async def run_connector_sync(connector_id: str):
+    """Run a connector sync, recording its telemetry and updating `last_sync`."""
+    connector = fake_connectors_db.get(connector_id)
+    if connector is None:
+        return
+
+    connector_type = ConnectorType(connector["type"])
+    connector_handler = get_connector_handler(connector_type)
+    run = sync_run_store.start_run(connector_id, connector_type.value, connector["user_id"])
+    event_bus.publish(run.user_id, "sync.started", run.to_dict())
+
+    try:
+        with run.activate():
+            with run.stage("total"):
+                if inspect.iscoroutinefunction(connector_handler.sync):
+                    result = await connector_handler.sync()
+                else:
+                    # Blocking provider SDKs run off the event loop; the context carries the run along
+                    result = await asyncio.to_thread(connector_handler.sync)
+        run.record_items(
+            fetched=result.get("items_synced", 0),
+            skipped=result.get("items_skipped", 0),
+            failed=result.get("items_failed", 0),
+        )
+        run.finish("success")
+    except Exception as e:
+        run.finish("failed", error=str(e))
+
+    # The record may have changed or been deleted while the sync ran; only update the sync's own fields
+    connector = fake_connectors_db.get(connector_id)
+    if connector is None:
+        return
+    if run.status == "success":
+        connector["last_sync"] = run.finished_at
+        # Answers cached before this sync may be out of date
+        connector["sync_generation"] = connector.get("sync_generation", 0) + 1
+    else:
+        connector["status"] = ConnectorStatus.ERROR
+    connector["updated_at"] = datetime.now().isoformat()
+    fake_connectors_db[connector_id] = connector
+    sync_run_store.save_run(run)
+    event_bus.publish(run.user_id, "sync.completed" if run.status == "success" else "sync.failed", run.to_dict())
+    return run
+
+async def sync_connector_job(payload: Dict[str, Any]):
+    """Job queue handler for connector syncs; failed runs are retried by the queue."""
+    if fake_connectors_db.get(payload["connector_id"]) is None:
+        # Deleted since it was queued, or a worker that doesn't share the API's state;
+        # either way the job mustn't be marked complete
+        raise LookupError(f"Connector {payload['connector_id']} not found")
+    run = await run_connector_sync(payload["connector_id"])
+    if run is not None and run.status == "failed":
+        raise RuntimeError(run.error)
+
+register_job_handler("connector.sync", sync_connector_job)
+
+def save_connector(connector_record: Dict[str, Any]):
+    """Store a connector record."""
+    fake_connectors_db[connector_record["id"]] = connector_record
+
+def remove_connector(connector_id: str):
+    """Remove a connector record and its sync history."""
+    fake_connectors_db.pop(connector_id, None)
+    sync_run_store.delete_runs(connector_id)
+
+def connector_generations(user_email: str, connector_ids: Optional[List[str]]) -> List[Tuple[str, Optional[int]]]:
+    """
+    (connector ID, sync generation) of each connector a chat answer can draw on:
+    the given ones, or all of the user's. Missing connectors get generation None.
+    """
+    if connector_ids is None:
+        connectors = fake_connectors_db.for_owner(user_email)
+        return [(connector["id"], connector.get("sync_generation", 0)) for connector in connectors]
+    generations = []
+    for connector_id in sorted(set(connector_ids)):
+        connector = fake_connectors_db.get(connector_id)
+        generations.append((connector_id, connector.get("sync_generation", 0) if connector else None))
+    return generations
+
+def validate_batch_ids(connector_ids: List[str], user_email: str):
+    """Check that every connector in a batch exists and belongs to the user, before doing any work."""
+    if len(connector_ids) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch size {len(connector_ids)} exceeds the maximum of {MAX_BATCH_SIZE}"
+        )
+    
+    errors = []
+    seen = set()
+    for index, connector_id in enumerate(connector_ids):
+        connector = fake_connectors_db.get(connector_id)
+        if connector_id in seen:
+            errors.append({"index": index, "id": connector_id, "error": "Duplicate connector ID in batch"})
+        elif connector is None:
+            errors.append({"index": index, "id": connector_id, "error": f"Connector with ID {connector_id} not found"})
+        elif connector["user_id"] != user_email:
+            errors.append({"index": index, "id": connector_id, "error": "Not authorized to access this connector"})
+        seen.add(connector_id)
+    
+    if errors:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"message": "Batch validation failed, no connectors were changed", "errors": errors}
+        )
+
+async def run_bounded(items: List[Any], func, concurrency: int = BATCH_CONCURRENCY) -> List[Dict[str, Any]]:
+    """Apply an async function to every item with bounded parallelism, collecting per-item results."""
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def run_one(item):
+        async with semaphore:
+            try:
+                return await func(item)
+            except Exception as e:
+                return {"status": "error", "error": str(e)}
+    
+    return await asyncio.gather(*(run_one(item) for item in items))
+
+def build_connector_record(connector: ConnectorCreate, user_email: str) -> Dict[str, Any]:
+    """Build a new connector record with a fresh ID."""
+    connector_record = {
+        "id": new_id(),
+        "name": connector.name,
+        "type": connector.type,
+        "description": connector.description,
+        "user_id": user_email,
+        "status": ConnectorStatus.PENDING,
+        "last_sync": None,
+        "sync_generation": 0,
+        "created_at": "2023-01-01T00:00:00Z",  # Use actual datetime in production
+        "updated_at": "2023-01-01T00:00:00Z",
+    }
+    return connector_record
+
 # Routes
 @router.get("/", response_model=ConnectorList)
 async def list_connectors(current_user: User = Depends(get_current_user)):
     """List all connectors for the current user."""
-    user_connectors = [
-        connector for connector in fake_connectors_db.values()
-        if connector["user_id"] == current_user.email
-    ]
-    return {"connectors": user_connectors}
+    return FastJSONResponse({"connectors": fake_connectors_db.for_owner(current_user.email)})
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
 async def create_connector(
@@ -193,9 +392,6 @@ async def create_connector(
     current_user: User = Depends(get_current_user)
 ):
     """Create a new connector."""
-    global connector_id_counter
-    connector_id_counter += 1
-    
     connector_handler = get_connector_handler(connector.type)
     if not connector_handler:
         raise HTTPException(
@@ -204,20 +400,8 @@ async def create_connector(
         )
     
     # Create connector record
-    connector_id = str(connector_id_counter)
-    connector_record = {
-        "id": connector_id,
-        "name": connector.name,
-        "type": connector.type,
-        "description": connector.description,
-        "user_id": current_user.email,
-        "status": ConnectorStatus.PENDING,
-        "last_sync": None,
-        "created_at": "2023-01-01T00:00:00Z",  # Use actual datetime in production
-        "updated_at": "2023-01-01T00:00:00Z",
-    }
-    
-    fake_connectors_db[connector_id] = connector_record
+    connector_record = build_connector_record(connector, current_user.email)
+    save_connector(connector_record)
     
     # Get auth URL for OAuth-based connectors
     auth_url = connector_handler.get_auth_url()
@@ -228,6 +412,76 @@ async def create_connector(
         "message": f"Connector {connector.name} created. Please complete authentication."
     }
 
+@router.post("/batch", status_code=status.HTTP_201_CREATED)
+async def create_connectors_batch(
+    batch: ConnectorBatchCreate,
+    current_user: User = Depends(get_current_user)
+):
+    """Create many connectors in one call."""
+    if len(batch.connectors) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch size {len(batch.connectors)} exceeds the maximum of {MAX_BATCH_SIZE}"
+        )
+    
+    errors = [
+        {"index": index, "error": f"Unsupported connector type: {connector.type}"}
+        for index, connector in enumerate(batch.connectors)
+        if not get_connector_handler(connector.type)
+    ]
+    if errors:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"message": "Batch validation failed, no connectors were created", "errors": errors}
+        )
+    
+    async def create_one(connector: ConnectorCreate):
+        connector_record = build_connector_record(connector, current_user.email)
+        auth_url = get_connector_handler(connector.type).get_auth_url()
+        save_connector(connector_record)
+        return {"status": "created", "connector": connector_record, "auth_url": auth_url}
+    
+    results = await run_bounded(batch.connectors, create_one)
+    return {"results": results}
+
+@router.post("/batch/sync", status_code=status.HTTP_202_ACCEPTED)
+async def sync_connectors_batch(
+    batch: ConnectorBatchIds,
+    current_user: User = Depends(get_current_user)
+):
+    """Start syncs for many connectors in one call."""
+    validate_batch_ids(batch.connector_ids, current_user.email)
+    
+    job_ids = get_job_queue().enqueue_many(
+        "connector.sync",
+        [{"connector_id": connector_id} for connector_id in batch.connector_ids]
+    )
+    
+    return {
+        "results": [
+            {"id": connector_id, "status": "queued", "job_id": job_id}
+            for connector_id, job_id in zip(batch.connector_ids, job_ids)
+        ]
+    }
+
+@router.post("/batch/delete")
+async def delete_connectors_batch(
+    batch: ConnectorBatchIds,
+    current_user: User = Depends(get_current_user)
+):
+    """Delete many connectors in one call."""
+    validate_batch_ids(batch.connector_ids, current_user.email)
+    
+    async def delete_one(connector_id: str):
+        connector_handler = get_connector_handler(fake_connectors_db[connector_id]["type"])
+        if connector_handler:
+            await asyncio.to_thread(connector_handler.disconnect)
+        remove_connector(connector_id)
+        return {"id": connector_id, "status": "deleted"}
+    
+    results = await run_bounded(batch.connector_ids, delete_one)
+    return {"results": results}
+
 @router.get("/{connector_id}")
 async def get_connector(
     connector_id: str,
@@ -274,14 +528,13 @@ async def delete_connector(
         connector_handler.disconnect()
     
     # Delete connector
-    del fake_connectors_db[connector_id]
+    remove_connector(connector_id)
     
     return {"message": f"Connector {connector_id} deleted successfully"}
 
 @router.post("/{connector_id}/sync", status_code=status.HTTP_202_ACCEPTED)
 async def sync_connector(
     connector_id: str,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user)
 ):
     """Sync data from a connector."""
@@ -306,11 +559,32 @@ async def sync_connector(
             detail=f"Unsupported connector type: {connector['type']}"
         )
     
-    # Add sync task to background tasks
-    # In a real implementation, this would be a more complex async task
-    background_tasks.add_task(connector_handler.sync)
+    # Queue the sync on the durable job queue; a worker picks it up
+    job_id = get_job_queue().enqueue("connector.sync", {"connector_id": connector_id})
+    
+    return {"message": f"Sync started for connector {connector_id}", "job_id": job_id}
+
+@router.get("/{connector_id}/runs")
+async def list_connector_runs(
+    connector_id: str,
+    limit: int = 20,
+    current_user: User = Depends(get_current_user)
+):
+    """List recent sync runs for a connector, newest first."""
+    if connector_id not in fake_connectors_db:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Connector with ID {connector_id} not found"
+        )
+    
+    connector = fake_connectors_db[connector_id]
+    if connector["user_id"] != current_user.email:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access this connector"
+        )
     
-    return {"message": f"Sync started for connector {connector_id}"}
+    return {"runs": sync_run_store.list_runs(connector_id, limit=limit)}
 
 @router.post("/{connector_id}/oauth/callback")
 async def oauth_callback(
@@ -344,6 +618,7 @@ async def oauth_callback(
     # For this example, we'll just update the connector status
     connector["status"] = ConnectorStatus.CONNECTED
     connector["updated_at"] = "2023-01-01T00:00:00Z"  # Use actual datetime in production
+    fake_connectors_db[connector_id] = connector
     
     return {
         "message": f"Successfully authenticated connector {connector_id}",
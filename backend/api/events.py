@@ -0,0 +1,68 @@
+from fastapi import APIRouter, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+import asyncio
+import json
+
+# Import authentication dependencies
+from .auth import get_user_from_token
+from backend.utils.events import event_bus
+
+router = APIRouter()
+
+# Seconds between keep-alive messages on idle streams
+KEEPALIVE_INTERVAL = 15.0
+
+# Browsers can't set headers on WebSocket or EventSource connections, so both
+# endpoints take the access token as a query parameter.
+
+@router.websocket("/ws")
+async def event_socket(websocket: WebSocket, token: str = Query(...)):
+    """Push action and sync status events for the authenticated user."""
+    user = get_user_from_token(token)
+    if user is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    subscription = event_bus.subscribe(user.email)
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), KEEPALIVE_INTERVAL)
+            except asyncio.TimeoutError:
+                event = {"type": "ping"}
+            await websocket.send_json(event)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        subscription.close()
+
+@router.get("/stream")
+async def event_stream(token: str = Query(...)):
+    """Server-Sent Events variant of the event channel, for clients without WebSocket support."""
+    user = get_user_from_token(token)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials"
+        )
+
+    subscription = event_bus.subscribe(user.email)
+
+    async def stream():
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1 @@
+# Auth package initialization
@@ -0,0 +1,130 @@
+from typing import Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import os
+import threading
+
+import bcrypt
+
+# bcrypt only uses the first 72 bytes of a password
+BCRYPT_MAX_BYTES = 72
+
+
+class PasswordHasherBusyError(Exception):
+    """Too many hashing operations are already queued; the caller should back off."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Password hashing is at capacity")
+        self.retry_after = retry_after
+
+
+def _encode(password: str) -> bytes:
+    return password.encode("utf-8")[:BCRYPT_MAX_BYTES]
+
+
+def hash_rounds(hashed_password: str) -> Optional[int]:
+    """Cost factor of a bcrypt hash ("$2b$12$..." -> 12), or None if it isn't one."""
+    parts = hashed_password.split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+class PasswordHasher:
+    """
+    bcrypt hashing off the event loop.
+
+    Hashes run in a small dedicated thread pool (bcrypt releases the GIL), so a
+    login costs the event loop nothing. At most `max_workers + max_queue`
+    operations are admitted at once; beyond that calls fail fast with
+    PasswordHasherBusyError instead of queueing behind a login storm.
+    """
+
+    def __init__(self, rounds: int = 12, max_workers: int = 2, max_queue: int = 32):
+        self.rounds = rounds
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password")
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        # Used to spend the same time on unknown users as on known ones; made on first use
+        self._dummy_hash: Optional[str] = None
+
+    def hash_sync(self, password: str) -> str:
+        return bcrypt.hashpw(_encode(password), bcrypt.gensalt(self.rounds)).decode()
+
+    def verify_sync(self, password: str, hashed_password: str) -> bool:
+        try:
+            return bcrypt.checkpw(_encode(password), hashed_password.encode())
+        except ValueError:
+            # Not a bcrypt hash
+            return False
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """Whether a hash was made with a different cost than the current one."""
+        return hash_rounds(hashed_password) != self.rounds
+
+    def prepare(self):
+        """Make the dummy hash ahead of the first failed login; used by startup warm-up."""
+        if self._dummy_hash is None:
+            self._dummy_hash = self.hash_sync("dummy-password")
+
+    def _verify_dummy(self, password: str) -> bool:
+        self.prepare()
+        self.verify_sync(password, self._dummy_hash)
+        return False
+
+    def _verify_and_upgrade(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        if not self.verify_sync(password, hashed_password):
+            return False, None
+        if self.needs_rehash(hashed_password):
+            return True, self.hash_sync(password)
+        return True, None
+
+    async def _submit(self, func, *args):
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                # Roughly how long the backlog takes to drain, rounded up to whole seconds
+                raise PasswordHasherBusyError(retry_after=max(1, self.max_queue // (self.max_workers * 4)))
+            self._in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    async def hash(self, password: str) -> str:
+        """Hash a password with the current cost."""
+        return await self._submit(self.hash_sync, password)
+
+    async def verify(self, password: str, hashed_password: Optional[str]) -> Tuple[bool, Optional[str]]:
+        """
+        Check a password against its stored hash.
+
+        Args:
+            password: The plain-text password
+            hashed_password: The stored hash, or None if the user doesn't exist
+
+        Returns:
+            Whether the password matches, and a new hash to store if the stored one used an outdated cost
+        """
+        if hashed_password is None:
+            await self._submit(self._verify_dummy, password)
+            return False, None
+        return await self._submit(self._verify_and_upgrade, password, hashed_password)
+
+
+# Singleton instance, created on first use
+_password_hasher: Optional[PasswordHasher] = None
+
+
+def get_password_hasher() -> PasswordHasher:
+    """Get the process-wide password hasher."""
+    global _password_hasher
+    if _password_hasher is None:
+        _password_hasher = PasswordHasher(
+            rounds=int(os.getenv("PASSWORD_HASH_ROUNDS", "12")),
+            max_workers=int(os.getenv("PASSWORD_HASH_WORKERS", "2")),
+            max_queue=int(os.getenv("PASSWORD_HASH_QUEUE", "32")),
+        )
+    return _password_hasher
@@ -0,0 +1 @@
+# Connectors package initialization
@@ -0,0 +1,188 @@
+from typing import Dict, Any, Optional, List
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+import threading
+import time
+import uuid
+
+from backend.utils.metrics import metrics_registry, HistogramData, DEFAULT_BUCKETS
+from backend.utils.events import event_bus
+from backend.utils.state import create_collection
+
+# Number of runs kept per connector for the runs endpoint
+MAX_RUNS_PER_CONNECTOR = 100
+
+# Minimum seconds between progress events for a run
+PROGRESS_EVENT_INTERVAL = 0.5
+
+# Aggregated sync metrics, labelled by provider so slow providers stand out
+SYNC_RUNS = metrics_registry.counter(
+    "connector_sync_runs_total", "Connector sync runs by outcome", ["connector_type", "status"]
+)
+SYNC_ITEMS = metrics_registry.counter(
+    "connector_sync_items_total", "Items processed by connector syncs", ["connector_type", "outcome"]
+)
+SYNC_BYTES = metrics_registry.counter(
+    "connector_sync_bytes_total", "Bytes downloaded by connector syncs", ["connector_type"]
+)
+SYNC_API_CALLS = metrics_registry.counter(
+    "connector_sync_api_calls_total", "Provider API calls made by connector syncs", ["connector_type"]
+)
+SYNC_DURATION = metrics_registry.histogram(
+    "connector_sync_duration_seconds", "Wall-clock duration of connector sync runs", ["connector_type"]
+)
+SYNC_STAGE_DURATION = metrics_registry.histogram(
+    "connector_sync_stage_duration_seconds", "Duration of connector sync stages", ["connector_type", "stage"]
+)
+
+# The sync run being executed in the current task, if any
+_current_sync_run: ContextVar[Optional["SyncRun"]] = ContextVar("current_sync_run", default=None)
+
+
+def current_sync_run() -> Optional["SyncRun"]:
+    """Get the sync run active in the current context, if any."""
+    return _current_sync_run.get()
+
+
+class SyncRun:
+    """Telemetry for a single connector sync run."""
+
+    def __init__(self, connector_id: str, connector_type: str, user_id: str):
+        self.id = uuid.uuid4().hex
+        self.connector_id = connector_id
+        self.connector_type = connector_type
+        self.user_id = user_id
+        self.status = "running"
+        self.error: Optional[str] = None
+        self.started_at = datetime.now().isoformat()
+        self.finished_at: Optional[str] = None
+        self.duration_seconds: Optional[float] = None
+        self.items_fetched = 0
+        self.items_skipped = 0
+        self.items_failed = 0
+        self.bytes_downloaded = 0
+        self.api_calls = 0
+        self.stages: Dict[str, HistogramData] = {}
+        self._started = time.perf_counter()
+        self._last_progress = 0.0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def activate(self):
+        """Make this run the current one so API calls and stages are attributed to it."""
+        token = _current_sync_run.set(self)
+        try:
+            yield self
+        finally:
+            _current_sync_run.reset(token)
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a stage of the sync (fetch, parse, index, ...)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_stage(name, time.perf_counter() - start)
+
+    def observe_stage(self, name: str, seconds: float):
+        with self._lock:
+            histogram = self.stages.get(name)
+            if histogram is None:
+                histogram = self.stages[name] = HistogramData(DEFAULT_BUCKETS)
+            histogram.observe(seconds)
+        SYNC_STAGE_DURATION.observe(seconds, connector_type=self.connector_type, stage=name)
+        self.publish_progress(name)
+
+    def publish_progress(self, stage: str):
+        """Tell the owner's event streams which stage just finished, at most every PROGRESS_EVENT_INTERVAL."""
+        now = time.perf_counter()
+        with self._lock:
+            if now - self._last_progress < PROGRESS_EVENT_INTERVAL:
+                return
+            self._last_progress = now
+        event_bus.publish(self.user_id, "sync.progress", {**self.to_dict(), "stage": stage})
+
+    def record_items(self, fetched: int = 0, skipped: int = 0, failed: int = 0):
+        with self._lock:
+            self.items_fetched += fetched
+            self.items_skipped += skipped
+            self.items_failed += failed
+
+    def record_api_call(self, bytes_downloaded: int = 0):
+        with self._lock:
+            self.api_calls += 1
+            self.bytes_downloaded += bytes_downloaded
+
+    def finish(self, status: str, error: Optional[str] = None):
+        """Mark the run as finished and fold it into the aggregated metrics."""
+        self.status = status
+        self.error = error
+        self.finished_at = datetime.now().isoformat()
+        self.duration_seconds = time.perf_counter() - self._started
+
+        connector_type = self.connector_type
+        SYNC_RUNS.inc(connector_type=connector_type, status=status)
+        SYNC_ITEMS.inc(self.items_fetched, connector_type=connector_type, outcome="fetched")
+        SYNC_ITEMS.inc(self.items_skipped, connector_type=connector_type, outcome="skipped")
+        SYNC_ITEMS.inc(self.items_failed, connector_type=connector_type, outcome="failed")
+        SYNC_BYTES.inc(self.bytes_downloaded, connector_type=connector_type)
+        SYNC_API_CALLS.inc(self.api_calls, connector_type=connector_type)
+        SYNC_DURATION.observe(self.duration_seconds, connector_type=connector_type)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "connector_id": self.connector_id,
+            "connector_type": self.connector_type,
+            "status": self.status,
+            "error": self.error,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "duration_seconds": self.duration_seconds,
+            "items_fetched": self.items_fetched,
+            "items_skipped": self.items_skipped,
+            "items_failed": self.items_failed,
+            "bytes_downloaded": self.bytes_downloaded,
+            "api_calls": self.api_calls,
+            "stage_latencies": {name: data.to_dict() for name, data in self.stages.items()},
+        }
+
+
+class SyncRunStore:
+    """
+    Keeps the most recent sync runs for each connector.
+
+    Runs are stored as dicts in a state collection, so every worker sees
+    runs started by the others. A run is saved when it starts and again by
+    `save_run` once it has finished.
+    """
+
+    def __init__(self, max_runs_per_connector: int = MAX_RUNS_PER_CONNECTOR):
+        self.max_runs_per_connector = max_runs_per_connector
+        self._runs = create_collection("sync_runs", owner_field="connector_id")
+
+    def start_run(self, connector_id: str, connector_type: str, user_id: str) -> SyncRun:
+        run = SyncRun(connector_id, connector_type, user_id)
+        self.save_run(run)
+        runs = self._runs.for_owner(connector_id)
+        for old_run in runs[:len(runs) - self.max_runs_per_connector]:
+            self._runs.pop(old_run["id"])
+        return run
+
+    def save_run(self, run: SyncRun):
+        self._runs[run.id] = run.to_dict()
+
+    def list_runs(self, connector_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """List runs for a connector as dicts, newest first."""
+        runs = self._runs.for_owner(connector_id)[::-1]
+        return runs[:limit] if limit else runs
+
+    def delete_runs(self, connector_id: str):
+        for run in self._runs.for_owner(connector_id):
+            self._runs.pop(run["id"])
+
+
+# Singleton instance
+sync_run_store = SyncRunStore()
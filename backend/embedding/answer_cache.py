@@ -0,0 +1,178 @@
+from typing import List, Dict, Any, Optional, Hashable, Sequence
+import os
+import threading
+import time
+
+import numpy as np
+
+from backend.embedding.encoders import BaseEncoder, create_encoder
+from backend.utils.cache import LRUCache
+from backend.utils.metrics import metrics_registry
+
+ANSWER_CACHE_LOOKUPS = metrics_registry.counter(
+    "answer_cache_lookups_total", "Chat answer cache lookups", ["outcome"]
+)
+ANSWER_CACHE_SAVED = metrics_registry.counter(
+    "answer_cache_saved_seconds_total", "Answer generation time saved by chat answer cache hits"
+)
+
+
+class _Scope:
+    """Cached answers that can be served to one scope, with their query vectors as one matrix."""
+
+    def __init__(self, dimensions: int):
+        self.vectors = np.zeros((0, dimensions), dtype=np.float32)
+        self.entries: List[Dict[str, Any]] = []
+
+    def drop(self, keep: np.ndarray):
+        self.vectors = self.vectors[keep]
+        self.entries = [entry for entry, kept in zip(self.entries, keep) if kept]
+
+
+class AnswerLookup:
+    """
+    Result of a cache lookup: the cached answer on a hit, or a handle to
+    store the freshly generated one on a miss without embedding the
+    query again.
+    """
+
+    def __init__(self, cache: "SemanticAnswerCache", scope: Hashable, vector: np.ndarray, answer: Optional[Dict[str, Any]]):
+        self.cache = cache
+        self.scope = scope
+        self.vector = vector
+        self.answer = answer
+
+    def store(self, answer: Dict[str, Any], seconds: float):
+        """
+        Cache a generated answer for this lookup's query.
+
+        Args:
+            answer: The answer, with its message and sources
+            seconds: How long generating it took, credited as saved on each hit
+        """
+        self.cache._store(self.scope, self.vector, answer, seconds)
+
+
+class SemanticAnswerCache:
+    """
+    Chat answers cached by the meaning of the question.
+
+    Queries are embedded, and a query is answered from the cache when a
+    previous query in the same scope comes within `threshold` cosine
+    similarity and its answer is younger than `ttl` seconds. A scope is
+    the user, the connectors the answer may draw on and the sync
+    generation of each, so a finished sync moves later questions to a
+    fresh scope and the old one ages out of the LRU.
+
+    How near-duplicate a question must be depends on the encoder: the
+    lexical local encoder scores "today" against "tomorrow" about as high
+    as a rephrasing, so the default threshold only admits near-verbatim
+    repeats.
+    """
+
+    def __init__(
+        self,
+        encoder: Optional[BaseEncoder] = None,
+        threshold: float = 0.95,
+        ttl: float = 300.0,
+        max_entries: int = 128,
+        max_scopes: int = 10_000,
+    ):
+        """
+        Args:
+            encoder: Embeds queries; the configured embedding encoder by default
+            threshold: Minimum cosine similarity between queries for a hit
+            ttl: Seconds a cached answer is served for
+            max_entries: Answers kept per scope, oldest dropped first
+            max_scopes: Scopes kept, least recently used dropped first
+        """
+        self.encoder = encoder or create_encoder()
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.scopes = LRUCache(max_scopes)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+    def lookup(self, query: str, user_id: str, connectors: Sequence[Hashable]) -> AnswerLookup:
+        """
+        Find a cached answer to a question.
+
+        Args:
+            query: The user's message
+            user_id: The user asking
+            connectors: (connector ID, sync generation) pairs the answer may draw on
+
+        Returns:
+            The lookup; its `answer` is None on a miss
+        """
+        start = time.perf_counter()
+        vector = self.encoder.encode([query])[0]
+        vector /= max(float(np.linalg.norm(vector)), 1e-12)
+        key = (user_id, tuple(connectors))
+        answer = None
+        with self._lock:
+            scope = self.scopes.get(key)
+            if scope is not None and scope.entries:
+                now = time.time()
+                scope.drop(np.array([entry["expires_at"] > now for entry in scope.entries], dtype=bool))
+                if scope.entries:
+                    similarities = scope.vectors @ vector
+                    best = int(np.argmax(similarities))
+                    if similarities[best] >= self.threshold:
+                        entry = scope.entries[best]
+                        answer = entry["answer"]
+                        saved = max(entry["seconds"] - (time.perf_counter() - start), 0.0)
+            if answer is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.saved_seconds += saved
+        ANSWER_CACHE_LOOKUPS.inc(outcome="miss" if answer is None else "hit")
+        if answer is not None:
+            ANSWER_CACHE_SAVED.inc(saved)
+        return AnswerLookup(self, key, vector, answer)
+
+    def _store(self, key: Hashable, vector: np.ndarray, answer: Dict[str, Any], seconds: float):
+        with self._lock:
+            scope = self.scopes.get(key)
+            if scope is None:
+                scope = _Scope(len(vector))
+                self.scopes.set(key, scope)
+            if len(scope.entries) >= self.max_entries:
+                keep = np.ones(len(scope.entries), dtype=bool)
+                keep[:len(scope.entries) - self.max_entries + 1] = False
+                scope.drop(keep)
+            scope.vectors = np.vstack([scope.vectors, vector[None, :]])
+            scope.entries.append({"answer": answer, "seconds": seconds, "expires_at": time.time() + self.ttl})
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "saved_seconds": self.saved_seconds,
+                "scopes": len(self.scopes),
+                "threshold": self.threshold,
+                "ttl": self.ttl,
+            }
+
+
+# Singleton instance, created on first use
+_answer_cache: Optional[SemanticAnswerCache] = None
+
+
+def get_answer_cache() -> Optional[SemanticAnswerCache]:
+    """The chat answer cache, or None when ANSWER_CACHE_ENABLED is false."""
+    global _answer_cache
+    if _answer_cache is None and os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true":
+        _answer_cache = SemanticAnswerCache(
+            threshold=float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95")),
+            ttl=float(os.getenv("ANSWER_CACHE_TTL", "300")),
+            max_scopes=int(os.getenv("ANSWER_CACHE_MAX_SCOPES", "10000")),
+        )
+    return _answer_cache
@@ -0,0 +1,317 @@
+from typing import List, Dict, Any, Optional, Sequence, Union
+from bisect import bisect
+from collections import deque
+import asyncio
+import hashlib
+import itertools
+import logging
+import os
+
+from backend.embedding.service import EmbeddingService, get_embedding_service, new_document_id
+from backend.embedding.node import TOKEN_HEADER
+from backend.utils.http_client import PooledHTTPClient
+from backend.utils.metrics import metrics_registry
+
+logger = logging.getLogger(__name__)
+
+INDEX_NODE_REQUESTS = metrics_registry.counter(
+    "index_node_requests_total", "Requests from the coordinator to index nodes", ["operation", "outcome"]
+)
+INDEX_SHARD_LATENCY = metrics_registry.histogram(
+    "index_shard_latency_seconds", "Latency of a shard's answer to the coordinator, hedges included", ["operation"]
+)
+
+# Recent latencies kept per shard to set its hedge delay
+LATENCY_WINDOW = 200
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """
+    Consistent hash ring: each shard owns `virtual_nodes` points, and a key
+    belongs to the shard owning the first point at or after its hash, so
+    adding a shard only moves the keys it takes over.
+    """
+
+    def __init__(self, shards: Sequence[str], virtual_nodes: int = 64):
+        points = sorted((_hash(f"{shard}#{i}"), shard) for shard in shards for i in range(virtual_nodes))
+        self._hashes = [point for point, _ in points]
+        self._shards = [shard for _, shard in points]
+
+    def shard_for(self, key: str) -> str:
+        index = bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._shards[index]
+
+
+class Shard:
+    """A partition of the corpus and the replica nodes serving it."""
+
+    def __init__(self, name: str, replicas: List[str]):
+        self.name = name
+        self.replicas = replicas
+        self._next = itertools.cycle(range(len(replicas)))
+        self.latencies: deque = deque(maxlen=LATENCY_WINDOW)
+
+    def replica_order(self) -> List[str]:
+        """Replicas to try, rotating the first choice to spread load."""
+        start = next(self._next)
+        return self.replicas[start:] + self.replicas[:start]
+
+    def hedge_delay(self, default: Optional[float]) -> Optional[float]:
+        """Time to wait for a replica before hedging: the 95th percentile of recent latencies, once known."""
+        if default is None or len(self.latencies) < 20:
+            return default
+        latencies = sorted(self.latencies)
+        return latencies[int(0.95 * (len(latencies) - 1))]
+
+
+class IndexCoordinator:
+    """
+    Routes ingest to index nodes and fans searches out across them.
+
+    Documents are placed by a consistent hash of their user (or, without
+    one, their document ID) and written to every replica of the owning
+    shard, so a user's documents live on one shard and searches filtered
+    to one user only query that shard. Other searches go to every shard.
+
+    Each shard is asked through one replica; if it hasn't answered after
+    the shard's hedge delay (the 95th percentile of its recent latencies),
+    the next replica is asked too and the first answer wins. A failed
+    replica is replaced straight away. Shards that don't answer within
+    `timeout` are left out, and the shards' top-k lists are merged by
+    score. Per-document caps hold exactly because a document's chunks
+    share a shard; MMR is applied per shard.
+    """
+
+    def __init__(
+        self,
+        shards: Sequence[Sequence[str]],
+        timeout: float = 1.0,
+        hedge_after: Optional[float] = 0.05,
+        virtual_nodes: int = 64,
+        token: Optional[str] = None,
+        client: Optional[PooledHTTPClient] = None,
+    ):
+        """
+        Args:
+            shards: Base URLs of each shard's replica nodes
+            timeout: Seconds to wait for a shard before leaving it out
+            hedge_after: Hedge delay until a shard has latency history; None
+                disables hedging (failed replicas are still replaced)
+            virtual_nodes: Points per shard on the hash ring
+            token: Shared secret sent to the nodes (INDEX_NODE_TOKEN)
+            client: HTTP client; one without retries is created by default
+        """
+        if not shards or not all(shards):
+            raise ValueError("Every shard needs at least one replica")
+        self.shards = {f"shard-{i}": Shard(f"shard-{i}", list(replicas)) for i, replicas in enumerate(shards)}
+        self.ring = HashRing(list(self.shards), virtual_nodes)
+        self.timeout = timeout
+        self.hedge_after = hedge_after
+        self.headers = {TOKEN_HEADER: token} if token else {}
+        # Hedging and failover replace retries
+        self.client = client or PooledHTTPClient(timeout=timeout, max_retries=0)
+
+    def shard_for(self, metadata: Dict[str, Any], document_id: str) -> Shard:
+        return self.shards[self.ring.shard_for(str(metadata.get("user_id") or document_id))]
+
+    async def _call(self, replica: str, method: str, path: str, body: Optional[Dict[str, Any]]) -> Any:
+        response = await self.client.request(
+            method, f"{replica.rstrip('/')}{path}",
+            headers=self.headers, json=body, timeout=self.timeout, conditional=False,
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def _hedged(self, shard: Shard, operation: str, method: str, path: str, body: Optional[Dict[str, Any]]) -> Any:
+        """
+        Get one answer from a shard, hedging slow replicas and failing over
+        from broken ones.
+
+        Returns:
+            The first successful response, or None if none came within the timeout
+        """
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        deadline = start + self.timeout
+        hedge_delay = shard.hedge_delay(self.hedge_after)
+        replicas = iter(shard.replica_order())
+        pending = {asyncio.ensure_future(self._call(next(replicas), method, path, body))}
+        try:
+            while pending:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    INDEX_NODE_REQUESTS.inc(operation=operation, outcome="timeout")
+                    return None
+                wait = remaining if hedge_delay is None else min(hedge_delay, remaining)
+                done, pending = await asyncio.wait(pending, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        latency = loop.time() - start
+                        shard.latencies.append(latency)
+                        INDEX_SHARD_LATENCY.observe(latency, operation=operation)
+                        INDEX_NODE_REQUESTS.inc(operation=operation, outcome="ok")
+                        return task.result()
+                    INDEX_NODE_REQUESTS.inc(operation=operation, outcome="error")
+                    logger.warning("Index node request to %s failed: %r", shard.name, task.exception())
+                # Hedge when every outstanding request is slow, fail over when one failed
+                replica = next(replicas, None) if done or hedge_delay is not None else None
+                if replica is not None:
+                    if not done:
+                        INDEX_NODE_REQUESTS.inc(operation=operation, outcome="hedged")
+                    pending.add(asyncio.ensure_future(self._call(replica, method, path, body)))
+            return None
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def process_document(
+        self,
+        content: str,
+        metadata: Dict[str, Any],
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        document_id: Optional[str] = None
+    ) -> List[str]:
+        """
+        Ingest a document on every replica of its shard.
+
+        Succeeds if at least one replica stored it; replicas that failed are
+        logged and miss the document until it is ingested again.
+
+        Returns:
+            List of document chunk IDs
+        """
+        document_id = document_id or new_document_id(content)
+        shard = self.shard_for(metadata, document_id)
+        body = {
+            "content": content,
+            "metadata": metadata,
+            "document_id": document_id,
+            "chunk_size": chunk_size,
+            "chunk_overlap": chunk_overlap,
+        }
+        results = await asyncio.gather(
+            *(self._call(replica, "POST", "/documents", body) for replica in shard.replicas),
+            return_exceptions=True,
+        )
+        stored = [result for result in results if not isinstance(result, BaseException)]
+        for replica, result in zip(shard.replicas, results):
+            outcome = "error" if isinstance(result, BaseException) else "ok"
+            INDEX_NODE_REQUESTS.inc(operation="ingest", outcome=outcome)
+            if outcome == "error":
+                logger.warning("Ingest of %s on %s failed: %r", document_id, replica, result)
+        if not stored:
+            raise RuntimeError(f"No replica of {shard.name} stored document {document_id}")
+        return stored[0]["chunk_ids"]
+
+    async def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        filter_criteria: Optional[Dict[str, Any]] = None,
+        **options
+    ) -> List[Dict[str, Any]]:
+        """
+        Search every shard that can hold matches and merge their top-k.
+
+        Takes the same arguments as `EmbeddingService.search`.
+        """
+        user_id = (filter_criteria or {}).get("user_id")
+        if isinstance(user_id, str):
+            shards = [self.shard_for({"user_id": user_id}, "")]
+        else:
+            shards = list(self.shards.values())
+        body = {"query": query, "top_k": top_k, "filter_criteria": filter_criteria, **options}
+        responses = await asyncio.gather(*(self._hedged(shard, "search", "POST", "/search", body) for shard in shards))
+        missing = [shard.name for shard, response in zip(shards, responses) if response is None]
+        if missing:
+            logger.warning("Search answered without %s", ", ".join(missing))
+
+        merged: Dict[str, Dict[str, Any]] = {}
+        for response in responses:
+            for result in (response or {}).get("results", []):
+                merged.setdefault(result["chunk_id"], result)
+        return sorted(merged.values(), key=lambda result: result["score"], reverse=True)[:top_k]
+
+    async def delete_document(self, document_id: str) -> int:
+        """Delete a document from every node (its shard depends on a user ID the caller may not know)."""
+        replicas = [replica for shard in self.shards.values() for replica in shard.replicas]
+        results = await asyncio.gather(
+            *(self._call(replica, "DELETE", f"/documents/{document_id}", None) for replica in replicas),
+            return_exceptions=True,
+        )
+        deleted = {}
+        for replica, result in zip(replicas, results):
+            if isinstance(result, BaseException):
+                logger.warning("Delete of %s on %s failed: %r", document_id, replica, result)
+            else:
+                deleted[replica] = result["deleted"]
+        shard_counts = [
+            max((deleted.get(replica, 0) for replica in shard.replicas), default=0) for shard in self.shards.values()
+        ]
+        return sum(shard_counts)
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """Per-shard statistics, with document and chunk counts summed over shards."""
+        names = list(self.shards)
+        responses = await asyncio.gather(
+            *(self._hedged(self.shards[name], "stats", "GET", "/stats", None) for name in names)
+        )
+        shards = {}
+        for name, response in zip(names, responses):
+            shards[name] = {"replicas": self.shards[name].replicas, "stats": response}
+        answered = [response for response in responses if response is not None]
+        return {
+            "document_count": sum(stats["document_count"] for stats in answered),
+            "chunk_count": sum(stats["chunk_count"] for stats in answered),
+            "shards": shards,
+            "unavailable_shards": [name for name, response in zip(names, responses) if response is None],
+        }
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+def parse_index_nodes(value: str) -> List[List[str]]:
+    """Parse INDEX_NODES: shards separated by ";", each a comma-separated list of replica URLs."""
+    return [
+        [url.strip() for url in shard.split(",") if url.strip()]
+        for shard in value.split(";")
+        if shard.strip()
+    ]
+
+
+# Singleton instance, created on first use
+_index_coordinator: Optional[IndexCoordinator] = None
+
+
+def get_index_coordinator() -> Optional[IndexCoordinator]:
+    """The coordinator for INDEX_NODES, or None when this process searches its own index."""
+    global _index_coordinator
+    if _index_coordinator is None and os.getenv("INDEX_NODES"):
+        _index_coordinator = IndexCoordinator(
+            parse_index_nodes(os.environ["INDEX_NODES"]),
+            timeout=float(os.getenv("INDEX_TIMEOUT_MS", "1000")) / 1000,
+            hedge_after=float(os.getenv("INDEX_HEDGE_MS", "50")) / 1000,
+            token=os.getenv("INDEX_NODE_TOKEN"),
+        )
+    return _index_coordinator
+
+
+def get_search_index() -> Union[IndexCoordinator, EmbeddingService]:
+    """
+    The index the API ingests into and searches: the index nodes' coordinator
+    when INDEX_NODES is set, otherwise this process's own index. Both offer
+    async `process_document` and `search` with the same arguments.
+    """
+    return get_index_coordinator() or get_embedding_service()
+
+
+async def close_index_coordinator():
+    """Close the coordinator's connections, if it was created."""
+    if _index_coordinator is not None:
+        await _index_coordinator.aclose()
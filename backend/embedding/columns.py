@@ -0,0 +1,170 @@
+from typing import Dict, Any, Optional, Sequence, Tuple
+from datetime import datetime, timezone
+import time
+
+import numpy as np
+
+# Metadata fields kept as integer-coded columns; document_id groups chunks for the per-document cap
+CATEGORICAL_FIELDS = ("source_type", "connector_id", "document_id")
+
+# The chunk's timestamp is the first of these metadata fields present: the
+# source item's own time if the connector provides one, otherwise ingest time
+TIMESTAMP_FIELDS = ("created_at", "processed_at")
+
+# Filter key for range filters on the timestamp column
+TIMESTAMP_FILTER = "timestamp"
+
+_RANGE_OPERATORS = ("gt", "gte", "lt", "lte")
+
+
+def to_epoch(value: Any) -> float:
+    """Convert a timestamp (epoch seconds, datetime or ISO 8601 string) to epoch seconds, NaN if invalid."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return float("nan")
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            # Naive timestamps in metadata are local time, as written by datetime.now()
+            return value.timestamp()
+        return value.astimezone(timezone.utc).timestamp()
+    return float("nan")
+
+
+class MetadataColumns:
+    """
+    Numeric views of chunk metadata, row-aligned with the embedding matrix.
+
+    Timestamps are epoch seconds (NaN when unknown) and categorical fields
+    are integer codes (-1 when missing), so time decay, source weights and
+    filters on these fields run as array operations instead of parsing
+    per-chunk dicts on every query.
+    """
+
+    def __init__(self):
+        self.timestamps = np.zeros(0, dtype=np.float64)
+        self.codes: Dict[str, np.ndarray] = {field: np.zeros(0, dtype=np.int32) for field in CATEGORICAL_FIELDS}
+        self.vocabularies: Dict[str, Dict[Any, int]] = {field: {} for field in CATEGORICAL_FIELDS}
+
+    def resize(self, capacity: int):
+        """Grow (or shrink) every column to `capacity` rows, keeping existing values."""
+        size = min(capacity, len(self.timestamps))
+        timestamps = np.full(capacity, np.nan)
+        timestamps[:size] = self.timestamps[:size]
+        self.timestamps = timestamps
+        for field, column in self.codes.items():
+            codes = np.full(capacity, -1, dtype=np.int32)
+            codes[:size] = column[:size]
+            self.codes[field] = codes
+
+    def set_rows(self, start: int, metadatas: Sequence[Dict[str, Any]]):
+        """Fill rows `start`.. from chunk metadata; columns must already have room."""
+        end = start + len(metadatas)
+        self.timestamps[start:end] = [self._timestamp(metadata) for metadata in metadatas]
+        for field, column in self.codes.items():
+            vocabulary = self.vocabularies[field]
+            column[start:end] = [
+                -1 if metadata.get(field) is None else vocabulary.setdefault(metadata[field], len(vocabulary))
+                for metadata in metadatas
+            ]
+
+    @property
+    def nbytes(self) -> int:
+        return self.timestamps.nbytes + sum(column.nbytes for column in self.codes.values())
+
+    def take(self, rows: np.ndarray):
+        """Keep only the given rows, in order (used by compaction)."""
+        self.timestamps = self.timestamps[rows]
+        for field in self.codes:
+            self.codes[field] = self.codes[field][rows]
+
+    @staticmethod
+    def _timestamp(metadata: Dict[str, Any]) -> float:
+        for field in TIMESTAMP_FIELDS:
+            if metadata.get(field) is not None:
+                return to_epoch(metadata[field])
+        return float("nan")
+
+    def document_groups(self, rows: np.ndarray) -> np.ndarray:
+        """Group code per row: its document's, or a code of its own for chunks without a document_id."""
+        codes = self.codes["document_id"][rows].astype(np.int64)
+        return np.where(codes >= 0, codes, len(self.vocabularies["document_id"]) + rows)
+
+    def _code_mask(self, field: str, values: Any, size: int) -> np.ndarray:
+        vocabulary = self.vocabularies[field]
+        values = values if isinstance(values, list) else [values]
+        codes = [vocabulary[value] for value in values if value in vocabulary]
+        return np.isin(self.codes[field][:size], codes)
+
+    def filter_mask(self, filter_criteria: Dict[str, Any], size: int) -> Tuple[Optional[np.ndarray], Dict[str, Any]]:
+        """
+        Turn the criteria these columns can answer into a row mask.
+
+        Handles list or exact-value filters on categorical fields and range
+        (`gt`/`gte`/`lt`/`lte`) filters on `timestamp`.
+
+        Returns:
+            The mask (None if no criterion applied) and the criteria left
+            for per-row matching
+        """
+        mask = None
+        remaining = {}
+        for key, value in filter_criteria.items():
+            if key in self.codes and not isinstance(value, dict):
+                condition = self._code_mask(key, value, size)
+            elif key == TIMESTAMP_FILTER and isinstance(value, dict):
+                timestamps = self.timestamps[:size]
+                condition = ~np.isnan(timestamps)
+                for operator in _RANGE_OPERATORS:
+                    if operator in value:
+                        bound = to_epoch(value[operator])
+                        condition &= {
+                            "gt": timestamps > bound,
+                            "gte": timestamps >= bound,
+                            "lt": timestamps < bound,
+                            "lte": timestamps <= bound,
+                        }[operator]
+            else:
+                remaining[key] = value
+                continue
+            mask = condition if mask is None else mask & condition
+        return mask, remaining
+
+    def score_multipliers(
+        self,
+        size: int,
+        half_life: Optional[float] = None,
+        source_weights: Optional[Dict[str, float]] = None,
+        now: Optional[float] = None,
+    ) -> Optional[np.ndarray]:
+        """
+        Per-row score multipliers for time decay and source weighting.
+
+        Args:
+            size: Number of rows
+            half_life: Seconds after which a chunk's score is halved; chunks
+                without a timestamp are not decayed
+            source_weights: Multiplier per source_type; unlisted sources get 1.0
+            now: Reference time in epoch seconds (defaults to the current time)
+
+        Returns:
+            Multipliers, or None if neither adjustment was requested
+        """
+        multipliers = None
+        if half_life:
+            age = (time.time() if now is None else now) - self.timestamps[:size]
+            decay = np.exp2(-np.clip(age, 0, None) / half_life)
+            multipliers = np.where(np.isnan(decay), 1.0, decay)
+        if source_weights:
+            vocabulary = self.vocabularies["source_type"]
+            # The last slot is for chunks without a source_type (code -1)
+            weights = np.ones(len(vocabulary) + 1)
+            for source_type, weight in source_weights.items():
+                if source_type in vocabulary:
+                    weights[vocabulary[source_type]] = weight
+            source_multipliers = weights[self.codes["source_type"][:size]]
+            multipliers = source_multipliers if multipliers is None else multipliers * source_multipliers
+        return multipliers
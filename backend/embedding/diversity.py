@@ -0,0 +1,64 @@
+from typing import Optional
+
+import numpy as np
+
+
+def select_diverse(
+    relevance: np.ndarray,
+    embeddings: np.ndarray,
+    top_k: int,
+    mmr_lambda: float = 1.0,
+    groups: Optional[np.ndarray] = None,
+    max_per_group: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Greedy maximal-marginal-relevance selection over a candidate set.
+
+    Each step picks the candidate maximizing
+    `mmr_lambda * relevance - (1 - mmr_lambda) * max similarity to the picks so far`.
+    The pairwise similarities are one matrix product up front, and each
+    step is a vectorized update over all candidates.
+
+    Args:
+        relevance: Relevance score per candidate
+        embeddings: L2-normalized embedding per candidate (rows)
+        top_k: Number of candidates to select
+        mmr_lambda: 1.0 ranks by relevance only, 0.0 by novelty only
+        groups: Optional group code per candidate (e.g. document), for the cap
+        max_per_group: Most candidates to pick from any one group
+
+    Returns:
+        Indices of the selected candidates, in selection order
+    """
+    n = len(relevance)
+    top_k = min(top_k, n)
+    if top_k <= 0:
+        return np.zeros(0, dtype=np.int64)
+
+    relevance = np.asarray(relevance, dtype=np.float32)
+    similarity = embeddings @ embeddings.T if mmr_lambda < 1.0 else None
+    max_similarity = np.zeros(n, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+    group_counts = np.zeros(int(groups.max()) + 1, dtype=np.int64) if groups is not None and max_per_group else None
+
+    selected = []
+    for _ in range(top_k):
+        if similarity is not None:
+            scores = mmr_lambda * relevance - (1 - mmr_lambda) * max_similarity
+        else:
+            scores = relevance.copy()
+        scores[~available] = -np.inf
+        pick = int(np.argmax(scores))
+        if not available[pick]:
+            # Every remaining candidate is excluded by the group cap
+            break
+        selected.append(pick)
+        available[pick] = False
+        if similarity is not None:
+            np.maximum(max_similarity, similarity[pick], out=max_similarity)
+        if group_counts is not None:
+            group = groups[pick]
+            group_counts[group] += 1
+            if group_counts[group] >= max_per_group:
+                available[groups == group] = False
+    return np.array(selected, dtype=np.int64)
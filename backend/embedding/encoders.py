@@ -0,0 +1,196 @@
+from typing import List, Optional, Sequence
+import hashlib
+import os
+
+import numpy as np
+
+# Feature kinds and their weights: whole words carry most of the meaning,
+# character n-grams match inflections and typos, word pairs some word order
+WORD, BIGRAM, NGRAM = 0, 1, 2
+KIND_WEIGHTS = np.array([1.0, 0.5, 0.35], dtype=np.float32)
+
+# A feature key keeps the hash's high bits and packs the feature kind and
+# the text's index in the batch into the low ones, so one sort groups
+# equal features of a text together
+_TEXT_BITS = 16
+_KEY_BITS = _TEXT_BITS + 2
+MAX_BATCH = 1 << _TEXT_BITS
+
+# Arithmetic below wraps around modulo 2**64 on purpose
+_MULTIPLIER = np.uint64(0x100000001B3)
+_INVERSE = np.uint64(pow(0x100000001B3, -1, 2 ** 64))
+
+# Bytes that belong to words: ASCII letters and digits, and every byte of a multi-byte UTF-8 character
+_WORD_BYTES = np.zeros(256, dtype=bool)
+_WORD_BYTES[[ord(c) for c in "abcdefghijklmnopqrstuvwxyz0123456789"]] = True
+_WORD_BYTES[128:] = True
+
+
+def _mix(h: np.ndarray) -> np.ndarray:
+    """Finalize 64-bit hashes so every output bit depends on every input bit (splitmix64)."""
+    h = h ^ (h >> np.uint64(30))
+    h = h * np.uint64(0xBF58476D1CE4E5B9)
+    h = h ^ (h >> np.uint64(27))
+    h = h * np.uint64(0x94D049BB133111EB)
+    return h ^ (h >> np.uint64(31))
+
+
+class BaseEncoder:
+    """Turns texts into fixed-size embeddings."""
+
+    dimensions: int
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed a batch of texts as a (len(texts), dimensions) float32 matrix."""
+        raise NotImplementedError()
+
+
+class MockEncoder(BaseEncoder):
+    """
+    The original placeholder: an MD5 digest of the text spread over 128
+    dimensions. Deterministic, but similar texts get unrelated vectors.
+    """
+
+    dimensions = 128
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        digests = b"".join(hashlib.md5(text.encode()).digest() for text in texts)
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        vectors[:, :16] = np.frombuffer(digests, dtype=np.uint8).reshape(len(texts), 16) / 255.0 * 2 - 1
+        return vectors
+
+
+class LocalEncoder(BaseEncoder):
+    """
+    Offline embeddings from hashed text features and a sparse random projection.
+
+    Each text contributes its words, adjacent word pairs and character
+    n-grams within words. A feature's weight is `1 + log(count)` times
+    the weight of its kind. Every feature is hashed to `projections`
+    coordinates with random signs, which is a sparse random projection
+    of the feature space that never materializes the matrix. Texts that
+    share words and word pieces end up with nearby vectors.
+
+    A batch is encoded with array operations on the concatenated UTF-8
+    bytes. Words and n-grams are hashed with a polynomial prefix hash,
+    so there is no Python loop over texts or tokens. Output depends only
+    on the text, `dimensions` and `seed`.
+    """
+
+    def __init__(self, dimensions: int = 384, seed: int = 0, ngram: int = 3, projections: int = 2):
+        if dimensions <= 0:
+            raise ValueError("dimensions must be positive")
+        self.dimensions = dimensions
+        self.ngram = ngram
+        self.projections = projections
+        self._salt = _mix(np.array([seed + 1], dtype=np.uint64))[0]
+        self._power_table = np.zeros(0, dtype=np.uint64)
+        self._inverse_table = np.zeros(0, dtype=np.uint64)
+
+    def _powers(self, size: int):
+        """M**i and M**-i for i up to `size`, computed once and grown by doubling."""
+        if len(self._power_table) <= size:
+            length = max(2 * len(self._power_table), size + 1, 4096)
+            tables = []
+            for base in (_MULTIPLIER, _INVERSE):
+                table = np.full(length, base)
+                table[0] = 1
+                with np.errstate(over="ignore"):
+                    tables.append(np.cumprod(table, dtype=np.uint64))
+            self._power_table, self._inverse_table = tables
+        return self._power_table, self._inverse_table
+
+    def _features(self, texts: Sequence[str]) -> np.ndarray:
+        """Feature keys of a batch of at most MAX_BATCH texts, one per occurrence."""
+        data = np.frombuffer("\0".join(texts).lower().encode("utf-8"), dtype=np.uint8)
+        size = len(data)
+        is_word = _WORD_BYTES[data]
+        separators = np.flatnonzero(data == 0)
+        powers, inverse_powers = self._powers(size)
+
+        # prefix[i] = sum(byte[j] * M**j for j < i); a span's hash is its
+        # prefix difference scaled back by M**-start, so equal spans hash equally
+        with np.errstate(over="ignore"):
+            prefix = np.zeros(size + 1, dtype=np.uint64)
+            np.cumsum((data.astype(np.uint64) + np.uint64(1)) * powers[:size], out=prefix[1:])
+
+            def span_hash(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+                h = (prefix[ends] - prefix[starts]) * inverse_powers[starts]
+                return _mix(h ^ self._salt ^ ((ends - starts).astype(np.uint64) << np.uint64(56)))
+
+            edges = np.diff(is_word.astype(np.int8), prepend=0, append=0)
+            starts = np.flatnonzero(edges == 1)
+            ends = np.flatnonzero(edges == -1)
+            words = span_hash(starts, ends)
+            word_texts = np.searchsorted(separators, starts)
+
+            same_text = word_texts[1:] == word_texts[:-1]
+            bigrams = _mix(words[:-1][same_text] * _MULTIPLIER + words[1:][same_text])
+
+            # Every n-gram of each word longer than n
+            lengths = ends - starts
+            counts = np.where(lengths > self.ngram, lengths - self.ngram + 1, 0)
+            offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            ngram_starts = np.repeat(starts, counts) + offsets
+            ngrams = span_hash(ngram_starts, ngram_starts + self.ngram)
+
+        low = (np.uint64(1) << np.uint64(_KEY_BITS)) - np.uint64(1)
+        parts = []
+        for kind, hashes, text_index in (
+            (WORD, words, word_texts),
+            (BIGRAM, bigrams, word_texts[1:][same_text]),
+            (NGRAM, ngrams, np.repeat(word_texts, counts)),
+        ):
+            packed = (np.uint64(kind) << np.uint64(_TEXT_BITS)) | text_index.astype(np.uint64)
+            parts.append((hashes & ~low) | packed)
+        return np.concatenate(parts)
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        if len(texts) > MAX_BATCH:
+            return np.concatenate([
+                self.encode(texts[start:start + MAX_BATCH]) for start in range(0, len(texts), MAX_BATCH)
+            ])
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        keys = self._features(texts) if len(texts) else np.zeros(0, dtype=np.uint64)
+        if not len(keys):
+            return vectors
+
+        # Count each feature once per text, with sublinear term frequency
+        keys.sort()
+        first = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+        counts = np.diff(np.append(first, len(keys)))
+        keys = keys[first]
+        text_index = (keys & np.uint64(MAX_BATCH - 1)).astype(np.int64)
+        kinds = ((keys >> np.uint64(_TEXT_BITS)) & np.uint64(3)).astype(np.int64)
+        weights = KIND_WEIGHTS[kinds] * (1 + np.log(counts)).astype(np.float32)
+
+        for projection in range(self.projections):
+            # Coordinates from the hash bits above the packed ones, signs from the top bits
+            # (22 random bits * dimensions) >> 22 maps them onto range(dimensions) without a division
+            bits = ((keys >> np.uint64(_KEY_BITS + projection * 22)) & np.uint64(0x3FFFFF)).astype(np.int64)
+            dimension = (bits * self.dimensions) >> 22
+            sign = 1 - 2 * ((keys >> np.uint64(63 - projection)) & np.uint64(1)).astype(np.float32)
+            vectors += np.bincount(
+                text_index * self.dimensions + dimension,
+                weights=sign * weights,
+                minlength=len(texts) * self.dimensions,
+            ).reshape(len(texts), self.dimensions).astype(np.float32)
+        return vectors
+
+
+def create_encoder(backend: Optional[str] = None, dimensions: Optional[int] = None) -> BaseEncoder:
+    """
+    Encoder configured from the environment.
+
+    EMBEDDING_BACKEND is "mock" (the default placeholder) or "local";
+    EMBEDDING_DIMENSIONS sets the local encoder's dimensionality.
+    """
+    backend = backend or os.getenv("EMBEDDING_BACKEND", "mock")
+    if backend == "local":
+        return LocalEncoder(
+            dimensions=dimensions or int(os.getenv("EMBEDDING_DIMENSIONS", "384")),
+            seed=int(os.getenv("EMBEDDING_SEED", "0")),
+        )
+    if backend == "mock":
+        return MockEncoder()
+    raise ValueError(f"Unknown embedding backend {backend!r}; expected mock or local")
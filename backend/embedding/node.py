@@ -0,0 +1,129 @@
+"""
+Index node: serves search over one partition of the corpus for an
+IndexCoordinator (see backend/embedding/cluster.py).
+
+Usage:
+    python -m backend.embedding.node --port 9101
+    python -m backend.embedding.node --port 9102 --data-dir data/index-node-2
+"""
+
+from fastapi import FastAPI, Depends, Header, HTTPException, status
+from typing import List, Dict, Any, Optional
+from pydantic import BaseModel, Field
+import argparse
+import os
+
+from backend.embedding.encoders import create_encoder
+from backend.embedding.rerank import create_reranking_stage
+from backend.embedding.service import EmbeddingService
+from backend.utils.responses import FastJSONResponse, model_dict
+
+# Header carrying the shared secret when INDEX_NODE_TOKEN is set
+TOKEN_HEADER = "X-Index-Node-Token"
+
+# Models
+class IngestRequest(BaseModel):
+    content: str
+    metadata: Dict[str, Any] = {}
+    document_id: Optional[str] = None
+    chunk_size: int = 1000
+    chunk_overlap: int = 200
+
+class IngestResponse(BaseModel):
+    chunk_ids: List[str]
+
+class SearchRequest(BaseModel):
+    query: str
+    top_k: int = 5
+    filter_criteria: Optional[Dict[str, Any]] = None
+    rerank: bool = True
+    mmr_lambda: Optional[float] = None
+    max_per_document: Optional[int] = Field(None, ge=1)
+    time_decay: Optional[float] = None
+    source_weights: Optional[Dict[str, float]] = None
+
+class SearchResponse(BaseModel):
+    results: List[Dict[str, Any]]
+
+
+def create_node_app(service: EmbeddingService, token: Optional[str] = None) -> FastAPI:
+    """
+    Build the HTTP app of an index node serving `service`.
+
+    Args:
+        service: The node's partition of the index
+        token: Shared secret callers must send in X-Index-Node-Token, if any
+    """
+    app = FastAPI(title="BibliosAI index node")
+
+    async def check_token(x_index_node_token: Optional[str] = Header(None)):
+        if token and x_index_node_token != token:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid index node token")
+
+    @app.get("/health")
+    async def health():
+        """Liveness probe."""
+        return {"status": "healthy"}
+
+    @app.post("/documents", response_model=IngestResponse, dependencies=[Depends(check_token)])
+    async def ingest(request: IngestRequest):
+        """Chunk, embed and store a document."""
+        chunk_ids = await service.process_document(
+            request.content,
+            request.metadata,
+            chunk_size=request.chunk_size,
+            chunk_overlap=request.chunk_overlap,
+            document_id=request.document_id,
+        )
+        return {"chunk_ids": chunk_ids}
+
+    @app.delete("/documents/{document_id}", dependencies=[Depends(check_token)])
+    async def delete_document(document_id: str):
+        """Delete a document's chunks."""
+        return {"deleted": service.delete_document(document_id)}
+
+    @app.post("/search", response_model=SearchResponse, dependencies=[Depends(check_token)])
+    async def search(request: SearchRequest):
+        """Search this node's partition."""
+        results = await service.search(**model_dict(request))
+        return FastJSONResponse({"results": results})
+
+    @app.get("/stats", dependencies=[Depends(check_token)])
+    async def stats():
+        """Statistics of this node's partition."""
+        return FastJSONResponse(service.get_stats())
+
+    @app.on_event("shutdown")
+    async def close_index():
+        service.close()
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9101)
+    parser.add_argument("--data-dir", default=None, help="Keep the partition durable in this directory")
+    args = parser.parse_args()
+
+    reranker = create_reranking_stage()
+    encoder = create_encoder()
+    if args.data_dir:
+        service = EmbeddingService.open(
+            args.data_dir, fsync=os.getenv("VECTOR_WAL_FSYNC", "group"), reranker=reranker, encoder=encoder
+        )
+    else:
+        service = EmbeddingService(reranker=reranker, encoder=encoder)
+
+    import uvicorn
+    uvicorn.run(
+        create_node_app(service, token=os.getenv("INDEX_NODE_TOKEN")),
+        host=args.host,
+        port=args.port,
+        log_level=os.getenv("LOG_LEVEL", "info").lower(),
+    )
+
+
+if __name__ == "__main__":
+    main()
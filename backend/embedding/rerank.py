@@ -0,0 +1,186 @@
+from typing import List, Dict, Any, Optional, Sequence
+from collections import Counter
+import hashlib
+import os
+import re
+import time
+
+import numpy as np
+
+from backend.utils.cache import LRUCache
+from backend.utils.metrics import metrics_registry
+from backend.utils.tracing import traced
+
+RERANK_CANDIDATES = metrics_registry.counter(
+    "rerank_candidates_total", "Candidates seen by the re-ranking stage", ["outcome"]
+)
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Words too common to say anything about relevance
+STOPWORDS = frozenset("""
+a an and are as at be but by can do does for from had has have how i if in into is it its
+me my of on or our so that the their them then there these they this to was we were what
+when where which who why will with you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def content_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+class BaseReranker:
+    """Scores (query, chunk) pairs; higher is more relevant, in [0, 1]."""
+
+    def score_batch(self, query: str, texts: Sequence[str]) -> np.ndarray:
+        raise NotImplementedError()
+
+
+class LexicalReranker(BaseReranker):
+    """
+    Offline lexical scorer: BM25-style saturated term frequency over the
+    query's content words, plus a bonus for query bigrams appearing
+    verbatim.
+
+    Texts are tokenized one by one, then the whole batch is scored as a
+    (texts x query terms) count matrix. A pair's score depends only on the
+    query and that text, so scores can be cached per pair.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, average_length: float = 150.0, bigram_weight: float = 0.3):
+        self.k1 = k1
+        self.b = b
+        self.average_length = average_length
+        self.bigram_weight = bigram_weight
+
+    def score_batch(self, query: str, texts: Sequence[str]) -> np.ndarray:
+        query_tokens = [token for token in tokenize(query) if token not in STOPWORDS]
+        if not query_tokens or not texts:
+            return np.zeros(len(texts), dtype=np.float32)
+        terms = list(dict.fromkeys(query_tokens))
+        bigrams = [f"{a} {b}" for a, b in zip(query_tokens, query_tokens[1:])]
+
+        counts = np.zeros((len(texts), len(terms)), dtype=np.float32)
+        lengths = np.zeros(len(texts), dtype=np.float32)
+        bigram_hits = np.zeros(len(texts), dtype=np.float32)
+        for i, text in enumerate(texts):
+            tokens = tokenize(text)
+            frequencies = Counter(tokens)
+            counts[i] = [frequencies.get(term, 0) for term in terms]
+            lengths[i] = len(tokens)
+            if bigrams:
+                joined = f" {' '.join(tokens)} "
+                bigram_hits[i] = sum(f" {bigram} " in joined for bigram in bigrams)
+
+        # Longer terms tend to be more specific, so weigh them a little more
+        weights = np.log1p(np.array([len(term) for term in terms], dtype=np.float32))
+        norm = self.k1 * (1 - self.b + self.b * lengths / self.average_length)
+        saturated = counts * (self.k1 + 1) / (counts + norm[:, None])
+        term_score = saturated @ weights / ((self.k1 + 1) * weights.sum())
+        if bigrams:
+            bigram_score = bigram_hits / len(bigrams)
+            return ((1 - self.bigram_weight) * term_score + self.bigram_weight * bigram_score).astype(np.float32)
+        return term_score.astype(np.float32)
+
+
+class RerankingStage:
+    """
+    Second-stage ranking between vector search and generation.
+
+    Search over-fetches `top_k * overfetch` candidates, and this stage
+    re-scores them as `weight * reranker + (1 - weight) * vector score`,
+    keeping the best `top_k`. Pair scores are cached by (query, content)
+    hash. Candidates are scored best-first in batches; if the deadline
+    passes, unscored candidates keep their first-stage positions and the
+    scored ones are re-ordered among the other slots.
+    """
+
+    def __init__(
+        self,
+        reranker: Optional[BaseReranker] = None,
+        overfetch: int = 4,
+        weight: float = 0.5,
+        batch_size: int = 32,
+        deadline: float = 0.05,
+        cache_size: int = 100_000,
+    ):
+        self.reranker = reranker or LexicalReranker()
+        self.overfetch = overfetch
+        self.weight = weight
+        self.batch_size = batch_size
+        self.deadline = deadline
+        self.cache = LRUCache(cache_size)
+
+    def candidate_count(self, top_k: int) -> int:
+        return top_k * self.overfetch
+
+    @traced("rerank")
+    def rerank(self, query: str, results: List[Dict[str, Any]], top_k: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Re-rank search results.
+
+        Args:
+            query: The search query
+            results: Candidates in vector-score order, each with `content` and `score`
+            top_k: Number of results to return, or None for all of them
+
+        Returns:
+            The best `top_k` results; `score` is the blended score, with the
+            original in `vector_score` and the reranker's in `rerank_score`
+        """
+        deadline = time.perf_counter() + self.deadline
+        query_key = content_hash(query)
+        rerank_scores: List[Optional[float]] = []
+        misses = []
+        for index, result in enumerate(results):
+            key = (query_key, content_hash(result["content"]))
+            score = self.cache.get(key)
+            rerank_scores.append(score)
+            if score is None:
+                misses.append((index, key))
+
+        for start in range(0, len(misses), self.batch_size):
+            if time.perf_counter() >= deadline:
+                break
+            batch = misses[start:start + self.batch_size]
+            scores = self.reranker.score_batch(query, [results[index]["content"] for index, _ in batch])
+            for (index, key), score in zip(batch, scores.tolist()):
+                rerank_scores[index] = score
+                self.cache.set(key, score)
+
+        ranked: List[Dict[str, Any]] = list(results)
+        scored_positions = []
+        scored = []
+        for position, (result, rerank_score) in enumerate(zip(results, rerank_scores)):
+            if rerank_score is None:
+                continue
+            scored_positions.append(position)
+            scored.append({
+                **result,
+                "score": self.weight * rerank_score + (1 - self.weight) * result["score"],
+                "vector_score": result["score"],
+                "rerank_score": rerank_score,
+            })
+        RERANK_CANDIDATES.inc(len(scored), outcome="scored")
+        RERANK_CANDIDATES.inc(len(results) - len(scored), outcome="deadline")
+        # Unscored candidates stay put; sorted() is stable, so ties keep their vector order
+        scored.sort(key=lambda result: result["score"], reverse=True)
+        for position, result in zip(scored_positions, scored):
+            ranked[position] = result
+        return ranked if top_k is None else ranked[:top_k]
+
+
+def create_reranking_stage() -> Optional[RerankingStage]:
+    """Re-ranking stage configured from the environment, or None when RERANK_ENABLED is false."""
+    if os.getenv("RERANK_ENABLED", "true").lower() != "true":
+        return None
+    return RerankingStage(
+        overfetch=int(os.getenv("RERANK_OVERFETCH", "4")),
+        weight=float(os.getenv("RERANK_WEIGHT", "0.5")),
+        deadline=float(os.getenv("RERANK_DEADLINE_MS", "50")) / 1000,
+        cache_size=int(os.getenv("RERANK_CACHE_SIZE", "100000")),
+    )
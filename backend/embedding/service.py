@@ -1,48 +1,111 @@
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional, Union, Sequence, Tuple
 import numpy as np
 from datetime import datetime
+import asyncio
 import json
 import hashlib
+import logging
+import os
+import shutil
+import threading
+import time
+
+from backend.utils.tracing import traced
+from backend.embedding.rerank import RerankingStage, create_reranking_stage
+from backend.embedding.diversity import select_diverse
+from backend.embedding.columns import MetadataColumns
+from backend.embedding.encoders import BaseEncoder, MockEncoder, create_encoder
+from backend.embedding.stats import IndexStats
+from backend.embedding.wal import WriteAheadLog, FSYNC_GROUP
+
+logger = logging.getLogger(__name__)
 
 # In a real implementation, you would use a proper vector database like Pinecone, Chroma, etc.
 # This is a simplified in-memory implementation for demonstration purposes
 
+# Initial number of rows allocated in the vector matrix; grows by doubling
+INITIAL_CAPACITY = 1024
+
+# Candidates fetched per result when search diversifies its results
+DIVERSITY_OVERFETCH = 4
+
+# Layout of a durable index's data directory (see EmbeddingService.open)
+SNAPSHOT_DIR = "snapshots"
+WAL_DIR = "wal"
+
+def new_document_id(content: str) -> str:
+    """A fresh document ID for `content`."""
+    return hashlib.md5(f"{content[:100]}-{datetime.now().isoformat()}".encode()).hexdigest()
+
 class EmbeddingService:
-    def __init__(self):
-        # In-memory storage for embeddings
+    """
+    Chunk store with brute-force vector search.
+
+    Embeddings are kept L2-normalized in one float32 matrix, so a search is
+    a single matrix-vector product. Deleted chunks leave tombstoned rows
+    until `compact` is called. An index written with `save` can be opened
+    with `load(path, mmap=True)`, letting several worker processes share
+    one copy of the vectors through the page cache; the first mutation
+    gives a process its own private copy.
+
+    Texts are embedded by an encoder (see backend/embedding/encoders.py),
+    a batch at a time when a document is processed.
+
+    With a re-ranking stage, search over-fetches candidates and lets the
+    stage pick the final top-k.
+
+    Timestamps, source types and connector IDs are also kept as NumPy
+    columns (see MetadataColumns), so time decay, source weights and the
+    common filters are vectorized over the whole index.
+
+    An index opened with `open(data_dir)` is durable: inserts and deletes
+    are appended to a write-ahead log before they are applied, `snapshot`
+    writes a compact copy of the index and drops the log it covers, and
+    reopening loads the latest snapshot and replays the rest of the log.
+    """
+
+    def __init__(self, reranker: Optional[RerankingStage] = None, encoder: Optional[BaseEncoder] = None):
+        self.reranker = reranker
+        self.encoder = encoder or MockEncoder()
         self.documents = {}
-        self.embeddings = {}
         self.metadata = {}
+        self.dimensions: Optional[int] = None
+        # Row i of the matrix holds the embedding of _ids[i]; None marks a deleted row
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._ids: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        self._live = np.zeros(0, dtype=bool)
+        self._columns = MetadataColumns()
+        self._stats = IndexStats()
+        self._wal: Optional[WriteAheadLog] = None
+        self._data_dir: Optional[str] = None
+        self._snapshot_lsn = 0
+        self._snapshot_lock = threading.Lock()
     
-    async def embed_text(self, text: str) -> List[float]:
+    @traced("embed_text")
+    async def embed_text(self, text: str) -> np.ndarray:
         """
         Generate embeddings for a text string.
         
-        In a real implementation, this would call an embedding model API
-        like OpenAI's text-embedding-ada-002 or a local model.
+        The default encoder is a placeholder; set EMBEDDING_BACKEND=local
+        for the offline LocalEncoder, or plug in an encoder that calls an
+        embedding model API.
         """
-        # Mock embedding generation - in reality, you would call an embedding API
-        # This creates a deterministic "embedding" based on the hash of the text
-        text_hash = hashlib.md5(text.encode()).hexdigest()
-        # Convert hash to a list of 128 float values between -1 and 1
-        embedding = []
-        for i in range(0, len(text_hash), 2):
-            if i + 1 < len(text_hash):
-                val = int(text_hash[i:i+2], 16) / 255.0 * 2 - 1
-                embedding.append(val)
-        
-        # Pad to 128 dimensions if needed
-        while len(embedding) < 128:
-            embedding.append(0.0)
-        
-        return embedding
+        return self.encoder.encode([text])[0]
+    
+    @traced("embed_texts")
+    async def embed_texts(self, texts: Sequence[str]) -> np.ndarray:
+        """Generate embeddings for a batch of texts, one row per text."""
+        return self.encoder.encode(texts)
     
+    @traced("process_document")
     async def process_document(
         self,
         content: str,
         metadata: Dict[str, Any],
         chunk_size: int = 1000,
-        chunk_overlap: int = 200
+        chunk_overlap: int = 200,
+        document_id: Optional[str] = None
     ) -> List[str]:
         """
         Process a document by splitting it into chunks and embedding each chunk.
@@ -52,6 +115,7 @@ class EmbeddingService:
             metadata: Metadata about the document
             chunk_size: Size of each chunk in characters
             chunk_overlap: Overlap between chunks in characters
+            document_id: ID to store the document under; generated if not given
             
         Returns:
             List of document chunk IDs
@@ -60,20 +124,17 @@ class EmbeddingService:
         chunks = self._split_text(content, chunk_size, chunk_overlap)
         
         # Generate a document ID
-        doc_id = hashlib.md5(f"{content[:100]}-{datetime.now().isoformat()}".encode()).hexdigest()
+        doc_id = document_id or new_document_id(content)
+        
+        # Generate embeddings for all chunks in one batch
+        embeddings = await self.embed_texts(chunks)
         
         # Process each chunk
         chunk_ids = []
+        chunk_metadatas = []
         for i, chunk in enumerate(chunks):
             chunk_id = f"{doc_id}-{i}"
             
-            # Generate embedding for chunk
-            embedding = await self.embed_text(chunk)
-            
-            # Store chunk, embedding, and metadata
-            self.documents[chunk_id] = chunk
-            self.embeddings[chunk_id] = embedding
-            
             # Add chunk-specific metadata
             chunk_metadata = metadata.copy()
             chunk_metadata.update({
@@ -83,17 +144,26 @@ class EmbeddingService:
                 "total_chunks": len(chunks),
                 "processed_at": datetime.now().isoformat()
             })
-            self.metadata[chunk_id] = chunk_metadata
-            
+            chunk_metadatas.append(chunk_metadata)
             chunk_ids.append(chunk_id)
         
+        # Replace any earlier version and store the chunks, embeddings, and metadata together (one log record)
+        self.add_embeddings(chunk_ids, embeddings, chunk_metadatas, chunks, replace_document=doc_id)
+        await self.wait_durable()
+        
         return chunk_ids
     
+    @traced("search")
     async def search(
         self,
         query: str,
         top_k: int = 5,
-        filter_criteria: Optional[Dict[str, Any]] = None
+        filter_criteria: Optional[Dict[str, Any]] = None,
+        rerank: bool = True,
+        mmr_lambda: Optional[float] = None,
+        max_per_document: Optional[int] = None,
+        time_decay: Optional[float] = None,
+        source_weights: Optional[Dict[str, float]] = None
     ) -> List[Dict[str, Any]]:
         """
         Search for documents similar to the query.
@@ -101,31 +171,66 @@ class EmbeddingService:
         Args:
             query: The search query
             top_k: Number of results to return
-            filter_criteria: Optional metadata filters
+            filter_criteria: Optional metadata filters; `timestamp` takes a
+                gt/gte/lt/lte range over each chunk's created_at (or processed_at)
+            rerank: Pass candidates through the re-ranking stage, if one is configured
+            mmr_lambda: Diversify results with maximal marginal relevance; 1.0 ranks by
+                relevance only, lower values trade relevance for novelty
+            max_per_document: Most chunks to return from any one document; at least 1
+            time_decay: Half-life in seconds; older chunks' scores decay exponentially
+            source_weights: Score multiplier per source_type, e.g. {"slack": 0.8}
             
         Returns:
             List of search results with document content and metadata
+
+        Raises:
+            ValueError: If max_per_document is less than 1
         """
+        if max_per_document is not None and max_per_document < 1:
+            raise ValueError("max_per_document must be at least 1")
+        reranker = self.reranker if rerank else None
+        diversify = mmr_lambda is not None or max_per_document is not None
+        fetch_k = reranker.candidate_count(top_k) if reranker is not None else top_k
+        if diversify:
+            fetch_k = max(fetch_k, top_k * DIVERSITY_OVERFETCH)
+        
         # Generate embedding for query
         query_embedding = await self.embed_text(query)
         
-        # Calculate similarity scores
-        scores = {}
-        for chunk_id, embedding in self.embeddings.items():
-            # Apply filters if provided
-            if filter_criteria and not self._matches_filter(self.metadata[chunk_id], filter_criteria):
-                continue
-            
-            # Calculate cosine similarity
-            similarity = self._cosine_similarity(query_embedding, embedding)
-            scores[chunk_id] = similarity
+        if not self._rows or fetch_k <= 0:
+            return []
         
-        # Sort by similarity score
-        sorted_results = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+        # Cosine similarity against every row at once; rows are already normalized
+        size = len(self._ids)
+        scores = self._vectors[:size] @ self._normalize(query_embedding)
+        multipliers = self._columns.score_multipliers(size, time_decay, source_weights)
+        if multipliers is not None:
+            scores = scores * multipliers
+        candidates = self._live[:size].copy()
+        if filter_criteria:
+            # Column-backed criteria are array masks; anything else is matched per row
+            mask, remaining = self._columns.filter_mask(filter_criteria, size)
+            if mask is not None:
+                candidates &= mask
+            if remaining:
+                for row in np.flatnonzero(candidates):
+                    if not self._matches_filter(self.metadata[self._ids[row]], remaining):
+                        candidates[row] = False
+        rows = np.flatnonzero(candidates)
+        if max_per_document is not None:
+            # Cap before fetching, so one long document can't crowd the others out of the candidates
+            rows = self._cap_per_document(rows, scores, max_per_document)
+        
+        # Select the top-k without sorting every score, then order them (ties by insertion)
+        if len(rows) > fetch_k:
+            rows = np.sort(rows[np.argpartition(-scores[rows], fetch_k - 1)[:fetch_k]])
+        rows = rows[np.argsort(-scores[rows], kind="stable")]
         
         # Get top-k results
         top_results = []
-        for chunk_id, score in sorted_results[:top_k]:
+        for row in rows:
+            chunk_id = self._ids[row]
+            score = scores[row]
             result = {
                 "chunk_id": chunk_id,
                 "content": self.documents[chunk_id],
@@ -134,8 +239,56 @@ class EmbeddingService:
             }
             top_results.append(result)
         
-        return top_results
+        if reranker is not None:
+            top_results = reranker.rerank(query, top_results, None if diversify else top_k)
+        if diversify:
+            top_results = self._diversify(top_results, top_k, mmr_lambda, max_per_document)
+        return top_results[:top_k]
+    
+    def _cap_per_document(self, rows: np.ndarray, scores: np.ndarray, max_per_document: int) -> np.ndarray:
+        """Keep each document's `max_per_document` best-scoring rows, in row order."""
+        rows = rows[np.argsort(-scores[rows], kind="stable")]
+        groups = self._columns.document_groups(rows)
+        # A stable sort by group keeps each group's rows in score order; a row's rank is its offset in its run
+        order = np.argsort(groups, kind="stable")
+        sorted_groups = groups[order]
+        starts = np.flatnonzero(np.concatenate(([True], sorted_groups[1:] != sorted_groups[:-1])))
+        run_starts = np.repeat(starts, np.diff(np.append(starts, len(order))))
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[order] = np.arange(len(order)) - run_starts
+        return np.sort(rows[rank < max_per_document])
+    
+    @traced("diversify")
+    def _diversify(
+        self,
+        results: List[Dict[str, Any]],
+        top_k: int,
+        mmr_lambda: Optional[float],
+        max_per_document: Optional[int]
+    ) -> List[Dict[str, Any]]:
+        """Pick top_k of the ranked candidates with MMR and/or a per-document cap."""
+        if not results:
+            return results
+        embeddings = self._vectors[[self._rows[result["chunk_id"]] for result in results]]
+        relevance = np.array([result["score"] for result in results], dtype=np.float32)
+        groups = None
+        if max_per_document is not None:
+            codes: Dict[Any, int] = {}
+            groups = np.array([
+                codes.setdefault(result["metadata"].get("document_id", result["chunk_id"]), len(codes))
+                for result in results
+            ])
+        picks = select_diverse(
+            relevance,
+            embeddings,
+            top_k,
+            mmr_lambda=1.0 if mmr_lambda is None else mmr_lambda,
+            groups=groups,
+            max_per_group=max_per_document,
+        )
+        return [results[i] for i in picks]
     
+    @traced("split_text")
     def _split_text(self, text: str, chunk_size: int, chunk_overlap: int) -> List[str]:
         """Split text into overlapping chunks."""
         if len(text) <= chunk_size:
@@ -160,12 +313,354 @@ class EmbeddingService:
             
             # Add chunk
             chunks.append(text[start:end])
+            if end == len(text):
+                break
             
-            # Move start position for next chunk
-            start = end - chunk_overlap
+            # Move start position for next chunk, always making progress
+            start = max(end - chunk_overlap, start + 1)
         
         return chunks
     
+    def _normalize(self, vectors: Union[Sequence[float], np.ndarray]) -> np.ndarray:
+        """L2-normalize a vector or the rows of a matrix, leaving zero vectors at zero."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+    
+    def _ensure_writable(self, extra_rows: int = 0):
+        """Make room for more rows, copying a memory-mapped matrix on the first write."""
+        size = len(self._ids)
+        capacity = self._vectors.shape[0]
+        if self._vectors.flags.writeable and size + extra_rows <= capacity:
+            return
+        if size + extra_rows > capacity:
+            capacity = max(INITIAL_CAPACITY, capacity * 2, size + extra_rows)
+        vectors = np.zeros((capacity, self.dimensions), dtype=np.float32)
+        vectors[:size] = self._vectors[:size]
+        live = np.zeros(capacity, dtype=bool)
+        live[:size] = self._live[:size]
+        self._vectors, self._live = vectors, live
+        self._columns.resize(capacity)
+    
+    def add_embeddings(
+        self,
+        chunk_ids: Sequence[str],
+        vectors: Union[Sequence[Sequence[float]], np.ndarray],
+        metadata: Optional[Sequence[Dict[str, Any]]] = None,
+        documents: Optional[Sequence[str]] = None,
+        replace_document: Optional[str] = None
+    ):
+        """
+        Store embeddings for chunks, replacing any existing ones.
+        
+        Args:
+            chunk_ids: IDs of the chunks
+            vectors: One embedding per chunk, all of the index's dimensionality
+            metadata: Optional metadata per chunk; without it, metadata already
+                stored for the chunk (if any) fills the numeric columns
+            documents: Optional content per chunk, likewise
+            replace_document: Delete this document's existing chunks first, in
+                the same log record, so a shorter new version leaves none behind
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if len(chunk_ids) == 0:
+            return
+        if vectors.ndim != 2 or vectors.shape[0] != len(chunk_ids):
+            raise ValueError("Expected one embedding per chunk ID")
+        if self.dimensions is None:
+            self.dimensions = vectors.shape[1]
+            self._vectors = np.zeros((0, self.dimensions), dtype=np.float32)
+        elif vectors.shape[1] != self.dimensions:
+            raise ValueError(f"Expected {self.dimensions}-dimensional embeddings, got {vectors.shape[1]}")
+        
+        if self._wal is not None:
+            self._wal.append({
+                "op": "add",
+                "chunk_ids": list(chunk_ids),
+                "metadata": None if metadata is None else list(metadata),
+                "documents": None if documents is None else list(documents),
+                "replace_document": replace_document,
+            }, vectors)
+        if replace_document is not None:
+            self._remove_document(replace_document)
+        for chunk_id in chunk_ids:
+            self._delete_row(chunk_id)
+        self._ensure_writable(len(chunk_ids))
+        start = len(self._ids)
+        end = start + len(chunk_ids)
+        self._vectors[start:end] = self._normalize(vectors)
+        self._live[start:end] = True
+        if metadata is not None:
+            for chunk_id, chunk_metadata in zip(chunk_ids, metadata):
+                self.metadata[chunk_id] = chunk_metadata
+        if documents is not None:
+            for chunk_id, content in zip(chunk_ids, documents):
+                self.documents[chunk_id] = content
+        self._columns.set_rows(start, [self.metadata.get(chunk_id, {}) for chunk_id in chunk_ids])
+        for chunk_id in chunk_ids:
+            self._stats.add_chunk(chunk_id, self.documents.get(chunk_id, ""), self.metadata.get(chunk_id, {}))
+        for row, chunk_id in enumerate(chunk_ids, start):
+            self._rows[chunk_id] = row
+        self._ids.extend(chunk_ids)
+    
+    def get_embedding(self, chunk_id: str) -> Optional[np.ndarray]:
+        """The stored (normalized) embedding of a chunk, or None."""
+        row = self._rows.get(chunk_id)
+        return None if row is None else self._vectors[row]
+    
+    def _delete_row(self, chunk_id: str):
+        row = self._rows.pop(chunk_id, None)
+        if row is not None:
+            self._live[row] = False
+            self._ids[row] = None
+    
+    def delete_document(self, document_id: str) -> int:
+        """
+        Delete every chunk of a document.
+        
+        Args:
+            document_id: The document's ID, as returned in chunk metadata
+            
+        Returns:
+            Number of chunks deleted
+        """
+        if self._wal is not None and self._stats.document_chunks(document_id):
+            self._wal.append({"op": "delete_document", "document_id": document_id})
+        return self._remove_document(document_id)
+    
+    def _remove_document(self, document_id: str) -> int:
+        chunk_ids = self._stats.document_chunks(document_id)
+        for chunk_id in chunk_ids:
+            self._delete_row(chunk_id)
+            self._stats.remove_chunk(chunk_id)
+            self.documents.pop(chunk_id, None)
+            self.metadata.pop(chunk_id, None)
+        return len(chunk_ids)
+    
+    def compact(self):
+        """Drop rows left behind by deleted chunks."""
+        size = len(self._ids)
+        live_rows = np.flatnonzero(self._live[:size])
+        if len(live_rows) == size:
+            return
+        vectors = self._vectors[live_rows]
+        self._ids = [self._ids[row] for row in live_rows]
+        self._rows = {chunk_id: row for row, chunk_id in enumerate(self._ids)}
+        self._vectors = vectors
+        self._live = np.ones(len(live_rows), dtype=bool)
+        self._columns.take(live_rows)
+    
+    def _capture(self) -> Dict[str, Any]:
+        """Copy the live rows out of the index, so they can be written while it keeps changing."""
+        size = len(self._ids)
+        live_rows = np.flatnonzero(self._live[:size])
+        vectors = self._vectors[live_rows] if self.dimensions else np.zeros((0, 0), dtype=np.float32)
+        chunk_ids = [self._ids[row] for row in live_rows]
+        return {
+            "vectors": vectors,
+            "chunk_ids": chunk_ids,
+            "documents": {chunk_id: self.documents.get(chunk_id) for chunk_id in chunk_ids},
+            "metadata": {chunk_id: self.metadata.get(chunk_id) for chunk_id in chunk_ids},
+            "last_ingest_at": self._stats.last_ingest_at,
+        }
+    
+    @staticmethod
+    def _write(path: str, state: Dict[str, Any], durable: bool = False):
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, "vectors.npy"), "wb") as f:
+            np.save(f, state["vectors"])
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        with open(os.path.join(path, "chunks.json"), "w") as f:
+            json.dump({key: value for key, value in state.items() if key != "vectors"}, f)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+    
+    def save(self, path: str):
+        """
+        Write the index to a directory: `vectors.npy` plus `chunks.json` with
+        chunk IDs, contents and metadata. Deleted rows are not written.
+        """
+        self._write(path, self._capture())
+    
+    @classmethod
+    def load(
+        cls,
+        path: str,
+        mmap: bool = True,
+        reranker: Optional[RerankingStage] = None,
+        encoder: Optional[BaseEncoder] = None
+    ) -> "EmbeddingService":
+        """
+        Open an index written by `save`.
+        
+        Args:
+            path: Directory the index was saved to
+            mmap: Map the vectors read-only instead of reading them into memory
+            reranker: Optional re-ranking stage for search
+            encoder: Encoder for queries and new documents; must match the saved vectors
+            
+        Returns:
+            An embedding service serving the saved chunks
+        """
+        service = cls(reranker=reranker, encoder=encoder)
+        with open(os.path.join(path, "chunks.json")) as f:
+            chunks = json.load(f)
+        vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r" if mmap else None)
+        service.documents = chunks["documents"]
+        service.metadata = chunks["metadata"]
+        service._ids = list(chunks["chunk_ids"])
+        service._rows = {chunk_id: row for row, chunk_id in enumerate(service._ids)}
+        if service._ids:
+            service.dimensions = vectors.shape[1]
+            service._vectors = vectors
+            service._live = np.ones(len(service._ids), dtype=bool)
+            service._columns.resize(len(service._ids))
+            service._columns.set_rows(0, [service.metadata.get(chunk_id) or {} for chunk_id in service._ids])
+        for chunk_id in service._ids:
+            service._stats.add_chunk(
+                chunk_id, service.documents.get(chunk_id) or "", service.metadata.get(chunk_id) or {}
+            )
+        service._stats.last_ingest_at = service._stats.last_updated = chunks.get("last_ingest_at")
+        return service
+    
+    @classmethod
+    def open(
+        cls,
+        data_dir: str,
+        fsync: str = FSYNC_GROUP,
+        group_commit_interval: float = 0.0,
+        mmap: bool = True,
+        reranker: Optional[RerankingStage] = None,
+        encoder: Optional[BaseEncoder] = None
+    ) -> "EmbeddingService":
+        """
+        Open a durable index, recovering whatever an earlier process wrote.
+        
+        Loads the latest snapshot in `data_dir/snapshots`, replays the
+        write-ahead log in `data_dir/wal` past it, and keeps logging to it.
+        
+        Args:
+            data_dir: The index's data directory (created if missing)
+            fsync: Write-ahead log fsync policy: "always", "group" or "none"
+            group_commit_interval: Seconds a group commit waits for more writers
+            mmap: Map the snapshot's vectors read-only instead of reading them into memory
+            reranker: Optional re-ranking stage for search
+            encoder: Encoder for queries and new documents; must match the stored vectors
+            
+        Returns:
+            An embedding service logging to `data_dir`
+        """
+        start = time.perf_counter()
+        snapshot_dir = os.path.join(data_dir, SNAPSHOT_DIR)
+        os.makedirs(snapshot_dir, exist_ok=True)
+        snapshots = []
+        for name in os.listdir(snapshot_dir):
+            if name.isdigit():
+                snapshots.append(int(name))
+            else:
+                # Left behind by a snapshot that didn't finish
+                shutil.rmtree(os.path.join(snapshot_dir, name), ignore_errors=True)
+        snapshot_lsn = max(snapshots, default=0)
+        if snapshots:
+            service = cls.load(
+                os.path.join(snapshot_dir, f"{snapshot_lsn:020d}"), mmap=mmap, reranker=reranker, encoder=encoder
+            )
+        else:
+            service = cls(reranker=reranker, encoder=encoder)
+        
+        wal = WriteAheadLog(
+            os.path.join(data_dir, WAL_DIR), fsync=fsync,
+            group_commit_interval=group_commit_interval, start_lsn=snapshot_lsn,
+        )
+        replayed = 0
+        for _, op, vectors in wal.replay(snapshot_lsn):
+            service._replay(op, vectors)
+            replayed += 1
+        service._wal = wal
+        service._data_dir = data_dir
+        service._snapshot_lsn = snapshot_lsn
+        logger.info(
+            "Opened vector index %s: snapshot at LSN %d, %d log records replayed in %.3fs",
+            data_dir, snapshot_lsn, replayed, time.perf_counter() - start,
+        )
+        return service
+    
+    def _replay(self, op: Dict[str, Any], vectors: Optional[np.ndarray]):
+        """Apply a write-ahead log record (the service must not be logging)."""
+        if op["op"] == "add":
+            self.add_embeddings(
+                op["chunk_ids"], vectors, op.get("metadata"), op.get("documents"), op.get("replace_document")
+            )
+        elif op["op"] == "delete_document":
+            self.delete_document(op["document_id"])
+        elif op["op"] == "clear":
+            self.clear()
+        else:
+            raise ValueError(f"Unknown write-ahead log operation {op['op']!r}")
+    
+    async def wait_durable(self):
+        """Wait until every change logged so far is durable under the fsync policy."""
+        if self._wal is not None:
+            await self._wal.wait_durable_async()
+    
+    def _begin_snapshot(self) -> Tuple[int, Dict[str, Any]]:
+        if self._wal is None:
+            raise RuntimeError("Only an index opened with EmbeddingService.open can be snapshotted")
+        # Everything up to this LSN is in the index; later records go to a new segment
+        lsn = self._wal.rotate()
+        return lsn, self._capture()
+    
+    def _finish_snapshot(self, lsn: int, state: Dict[str, Any]):
+        with self._snapshot_lock:
+            if lsn <= self._snapshot_lsn:
+                return
+            snapshot_dir = os.path.join(self._data_dir, SNAPSHOT_DIR)
+            path = os.path.join(snapshot_dir, f"{lsn:020d}")
+            partial = f"{path}.partial"
+            shutil.rmtree(partial, ignore_errors=True)
+            self._write(partial, state, durable=True)
+            os.rename(partial, path)
+            directory = os.open(snapshot_dir, os.O_RDONLY)
+            try:
+                os.fsync(directory)
+            finally:
+                os.close(directory)
+            previous = self._snapshot_lsn
+            self._snapshot_lsn = lsn
+            self._wal.truncate(lsn)
+            if previous:
+                # Processes that mapped the old vectors keep them until they unmap
+                shutil.rmtree(os.path.join(snapshot_dir, f"{previous:020d}"), ignore_errors=True)
+    
+    def snapshot(self) -> int:
+        """
+        Write a compact snapshot of a durable index and delete the log it covers.
+        
+        Returns:
+            The LSN of the last change the snapshot includes
+        """
+        lsn, state = self._begin_snapshot()
+        self._finish_snapshot(lsn, state)
+        return lsn
+    
+    async def snapshot_async(self) -> int:
+        """`snapshot`, writing the files in a thread while the index keeps serving."""
+        lsn, state = self._begin_snapshot()
+        await asyncio.to_thread(self._finish_snapshot, lsn, state)
+        return lsn
+    
+    def wal_size(self) -> int:
+        """Bytes of write-ahead log not yet covered by a snapshot (0 if not durable)."""
+        return 0 if self._wal is None else self._wal.size()
+    
+    def close(self):
+        """Make logged changes durable and release the write-ahead log."""
+        if self._wal is not None:
+            self._wal.close()
+    
     def _cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
         """Calculate cosine similarity between two vectors."""
         vec1 = np.array(vec1)
@@ -209,26 +704,92 @@ class EmbeddingService:
     
     def clear(self):
         """Clear all stored documents and embeddings."""
+        if self._wal is not None:
+            self._wal.append({"op": "clear"})
         self.documents.clear()
-        self.embeddings.clear()
         self.metadata.clear()
+        self.dimensions = None
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._ids = []
+        self._rows = {}
+        self._live = np.zeros(0, dtype=bool)
+        self._columns = MetadataColumns()
+        self._stats = IndexStats()
     
     def get_stats(self) -> Dict[str, Any]:
-        """Get statistics about the embedding service."""
+        """
+        Get statistics about the embedding service.
+        
+        Counters are maintained on insert and delete, so this doesn't depend
+        on corpus size. `sources`, `users` and `connectors` break the
+        document, chunk, token and byte counts down by source_type, user_id
+        and connector_id.
+        """
+        stats = self._stats.to_dict()
+        size = len(self._ids)
         return {
-            "document_count": len(self.documents),
-            "total_tokens": sum(len(doc.split()) for doc in self.documents.values()),
-            "sources": self._count_sources(),
-            "last_updated": datetime.now().isoformat()
+            "document_count": stats["documents"],
+            "chunk_count": stats["chunks"],
+            "total_tokens": stats["tokens"],
+            "total_bytes": stats["bytes"],
+            "sources": stats["sources"],
+            "users": stats["users"],
+            "connectors": stats["connectors"],
+            "index": {
+                "dimensions": self.dimensions,
+                "rows": size,
+                "capacity": self._vectors.shape[0],
+                "deleted_rows": size - len(self._rows),
+                "vector_bytes": self._vectors.nbytes,
+                "column_bytes": self._columns.nbytes + self._live.nbytes,
+                "memory_mapped": not self._vectors.flags.writeable,
+            },
+            "durability": None if self._wal is None else {
+                "fsync": self._wal.fsync,
+                "last_lsn": self._wal.last_lsn,
+                "durable_lsn": self._wal.durable_lsn,
+                "snapshot_lsn": self._snapshot_lsn,
+            },
+            "last_ingest_at": stats["last_ingest_at"],
+            "last_updated": stats["last_updated"],
         }
-    
-    def _count_sources(self) -> Dict[str, int]:
-        """Count documents by source type."""
-        sources = {}
-        for metadata in self.metadata.values():
-            source_type = metadata.get("source_type", "unknown")
-            sources[source_type] = sources.get(source_type, 0) + 1
-        return sources
 
-# Singleton instance
-embedding_service = EmbeddingService()
+# Singleton instance, created on first use (or by startup warm-up) so that
+# importing this module never loads an index
+_embedding_service: Optional[EmbeddingService] = None
+_embedding_service_lock = threading.Lock()
+
+def get_embedding_service() -> EmbeddingService:
+    """
+    Get the process-wide embedding service.
+
+    VECTOR_DATA_DIR makes the index durable (see `open`). Otherwise
+    VECTOR_INDEX_PATH points at an index saved with `save`; it is
+    memory-mapped so every worker process shares it.
+    """
+    global _embedding_service
+    if _embedding_service is None:
+        with _embedding_service_lock:
+            if _embedding_service is None:
+                reranker = create_reranking_stage()
+                encoder = create_encoder()
+                if os.getenv("VECTOR_DATA_DIR"):
+                    _embedding_service = EmbeddingService.open(
+                        os.environ["VECTOR_DATA_DIR"],
+                        fsync=os.getenv("VECTOR_WAL_FSYNC", FSYNC_GROUP),
+                        group_commit_interval=float(os.getenv("VECTOR_WAL_GROUP_COMMIT_MS", "0")) / 1000,
+                        reranker=reranker,
+                        encoder=encoder,
+                    )
+                elif os.getenv("VECTOR_INDEX_PATH"):
+                    _embedding_service = EmbeddingService.load(
+                        os.environ["VECTOR_INDEX_PATH"], reranker=reranker, encoder=encoder
+                    )
+                else:
+                    _embedding_service = EmbeddingService(reranker=reranker, encoder=encoder)
+    return _embedding_service
+
+def close_embedding_service():
+    """Close the process-wide embedding service, if it was created."""
+    if _embedding_service is not None:
+        _embedding_service.close()
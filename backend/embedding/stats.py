@@ -0,0 +1,101 @@
+from typing import Dict, Any, Optional, Set, Tuple
+from datetime import datetime
+
+# Fields a chunk's counts are broken down by
+BREAKDOWN_FIELDS = {"sources": "source_type", "users": "user_id", "connectors": "connector_id"}
+
+
+class Counts:
+    """Document, chunk, token and byte totals for one slice of the index."""
+
+    __slots__ = ("documents", "chunks", "tokens", "bytes")
+
+    def __init__(self):
+        self.documents = 0
+        self.chunks = 0
+        self.tokens = 0
+        self.bytes = 0
+
+    def add(self, chunks: int, tokens: int, size: int, documents: int = 0):
+        self.documents += documents
+        self.chunks += chunks
+        self.tokens += tokens
+        self.bytes += size
+
+    def is_empty(self) -> bool:
+        return self.chunks == 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return {"documents": self.documents, "chunks": self.chunks, "tokens": self.tokens, "bytes": self.bytes}
+
+
+class IndexStats:
+    """
+    Corpus statistics maintained incrementally as chunks come and go.
+
+    Each chunk's contribution (token and byte counts, document and
+    breakdown keys) is remembered when it is added, so removing it later
+    needs neither its content nor its metadata, and reading the totals
+    never walks the corpus.
+    """
+
+    def __init__(self):
+        self.total = Counts()
+        self.breakdowns: Dict[str, Dict[Any, Counts]] = {name: {} for name in BREAKDOWN_FIELDS}
+        # chunk_id -> (document_id, tokens, bytes, breakdown keys)
+        self._chunks: Dict[str, Tuple[Any, int, int, Tuple[Any, ...]]] = {}
+        self._documents: Dict[Any, Set[str]] = {}
+        self.last_ingest_at: Optional[str] = None
+        self.last_updated: Optional[str] = None
+
+    def _apply(self, keys: Tuple[Any, ...], sign: int, tokens: int, size: int, new_document: bool):
+        documents = sign if new_document else 0
+        self.total.add(sign, sign * tokens, sign * size, documents)
+        for (name, breakdown), key in zip(self.breakdowns.items(), keys):
+            counts = breakdown.get(key)
+            if counts is None:
+                counts = breakdown[key] = Counts()
+            counts.add(sign, sign * tokens, sign * size, documents)
+            if counts.is_empty():
+                del breakdown[key]
+
+    def add_chunk(self, chunk_id: str, content: str, metadata: Dict[str, Any]):
+        """Count a chunk; a chunk already counted is replaced."""
+        self.remove_chunk(chunk_id)
+        document_id = metadata.get("document_id", chunk_id)
+        tokens = len(content.split())
+        size = len(content.encode("utf-8"))
+        keys = tuple(metadata.get(field, "unknown") for field in BREAKDOWN_FIELDS.values())
+        self._chunks[chunk_id] = (document_id, tokens, size, keys)
+        document_chunks = self._documents.setdefault(document_id, set())
+        document_chunks.add(chunk_id)
+        # A document counts once overall, and once in each breakdown of its first chunk
+        self._apply(keys, 1, tokens, size, new_document=len(document_chunks) == 1)
+        self.last_ingest_at = self.last_updated = datetime.now().isoformat()
+
+    def remove_chunk(self, chunk_id: str):
+        entry = self._chunks.pop(chunk_id, None)
+        if entry is None:
+            return
+        document_id, tokens, size, keys = entry
+        document_chunks = self._documents[document_id]
+        document_chunks.discard(chunk_id)
+        if not document_chunks:
+            del self._documents[document_id]
+        self._apply(keys, -1, tokens, size, new_document=not document_chunks)
+        self.last_updated = datetime.now().isoformat()
+
+    def document_chunks(self, document_id: Any) -> Set[str]:
+        """IDs of the chunks counted for a document."""
+        return set(self._documents.get(document_id, ()))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            **self.total.to_dict(),
+            **{
+                name: {key: counts.to_dict() for key, counts in breakdown.items()}
+                for name, breakdown in self.breakdowns.items()
+            },
+            "last_ingest_at": self.last_ingest_at,
+            "last_updated": self.last_updated,
+        }
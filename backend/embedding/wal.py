@@ -0,0 +1,360 @@
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+import asyncio
+import json
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from backend.utils.metrics import metrics_registry
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# fsync policies: every append, batched across appends (group commit), or never
+FSYNC_ALWAYS = "always"
+FSYNC_GROUP = "group"
+FSYNC_NONE = "none"
+FSYNC_POLICIES = (FSYNC_ALWAYS, FSYNC_GROUP, FSYNC_NONE)
+
+# Record frame: payload length, CRC32 of LSN + payload, LSN
+_FRAME = struct.Struct("<IIQ")
+_LSN = struct.Struct("<Q")
+_HEADER_LENGTH = struct.Struct("<I")
+
+_SEGMENT_PREFIX = "wal-"
+_SEGMENT_SUFFIX = ".log"
+
+WAL_APPENDS = metrics_registry.counter("wal_appends_total", "Records appended to the write-ahead log", ["op"])
+WAL_FSYNCS = metrics_registry.counter("wal_fsyncs_total", "fsync calls made by the write-ahead log")
+WAL_FSYNC_DURATION = metrics_registry.histogram("wal_fsync_seconds", "Duration of write-ahead log fsyncs")
+WAL_GROUP_SIZE = metrics_registry.histogram(
+    "wal_group_commit_records", "Records made durable by one fsync", buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256)
+)
+
+
+def _segment_name(first_lsn: int) -> str:
+    return f"{_SEGMENT_PREFIX}{first_lsn:020d}{_SEGMENT_SUFFIX}"
+
+
+def encode_record(lsn: int, op: Dict[str, Any], vectors: Optional[np.ndarray] = None) -> bytes:
+    """Frame one operation: a JSON header, then the raw float32 vectors if any."""
+    if vectors is not None:
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        op = {**op, "shape": list(vectors.shape)}
+    header = json.dumps(op, default=str, separators=(",", ":")).encode("utf-8")
+    payload = _HEADER_LENGTH.pack(len(header)) + header + (vectors.tobytes() if vectors is not None else b"")
+    lsn_bytes = _LSN.pack(lsn)
+    return _FRAME.pack(len(payload), zlib.crc32(payload, zlib.crc32(lsn_bytes)), lsn) + payload
+
+
+def _decode_payload(payload: memoryview) -> Tuple[Dict[str, Any], Optional[np.ndarray]]:
+    (header_length,) = _HEADER_LENGTH.unpack_from(payload)
+    end = _HEADER_LENGTH.size + header_length
+    op = json.loads(bytes(payload[_HEADER_LENGTH.size:end]))
+    shape = op.pop("shape", None)
+    vectors = None if shape is None else np.frombuffer(payload[end:], dtype=np.float32).reshape(shape).copy()
+    return op, vectors
+
+
+def _scan(data: bytes) -> Iterator[Tuple[int, int, memoryview]]:
+    """Yield (end offset, LSN, payload) for each intact record, stopping at the first torn or corrupt one."""
+    view = memoryview(data)
+    offset = 0
+    while offset + _FRAME.size <= len(data):
+        length, crc, lsn = _FRAME.unpack_from(data, offset)
+        end = offset + _FRAME.size + length
+        if end > len(data):
+            return
+        payload = view[offset + _FRAME.size:end]
+        if zlib.crc32(payload, zlib.crc32(_LSN.pack(lsn))) != crc:
+            return
+        yield end, lsn, payload
+        offset = end
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class WriteAheadLog:
+    """
+    Append-only log of index mutations, split into segment files named by
+    the LSN (log sequence number) of their first record.
+
+    Every append is written to the OS straight away, so a crashed process
+    loses nothing; the fsync policy decides when records also survive a
+    power loss. With "group" (group commit), a background thread fsyncs
+    everything written since its last fsync, optionally after waiting
+    `group_commit_interval` seconds for more writers, so records appended
+    while an fsync is running share the next one; callers that need
+    durability wait for their LSN with `wait_durable`. Opening the log truncates a torn
+    record at its tail. One process at a time may have a log open.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        fsync: str = FSYNC_GROUP,
+        group_commit_interval: float = 0.0,
+        segment_bytes: int = 64 * 1024 * 1024,
+        start_lsn: int = 0,
+    ):
+        """
+        Open (or create) a log.
+
+        Args:
+            directory: Directory holding the segments
+            fsync: "always", "group" or "none"
+            group_commit_interval: Seconds the group commit waits for more writers
+            segment_bytes: Size at which a new segment is started
+            start_lsn: LSN to continue after if the log holds no later record,
+                e.g. that of a snapshot whose log segments were deleted
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy {fsync!r}; expected one of {', '.join(FSYNC_POLICIES)}")
+        self.directory = directory
+        self.fsync = fsync
+        self.group_commit_interval = group_commit_interval
+        self.segment_bytes = segment_bytes
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock_file = open(os.path.join(directory, "LOCK"), "w")
+        if fcntl is not None:
+            try:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                self._lock_file.close()
+                raise RuntimeError(f"Write-ahead log {directory} is in use by another process")
+
+        self._lock = threading.Lock()
+        self._durable = threading.Condition(self._lock)
+        # Coroutines waiting for an LSN to become durable: (lsn, loop, future)
+        self._waiters: List[Tuple[int, asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self._closed = False
+        self.last_lsn = 0
+        self._recover()
+        # Records in the last segment must directly follow start_lsn, or they go in a new one
+        reuse_last = self.last_lsn >= start_lsn
+        self.last_lsn = self.durable_lsn = max(self.last_lsn, start_lsn)
+        self._open_segment(self.last_lsn + 1, reuse_last=reuse_last)
+
+        self._syncer = None
+        if fsync == FSYNC_GROUP:
+            self._syncer = threading.Thread(target=self._sync_loop, name="wal-sync", daemon=True)
+            self._syncer.start()
+
+    def _segments(self) -> List[Tuple[int, str]]:
+        """(first LSN, path) of each segment, in order."""
+        segments = []
+        for name in os.listdir(self.directory):
+            if name.startswith(_SEGMENT_PREFIX) and name.endswith(_SEGMENT_SUFFIX):
+                first_lsn = int(name[len(_SEGMENT_PREFIX):-len(_SEGMENT_SUFFIX)])
+                segments.append((first_lsn, os.path.join(self.directory, name)))
+        return sorted(segments)
+
+    def _recover(self):
+        """Find the last intact record; cut off a torn tail and anything after it."""
+        segments = self._segments()
+        for index, (_, path) in enumerate(segments):
+            with open(path, "rb") as f:
+                data = f.read()
+            valid = 0
+            for valid, lsn, _ in _scan(data):
+                self.last_lsn = lsn
+            if valid == len(data):
+                continue
+            later = segments[index + 1:]
+            logger.warning(
+                "Write-ahead log %s: truncating %d bytes after LSN %d%s",
+                path, len(data) - valid, self.last_lsn,
+                f" and dropping {len(later)} later segments" if later else "",
+            )
+            with open(path, "r+b") as f:
+                f.truncate(valid)
+                os.fsync(f.fileno())
+            for _, later_path in later:
+                os.remove(later_path)
+            break
+
+    def _open_segment(self, first_lsn: int, reuse_last: bool = False):
+        segments = self._segments()
+        if reuse_last and segments:
+            path = segments[-1][1]
+        else:
+            path = os.path.join(self.directory, _segment_name(first_lsn))
+        self._file = open(path, "ab", buffering=0)
+        self._segment_size = self._file.tell()
+
+    def append(self, op: Dict[str, Any], vectors: Optional[np.ndarray] = None) -> int:
+        """
+        Append an operation.
+
+        Args:
+            op: JSON-serializable operation; `op["op"]` names it
+            vectors: Optional float32 matrix stored alongside it
+
+        Returns:
+            The record's LSN. It is durable on return under the "always"
+            policy; under "group", see `wait_durable`.
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Write-ahead log is closed")
+            lsn = self.last_lsn + 1
+            record = encode_record(lsn, op, vectors)
+            if self._segment_size and self._segment_size + len(record) > self.segment_bytes:
+                self._rotate_locked(lsn)
+            self._file.write(record)
+            self._segment_size += len(record)
+            self.last_lsn = lsn
+            if self.fsync == FSYNC_ALWAYS:
+                self._fsync(self._file.fileno(), 1)
+                self.durable_lsn = lsn
+            elif self.fsync == FSYNC_GROUP:
+                self._durable.notify_all()
+        WAL_APPENDS.inc(op=op.get("op", "unknown"))
+        return lsn
+
+    def _fsync(self, fd: int, records: int):
+        start = time.perf_counter()
+        os.fsync(fd)
+        WAL_FSYNCS.inc()
+        WAL_FSYNC_DURATION.observe(time.perf_counter() - start)
+        WAL_GROUP_SIZE.observe(records)
+
+    def _sync_loop(self):
+        while True:
+            with self._lock:
+                while self.durable_lsn >= self.last_lsn and not self._closed:
+                    self._durable.wait()
+                if self._closed:
+                    return
+            # Let more writers join this commit
+            time.sleep(self.group_commit_interval)
+            with self._lock:
+                if self._closed:
+                    return
+                target = self.last_lsn
+                records = target - self.durable_lsn
+                # A duplicate descriptor stays valid if the segment is rotated meanwhile
+                fd = os.dup(self._file.fileno())
+            # Appends carry on while the fsync runs
+            try:
+                self._fsync(fd, records)
+            finally:
+                os.close(fd)
+            with self._lock:
+                self.durable_lsn = max(self.durable_lsn, target)
+                self._notify_durable()
+
+    def _notify_durable(self):
+        """Wake threads and coroutines whose records are now durable (call with the lock held)."""
+        self._durable.notify_all()
+        waiting = []
+        for waiter in self._waiters:
+            lsn, loop, future = waiter
+            if lsn <= self.durable_lsn or self._closed:
+                loop.call_soon_threadsafe(_resolve, future)
+            else:
+                waiting.append(waiter)
+        self._waiters = waiting
+
+    def wait_durable(self, lsn: Optional[int] = None, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the record `lsn` (default: the last one) is durable.
+
+        Under the "none" policy records never become durable, so this
+        returns straight away.
+
+        Returns:
+            Whether the record is durable (or the policy is "none")
+        """
+        if self.fsync == FSYNC_NONE:
+            return True
+        with self._lock:
+            lsn = self.last_lsn if lsn is None else lsn
+            return self._durable.wait_for(lambda: self.durable_lsn >= lsn or self._closed, timeout)
+
+    async def wait_durable_async(self, lsn: Optional[int] = None):
+        """`wait_durable` for coroutines; the syncer wakes them without tying up a thread each."""
+        if self.fsync == FSYNC_NONE:
+            return
+        with self._lock:
+            lsn = self.last_lsn if lsn is None else lsn
+            if self.durable_lsn >= lsn or self._closed:
+                return
+            future = asyncio.get_running_loop().create_future()
+            self._waiters.append((lsn, future.get_loop(), future))
+        await future
+
+    def _rotate_locked(self, first_lsn: int):
+        self._file.close()
+        # Nothing to fsync ahead of the new segment under "none"; otherwise
+        # make the closed one durable, as the syncer only tracks the open file
+        if self.fsync != FSYNC_NONE:
+            with open(self._file.name, "rb") as closed:
+                os.fsync(closed.fileno())
+            self.durable_lsn = max(self.durable_lsn, first_lsn - 1)
+            self._notify_durable()
+        self._open_segment(first_lsn)
+
+    def rotate(self) -> int:
+        """
+        Start a new segment.
+
+        Returns:
+            The LSN of the last record in the closed segments
+        """
+        with self._lock:
+            if self._segment_size:
+                self._rotate_locked(self.last_lsn + 1)
+            return self.last_lsn
+
+    def truncate(self, lsn: int):
+        """Delete segments holding only records up to `lsn` (e.g. covered by a snapshot)."""
+        segments = self._segments()
+        for (_, path), (next_first_lsn, _) in zip(segments, segments[1:]):
+            if next_first_lsn - 1 <= lsn:
+                os.remove(path)
+
+    def replay(self, after_lsn: int = 0) -> Iterator[Tuple[int, Dict[str, Any], Optional[np.ndarray]]]:
+        """Yield (LSN, op, vectors) for every record after `after_lsn`, in order."""
+        segments = self._segments()
+        for index, (_, path) in enumerate(segments):
+            if index + 1 < len(segments) and segments[index + 1][0] - 1 <= after_lsn:
+                continue
+            with open(path, "rb") as f:
+                data = f.read()
+            for _, lsn, payload in _scan(data):
+                if lsn > after_lsn:
+                    op, vectors = _decode_payload(payload)
+                    yield lsn, op, vectors
+
+    def size(self) -> int:
+        """Bytes in all segments on disk."""
+        return sum(os.path.getsize(path) for _, path in self._segments())
+
+    def close(self):
+        """Make everything durable (unless the policy is "none") and release the log."""
+        with self._lock:
+            if self._closed:
+                return
+            if self.fsync != FSYNC_NONE and self.durable_lsn < self.last_lsn:
+                self._fsync(self._file.fileno(), self.last_lsn - self.durable_lsn)
+                self.durable_lsn = self.last_lsn
+            self._closed = True
+            self._notify_durable()
+            self._file.close()
+        if self._syncer is not None:
+            self._syncer.join()
+        self._lock_file.close()
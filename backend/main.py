@@ -1,8 +1,13 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, Query, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordBearer
+from fastapi.responses import Response, JSONResponse
 from typing import List, Dict, Any, Optional
-import uvicorn
+import asyncio
+import os
+
+from backend.utils.profiler import MAX_PROFILE_SECONDS
+from backend.utils.warmup import warmup_registry
 
 app = FastAPI(
     title="BibliosAI API",
@@ -10,13 +15,33 @@ app = FastAPI(
     version="0.1.0",
 )
 
-# Configure CORS
+# Rate limiting and load shedding, keyed by the user when the bearer token is valid
+def identify_user(token: str) -> Optional[str]:
+    from backend.api.auth import get_user_from_token
+    user = get_user_from_token(token)
+    return user.email if user else None
+
+if os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true":
+    from backend.utils.rate_limit import RateLimitMiddleware, create_rate_limit_backend
+    app.add_middleware(
+        RateLimitMiddleware,
+        identify=identify_user,
+        backend=create_rate_limit_backend(),
+        lag_threshold=float(os.getenv("LOAD_SHED_LAG_THRESHOLD", "0.1")),
+    )
+
+# Request timing; added after the rate limiter so it wraps it and times rejected requests too
+from backend.utils.tracing import RequestTimingMiddleware
+app.add_middleware(RequestTimingMiddleware)
+
+# Configure CORS; added last so it is outermost and 429/503 responses carry CORS headers
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000"],  # Frontend URL
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After"],
 )
 
 # OAuth2 scheme for token authentication
@@ -36,16 +61,169 @@ async def health_check():
     """Health check endpoint."""
     return {"status": "healthy"}
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 503 until startup warm-up has finished, while /health only reports liveness."""
+    if warmup_registry.is_ready():
+        return {"status": "ready", "warmup": warmup_registry.status()}
+    warmup = warmup_registry.status()
+    failed = any(task["status"] == "failed" for task in warmup.values())
+    return JSONResponse(
+        {"status": "failed" if failed else "starting", "warmup": warmup},
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics endpoint."""
+    from backend.utils.metrics import metrics_registry, PROMETHEUS_CONTENT_TYPE
+    return Response(content=metrics_registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+def profiler_authorized(token: str) -> bool:
+    """
+    Whether a bearer token may run the profiler: PROFILER_TOKEN itself, or
+    a user listed in PROFILER_ADMINS (comma-separated emails). With
+    neither configured, nobody may.
+    """
+    import hmac
+    profiler_token = os.getenv("PROFILER_TOKEN", "")
+    if profiler_token and hmac.compare_digest(token.encode(), profiler_token.encode()):
+        return True
+    admins = {email.strip().lower() for email in os.getenv("PROFILER_ADMINS", "").split(",") if email.strip()}
+    if not admins:
+        return False
+    from backend.api.auth import get_user_from_token
+    user = get_user_from_token(token)
+    return user is not None and user.email.lower() in admins
+
+@app.get("/debug/profile", include_in_schema=False)
+async def profile(seconds: float = Query(10.0, gt=0, le=MAX_PROFILE_SECONDS), token: str = Depends(oauth2_scheme)):
+    """Sample live traffic for N seconds and return collapsed stacks for a flame graph. Opt-in via PROFILER_ENABLED."""
+    if os.getenv("PROFILER_ENABLED", "false").lower() != "true":
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    from backend.utils.profiler import get_profiler, ProfilerBusyError
+    if not profiler_authorized(token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed to run the profiler")
+    try:
+        stacks = await asyncio.to_thread(get_profiler().profile_collapsed, seconds)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return Response(content=stacks, media_type="text/plain")
+
+# Heavy dependencies are imported and loaded on first use; these tasks load
+# them ahead of traffic without delaying startup
+@warmup_registry.register("imports")
+def warm_imports():
+    import jose.jwt  # noqa: F401
+    import backend.utils.http_client  # noqa: F401
+
+@warmup_registry.register("password_hasher")
+def warm_password_hasher():
+    from backend.auth.security import get_password_hasher
+    get_password_hasher().prepare()
+
+@warmup_registry.register("action_extraction")
+def warm_action_extraction():
+    from backend.actions.extraction import get_suggested_action_pipeline
+    get_suggested_action_pipeline()
+
+@warmup_registry.register("embedding_index")
+def warm_embedding_index():
+    from backend.embedding.cluster import get_search_index
+    get_search_index()
+
+@app.on_event("startup")
+async def start_warmup():
+    """Warm up per STARTUP_WARMUP: "background" (default), "blocking" (before serving) or "off" (first use)."""
+    mode = os.getenv("STARTUP_WARMUP", "background")
+    if mode == "off":
+        warmup_registry.skip()
+    elif mode == "blocking":
+        await warmup_registry.run()
+    else:
+        app.state.warmup_task = asyncio.create_task(warmup_registry.run())
+
+@app.on_event("startup")
+async def start_job_worker():
+    """Run a job worker inside the API process unless workers run separately."""
+    if os.getenv("JOB_WORKER_MODE", "inline") != "inline":
+        return
+    from backend.utils.job_queue import JobWorker, get_job_queue
+    worker = JobWorker(get_job_queue(), concurrency=int(os.getenv("JOB_WORKER_CONCURRENCY", "4")))
+    app.state.job_worker = worker
+    app.state.job_worker_task = asyncio.create_task(worker.run())
+
+@app.on_event("startup")
+async def start_event_bus():
+    """Start relaying events published by other API and job worker processes."""
+    from backend.utils.events import event_bus
+    await event_bus.start()
+
+@app.on_event("startup")
+async def start_index_snapshots():
+    """Snapshot a durable vector index (VECTOR_DATA_DIR) once its write-ahead log passes VECTOR_SNAPSHOT_WAL_MB."""
+    if not os.getenv("VECTOR_DATA_DIR") or os.getenv("INDEX_NODES"):
+        return
+    from backend.embedding.service import get_embedding_service
+    interval = float(os.getenv("VECTOR_SNAPSHOT_INTERVAL", "60"))
+    threshold = float(os.getenv("VECTOR_SNAPSHOT_WAL_MB", "64")) * 1024 * 1024
+
+    async def snapshot_periodically():
+        while True:
+            await asyncio.sleep(interval)
+            service = await asyncio.to_thread(get_embedding_service)
+            if service.wal_size() >= threshold:
+                await service.snapshot_async()
+
+    app.state.index_snapshot_task = asyncio.create_task(snapshot_periodically())
+
+@app.on_event("shutdown")
+async def close_embedding_index():
+    """Stop snapshotting and make the vector index's logged changes durable."""
+    task = getattr(app.state, "index_snapshot_task", None)
+    if task is not None:
+        task.cancel()
+    from backend.embedding.service import close_embedding_service
+    close_embedding_service()
+
+@app.on_event("shutdown")
+async def stop_event_bus():
+    from backend.utils.events import event_bus
+    await event_bus.stop()
+
+@app.on_event("shutdown")
+async def stop_job_worker():
+    """Let in-flight jobs finish; anything unfinished is redelivered after its lease expires."""
+    worker = getattr(app.state, "job_worker", None)
+    if worker is not None:
+        worker.stop()
+        await app.state.job_worker_task
+
+@app.on_event("shutdown")
+async def close_index_coordinator():
+    """Close the connections to the index nodes (INDEX_NODES)."""
+    from backend.embedding.cluster import close_index_coordinator
+    await close_index_coordinator()
+
+@app.on_event("shutdown")
+async def close_connector_http_pools():
+    """Close the pooled connections shared by the connectors."""
+    from backend.utils.http_client import close_http_client
+    await close_http_client()
+
 # Import and include routers
 from backend.api.auth import router as auth_router
 from backend.api.connectors import router as connectors_router
 from backend.api.chat import router as chat_router
 from backend.api.actions import router as actions_router
+from backend.api.events import router as events_router
 
 app.include_router(auth_router, prefix="/auth", tags=["Authentication"])
 app.include_router(connectors_router, prefix="/connectors", tags=["Data Connectors"])
 app.include_router(chat_router, prefix="/chat", tags=["Chat"])
 app.include_router(actions_router, prefix="/actions", tags=["Actions"])
+app.include_router(events_router, prefix="/events", tags=["Events"])
 
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
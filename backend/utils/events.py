@@ -0,0 +1,210 @@
+from typing import Dict, Any, Optional, Set
+from datetime import datetime
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Per-subscriber buffer; slow consumers drop their oldest events rather than stall publishers
+SUBSCRIBER_QUEUE_SIZE = 256
+
+
+class Subscription:
+    """A user's live event stream."""
+
+    def __init__(self, bus: "EventBus", user_id: str):
+        self.bus = bus
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.loop = asyncio.get_running_loop()
+
+    def _deliver(self, event: Dict[str, Any]):
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    async def get(self) -> Dict[str, Any]:
+        return await self.queue.get()
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+
+class LocalEventBackend:
+    """Delivers events only within this process."""
+
+    def __init__(self):
+        self._dispatch = None
+
+    def attach(self, dispatch):
+        self._dispatch = dispatch
+
+    def publish(self, user_id: str, event: Dict[str, Any]):
+        self._dispatch(user_id, event)
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+
+class SQLiteEventBackend:
+    """
+    Fans events out across processes through a shared SQLite table.
+
+    Stand-in for a Redis/NATS style broker on a single host: publishers
+    append rows, and every process tails the table and dispatches new rows to
+    its own subscribers. Rows older than `retention` seconds are pruned.
+    """
+
+    def __init__(self, path: str, poll_interval: float = 0.1, retention: float = 300.0):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self._local = threading.local()
+        self._dispatch = None
+        self._task: Optional[asyncio.Task] = None
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS events ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT NOT NULL,"
+            " payload TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._last_id = self._connection().execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def attach(self, dispatch):
+        self._dispatch = dispatch
+
+    def publish(self, user_id: str, event: Dict[str, Any]):
+        # Delivered to local subscribers by the tail loop, like everyone else's
+        self._connection().execute(
+            "INSERT INTO events (user_id, payload, created_at) VALUES (?, ?, ?)",
+            (user_id, json.dumps(event, default=str), time.time()),
+        )
+
+    def _read_new(self):
+        rows = self._connection().execute(
+            "SELECT id, user_id, payload FROM events WHERE id > ? ORDER BY id", (self._last_id,)
+        ).fetchall()
+        if rows:
+            self._last_id = rows[-1][0]
+        return rows
+
+    def _prune(self):
+        self._connection().execute("DELETE FROM events WHERE created_at < ?", (time.time() - self.retention,))
+
+    async def _tail(self):
+        last_prune = time.monotonic()
+        while True:
+            try:
+                for _, user_id, payload in await asyncio.to_thread(self._read_new):
+                    self._dispatch(user_id, json.loads(payload))
+                if time.monotonic() - last_prune > self.retention:
+                    await asyncio.to_thread(self._prune)
+                    last_prune = time.monotonic()
+            except Exception:
+                logger.exception("Failed to read events")
+            await asyncio.sleep(self.poll_interval)
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._tail())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+class EventBus:
+    """
+    Per-user publish/subscribe for action and sync status events.
+
+    `publish` may be called from any thread; events are handed to each
+    subscriber on its own event loop.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or LocalEventBackend()
+        self.backend.attach(self._dispatch)
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id: str) -> Subscription:
+        subscription = Subscription(self, user_id)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.user_id]
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def publish(self, user_id: str, event_type: str, data: Dict[str, Any]):
+        """Publish an event to every stream the user has open, in any worker."""
+        event = {
+            "type": event_type,
+            "data": data,
+            "timestamp": datetime.now().isoformat(),
+        }
+        try:
+            self.backend.publish(user_id, event)
+        except Exception:
+            # Status pushes are best-effort; never fail the operation that emitted them
+            logger.exception("Failed to publish %s event", event_type)
+
+    def _dispatch(self, user_id: str, event: Dict[str, Any]):
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for subscription in subscribers:
+            try:
+                running_loop = asyncio.get_running_loop()
+            except RuntimeError:
+                running_loop = None
+            if running_loop is subscription.loop:
+                subscription._deliver(event)
+            else:
+                subscription.loop.call_soon_threadsafe(subscription._deliver, event)
+
+    async def start(self):
+        await self.backend.start()
+
+    async def stop(self):
+        await self.backend.stop()
+
+
+def _create_event_bus() -> EventBus:
+    if os.getenv("EVENT_BACKEND", "local") == "sqlite":
+        return EventBus(SQLiteEventBackend(os.getenv("EVENT_DB_PATH", "data/events.db")))
+    return EventBus()
+
+
+# Singleton instance
+event_bus = _create_event_bus()
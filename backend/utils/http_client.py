@@ -0,0 +1,261 @@
+from typing import Dict, Any, Optional, Callable, List
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+import asyncio
+import hashlib
+import os
+import random
+
+import httpx
+
+# HTTP/2 needs the optional `h2` package; fall back to HTTP/1.1 keep-alive without it
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Status codes that indicate the provider is throttling or temporarily unavailable
+RETRY_STATUS_CODES = {429, 502, 503, 504}
+
+# Methods that can be safely re-sent after a transport error
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+
+class CachedResponse:
+    """A GET response kept around so it can be revalidated with a conditional request."""
+
+    def __init__(self, response: httpx.Response):
+        self.status_code = response.status_code
+        self.headers = httpx.Headers(response.headers)
+        self.content = response.content
+        self.etag = response.headers.get("etag")
+        self.last_modified = response.headers.get("last-modified")
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def to_response(self, request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            status_code=self.status_code,
+            headers=self.headers,
+            content=self.content,
+            request=request,
+        )
+
+
+class PooledHTTPClient:
+    """
+    Shared async HTTP client used by all connector implementations.
+
+    Keeps one keep-alive connection pool per host (negotiating HTTP/2 when
+    available), revalidates cached GET responses with ETag/If-Modified-Since,
+    and retries throttled or failed requests honouring `Retry-After`.
+    """
+
+    def __init__(
+        self,
+        max_connections_per_host: int = 20,
+        max_keepalive_per_host: int = 10,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 30.0,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        max_backoff: float = 30.0,
+        cache_size: int = 1024,
+        http2: Optional[bool] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections_per_host,
+            max_keepalive_connections=max_keepalive_per_host,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+        self.cache_size = cache_size
+        self.http2 = HTTP2_AVAILABLE if http2 is None else (http2 and HTTP2_AVAILABLE)
+        self._transport = transport
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._cache: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._response_hooks: List[Callable[[httpx.Response], None]] = []
+        self.stats = {
+            "requests": 0,
+            "not_modified": 0,
+            "retries": 0,
+            "bytes_received": 0,
+        }
+
+    def add_response_hook(self, hook: Callable[[httpx.Response], None]):
+        """Register a callback invoked with every response received from the network."""
+        self._response_hooks.append(hook)
+
+    def _client_for(self, url: str) -> httpx.AsyncClient:
+        """Get (or lazily create) the pooled client for the URL's host."""
+        parts = urlsplit(url)
+        host_key = f"{parts.scheme}://{parts.netloc}"
+        client = self._clients.get(host_key)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                limits=self.limits,
+                timeout=self.timeout,
+                http2=self.http2,
+                transport=self._transport,
+            )
+            self._clients[host_key] = client
+        return client
+
+    def _cache_key(self, url: str, params: Optional[Dict[str, Any]], headers: Dict[str, str]) -> str:
+        # Responses are only shared between callers presenting the same credentials
+        auth = headers.get("Authorization") or headers.get("authorization") or ""
+        full_url = str(httpx.URL(url, params=params))
+        return f"{full_url}|{hashlib.sha1(auth.encode()).hexdigest()}"
+
+    def _store(self, key: str, response: httpx.Response):
+        if not (response.headers.get("etag") or response.headers.get("last-modified")):
+            return
+        self._cache[key] = CachedResponse(response)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        """Delay before the next attempt, preferring the server's Retry-After."""
+        if response is not None:
+            retry_after = response.headers.get("retry-after")
+            if retry_after:
+                try:
+                    delay = float(retry_after)
+                except ValueError:
+                    try:
+                        retry_at = parsedate_to_datetime(retry_after)
+                        delay = (retry_at - datetime.now(timezone.utc)).total_seconds()
+                    except (TypeError, ValueError):
+                        delay = None
+                if delay is not None:
+                    return min(max(delay, 0.0), self.max_backoff)
+        delay = self.backoff_base * (2 ** attempt)
+        return min(delay, self.max_backoff) * (0.5 + random.random() / 2)
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: Optional[Dict[str, str]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        conditional: bool = True,
+        **kwargs,
+    ) -> httpx.Response:
+        """
+        Send a request through the host's connection pool.
+
+        Args:
+            method: HTTP method
+            url: Absolute URL
+            headers: Extra request headers
+            params: Query parameters
+            conditional: Revalidate cached GET responses instead of re-downloading them
+            **kwargs: Passed through to `httpx.AsyncClient.request` (json, data, ...)
+
+        Returns:
+            The response; a 304 from the server is transparently replaced by the cached response
+        """
+        method = method.upper()
+        headers = dict(headers or {})
+        client = self._client_for(url)
+
+        cache_key = None
+        cached = None
+        if method == "GET" and conditional:
+            cache_key = self._cache_key(url, params, headers)
+            cached = self._cache.get(cache_key)
+            if cached:
+                headers.update(cached.conditional_headers())
+
+        attempt = 0
+        while True:
+            response = None
+            try:
+                response = await client.request(method, url, headers=headers, params=params, **kwargs)
+            except httpx.TransportError:
+                if method not in IDEMPOTENT_METHODS or attempt >= self.max_retries:
+                    raise
+
+            if response is not None:
+                self.stats["requests"] += 1
+                self.stats["bytes_received"] += len(response.content)
+                for hook in self._response_hooks:
+                    hook(response)
+
+                retryable = response.status_code in RETRY_STATUS_CODES and (
+                    method in IDEMPOTENT_METHODS or "retry-after" in response.headers
+                )
+                if not retryable or attempt >= self.max_retries:
+                    break
+
+            self.stats["retries"] += 1
+            await asyncio.sleep(self._retry_delay(attempt, response))
+            attempt += 1
+
+        if response.status_code == 304 and cached is not None:
+            self.stats["not_modified"] += 1
+            self._cache.move_to_end(cache_key)
+            return cached.to_response(response.request)
+
+        if cache_key is not None and response.status_code == 200:
+            self._store(cache_key, response)
+
+        return response
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def get_json(self, url: str, **kwargs) -> Any:
+        """GET a URL and decode its JSON body, raising for error statuses."""
+        response = await self.get(url, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    async def aclose(self):
+        """Close all pooled connections."""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            await client.aclose()
+
+
+# Singleton instance, created on first use
+_http_client: Optional[PooledHTTPClient] = None
+
+
+def get_http_client() -> PooledHTTPClient:
+    """Get the process-wide pooled HTTP client."""
+    global _http_client
+    if _http_client is None:
+        _http_client = PooledHTTPClient(
+            max_connections_per_host=int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "20")),
+            max_keepalive_per_host=int(os.getenv("HTTP_MAX_KEEPALIVE_PER_HOST", "10")),
+            max_retries=int(os.getenv("HTTP_MAX_RETRIES", "3")),
+        )
+    return _http_client
+
+
+async def close_http_client():
+    """Close the process-wide HTTP client, if it was ever created."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
@@ -0,0 +1,401 @@
+from typing import Dict, Any, Optional, List, Callable, Awaitable
+from datetime import datetime
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Job states
+JOB_QUEUED = "queued"
+JOB_LEASED = "leased"
+JOB_COMPLETED = "completed"
+JOB_DEAD = "dead"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    available_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires_at REAL,
+    last_error TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, available_at);
+CREATE INDEX IF NOT EXISTS jobs_lease ON jobs (status, lease_expires_at);
+"""
+
+# Job handlers by kind, registered by the modules that own the work
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+job_handlers: Dict[str, JobHandler] = {}
+
+
+def register_job_handler(kind: str, handler: JobHandler):
+    """Register the coroutine that processes jobs of a given kind."""
+    job_handlers[kind] = handler
+
+
+class Job:
+    """A job leased from the queue."""
+
+    def __init__(self, row: sqlite3.Row):
+        self.id = row["id"]
+        self.kind = row["kind"]
+        self.payload = json.loads(row["payload"])
+        self.status = row["status"]
+        self.attempts = row["attempts"]
+        self.max_attempts = row["max_attempts"]
+        self.lease_owner = row["lease_owner"]
+        self.lease_expires_at = row["lease_expires_at"]
+        self.last_error = row["last_error"]
+        self.created_at = row["created_at"]
+        self.updated_at = row["updated_at"]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "payload": self.payload,
+            "status": self.status,
+            "attempts": self.attempts,
+            "max_attempts": self.max_attempts,
+            "last_error": self.last_error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+
+class JobQueue:
+    """
+    Durable job queue stored in SQLite.
+
+    Jobs are leased by workers for a visibility timeout; a job whose lease
+    expires (worker crashed or was redeployed) becomes visible again. Failed
+    jobs are retried with exponential backoff and dead-lettered after
+    `max_attempts`. Several processes can share the same database file.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        visibility_timeout: float = 300.0,
+        max_attempts: int = 5,
+        backoff_base: float = 2.0,
+        max_backoff: float = 600.0,
+    ):
+        self.path = path
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+        self._local = threading.local()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get this thread's connection to the queue database."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def enqueue(
+        self,
+        kind: str,
+        payload: Dict[str, Any],
+        delay: float = 0.0,
+        max_attempts: Optional[int] = None,
+    ) -> str:
+        """
+        Add a job to the queue.
+
+        Args:
+            kind: Job kind, used to pick the handler
+            payload: JSON-serializable job arguments
+            delay: Seconds before the job becomes visible to workers
+            max_attempts: Attempts before the job is dead-lettered
+
+        Returns:
+            The job ID
+        """
+        job_id = uuid.uuid4().hex
+        now = datetime.now().isoformat()
+        self._connection().execute(
+            "INSERT INTO jobs (id, kind, payload, status, attempts, max_attempts, available_at, created_at, updated_at)"
+            " VALUES (?, ?, ?, ?, 0, ?, ?, ?, ?)",
+            (job_id, kind, json.dumps(payload), JOB_QUEUED, max_attempts or self.max_attempts,
+             time.time() + delay, now, now),
+        )
+        return job_id
+
+    def enqueue_many(self, kind: str, payloads: List[Dict[str, Any]], max_attempts: Optional[int] = None) -> List[str]:
+        """Add several jobs of the same kind in a single transaction."""
+        now = datetime.now().isoformat()
+        available_at = time.time()
+        rows = [
+            (uuid.uuid4().hex, kind, json.dumps(payload), JOB_QUEUED, max_attempts or self.max_attempts,
+             available_at, now, now)
+            for payload in payloads
+        ]
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.executemany(
+                "INSERT INTO jobs (id, kind, payload, status, attempts, max_attempts, available_at, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, 0, ?, ?, ?, ?)",
+                rows,
+            )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        return [row[0] for row in rows]
+
+    def lease(
+        self,
+        worker_id: str,
+        kinds: Optional[List[str]] = None,
+        visibility_timeout: Optional[float] = None,
+    ) -> Optional[Job]:
+        """
+        Lease the next visible job, if any.
+
+        Expired leases are picked up again; a job that has used all its
+        attempts is dead-lettered instead of being handed out.
+        """
+        timeout = visibility_timeout or self.visibility_timeout
+        connection = self._connection()
+        now = time.time()
+        kind_filter = ""
+        params: List[Any] = [JOB_QUEUED, now, JOB_LEASED, now]
+        if kinds:
+            kind_filter = f" AND kind IN ({','.join('?' for _ in kinds)})"
+            params.extend(kinds)
+
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            while True:
+                row = connection.execute(
+                    "SELECT * FROM jobs WHERE ((status = ? AND available_at <= ?)"
+                    " OR (status = ? AND lease_expires_at <= ?))" + kind_filter +
+                    " ORDER BY available_at LIMIT 1",
+                    params,
+                ).fetchone()
+                if row is None:
+                    connection.execute("COMMIT")
+                    return None
+
+                updated_at = datetime.now().isoformat()
+                if row["attempts"] >= row["max_attempts"]:
+                    # The last attempt's lease expired without the job being acked
+                    connection.execute(
+                        "UPDATE jobs SET status = ?, lease_owner = NULL, lease_expires_at = NULL,"
+                        " last_error = COALESCE(last_error, 'Lease expired'), updated_at = ? WHERE id = ?",
+                        (JOB_DEAD, updated_at, row["id"]),
+                    )
+                    continue
+
+                connection.execute(
+                    "UPDATE jobs SET status = ?, attempts = attempts + 1, lease_owner = ?,"
+                    " lease_expires_at = ?, updated_at = ? WHERE id = ?",
+                    (JOB_LEASED, worker_id, now + timeout, updated_at, row["id"]),
+                )
+                job_row = connection.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+                connection.execute("COMMIT")
+                return Job(job_row)
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    def extend_lease(self, job_id: str, worker_id: str, visibility_timeout: Optional[float] = None) -> bool:
+        """Push back a lease's expiry while a long job is still running."""
+        timeout = visibility_timeout or self.visibility_timeout
+        cursor = self._connection().execute(
+            "UPDATE jobs SET lease_expires_at = ? WHERE id = ? AND status = ? AND lease_owner = ?",
+            (time.time() + timeout, job_id, JOB_LEASED, worker_id),
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: str, worker_id: str) -> bool:
+        """Acknowledge a job. Returns False if the lease was lost to another worker."""
+        cursor = self._connection().execute(
+            "UPDATE jobs SET status = ?, lease_owner = NULL, lease_expires_at = NULL, updated_at = ?"
+            " WHERE id = ? AND status = ? AND lease_owner = ?",
+            (JOB_COMPLETED, datetime.now().isoformat(), job_id, JOB_LEASED, worker_id),
+        )
+        return cursor.rowcount == 1
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> Optional[str]:
+        """
+        Record a failed attempt.
+
+        The job is retried after an exponential backoff, or dead-lettered if
+        it has used all its attempts. Returns the job's new status, or None if
+        the lease was lost.
+        """
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND status = ? AND lease_owner = ?",
+            (job_id, JOB_LEASED, worker_id),
+        ).fetchone()
+        if row is None:
+            return None
+
+        if row["attempts"] >= row["max_attempts"]:
+            new_status = JOB_DEAD
+            available_at = time.time()
+        else:
+            new_status = JOB_QUEUED
+            delay = min(self.backoff_base ** row["attempts"], self.max_backoff)
+            available_at = time.time() + delay
+
+        cursor = connection.execute(
+            "UPDATE jobs SET status = ?, available_at = ?, lease_owner = NULL, lease_expires_at = NULL,"
+            " last_error = ?, updated_at = ? WHERE id = ? AND status = ? AND lease_owner = ?",
+            (new_status, available_at, error, datetime.now().isoformat(), job_id, JOB_LEASED, worker_id),
+        )
+        return new_status if cursor.rowcount == 1 else None
+
+    def get(self, job_id: str) -> Optional[Job]:
+        row = self._connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job(row) if row else None
+
+    def dead_letters(self, limit: int = 100) -> List[Job]:
+        """List dead-lettered jobs, most recent first."""
+        rows = self._connection().execute(
+            "SELECT * FROM jobs WHERE status = ? ORDER BY updated_at DESC LIMIT ?", (JOB_DEAD, limit)
+        ).fetchall()
+        return [Job(row) for row in rows]
+
+    def requeue(self, job_id: str) -> bool:
+        """Give a dead-lettered job a fresh set of attempts."""
+        cursor = self._connection().execute(
+            "UPDATE jobs SET status = ?, attempts = 0, available_at = ?, updated_at = ? WHERE id = ? AND status = ?",
+            (JOB_QUEUED, time.time(), datetime.now().isoformat(), job_id, JOB_DEAD),
+        )
+        return cursor.rowcount == 1
+
+    def purge_completed(self, older_than: float = 86400.0) -> int:
+        """Delete completed jobs older than the given number of seconds."""
+        cutoff = datetime.fromtimestamp(time.time() - older_than).isoformat()
+        cursor = self._connection().execute(
+            "DELETE FROM jobs WHERE status = ? AND updated_at < ?", (JOB_COMPLETED, cutoff)
+        )
+        return cursor.rowcount
+
+    def stats(self) -> Dict[str, int]:
+        """Count jobs by status."""
+        rows = self._connection().execute("SELECT status, COUNT(*) AS count FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["count"] for row in rows}
+
+
+class JobWorker:
+    """
+    Leases jobs from a queue and runs their handlers on the event loop.
+
+    Up to `concurrency` jobs run at once. Leases are extended while a job is
+    running so long syncs aren't redelivered to another worker.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        concurrency: int = 4,
+        poll_interval: float = 1.0,
+        kinds: Optional[List[str]] = None,
+        worker_id: Optional[str] = None,
+    ):
+        self.queue = queue
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.kinds = kinds
+        self.worker_id = worker_id or f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._stopping: Optional[asyncio.Event] = None
+        self._tasks = set()
+
+    async def run(self):
+        """Process jobs until `stop()` is called, then wait for running jobs."""
+        self._stopping = asyncio.Event()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        while not self._stopping.is_set():
+            await semaphore.acquire()
+            try:
+                job = await asyncio.to_thread(self.queue.lease, self.worker_id, self.kinds)
+            except Exception:
+                logger.exception("Failed to lease job")
+                job = None
+            if job is None:
+                semaphore.release()
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            task = asyncio.create_task(self._process(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            task.add_done_callback(lambda _: semaphore.release())
+
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stop(self):
+        if self._stopping is not None:
+            self._stopping.set()
+
+    async def _heartbeat(self, job: Job):
+        interval = max(self.queue.visibility_timeout / 3, 0.1)
+        while True:
+            await asyncio.sleep(interval)
+            await asyncio.to_thread(self.queue.extend_lease, job.id, self.worker_id)
+
+    async def _process(self, job: Job):
+        handler = job_handlers.get(job.kind)
+        if handler is None:
+            await asyncio.to_thread(self.queue.fail, job.id, self.worker_id, f"No handler for job kind: {job.kind}")
+            return
+
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        try:
+            await handler(job.payload)
+        except Exception as e:
+            heartbeat.cancel()
+            logger.warning("Job %s (%s) failed on attempt %d: %s", job.id, job.kind, job.attempts, e)
+            await asyncio.to_thread(self.queue.fail, job.id, self.worker_id, str(e))
+            return
+        heartbeat.cancel()
+        await asyncio.to_thread(self.queue.complete, job.id, self.worker_id)
+
+
+# Singleton instance, created on first use
+_job_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    """Get the process-wide job queue."""
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = JobQueue(
+            os.getenv("JOB_QUEUE_PATH", "data/jobs.db"),
+            visibility_timeout=float(os.getenv("JOB_VISIBILITY_TIMEOUT", "300")),
+            max_attempts=int(os.getenv("JOB_MAX_ATTEMPTS", "5")),
+        )
+    return _job_queue
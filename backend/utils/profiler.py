@@ -0,0 +1,88 @@
+from typing import Dict, Optional
+from collections import Counter
+import sys
+import threading
+import time
+
+# Upper bound on a single profiling session, in seconds
+MAX_PROFILE_SECONDS = 60.0
+
+
+class ProfilerBusyError(Exception):
+    """A profiling session is already running."""
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler sampling the stacks of every thread.
+
+    Produces "collapsed" stacks (`frame;frame;frame count` per line), the
+    input format of flamegraph.pl, speedscope and similar tools. Sampling
+    runs in its own thread, so live traffic keeps being served (and
+    profiled) while a session is in progress.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _frame_name(frame) -> str:
+        code = frame.f_code
+        module = frame.f_globals.get("__name__", code.co_filename)
+        return f"{module}:{code.co_name}:{frame.f_lineno}"
+
+    def _stack(self, frame) -> str:
+        names = []
+        while frame is not None:
+            names.append(self._frame_name(frame))
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def profile(self, seconds: float) -> Dict[str, int]:
+        """
+        Sample all threads for a while.
+
+        Args:
+            seconds: How long to sample, capped at MAX_PROFILE_SECONDS
+
+        Returns:
+            Sample counts per collapsed stack, keyed "thread;frame;frame"
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("A profiling session is already running")
+        try:
+            own_thread = threading.get_ident()
+            thread_names = {}
+            samples: Counter = Counter()
+            deadline = time.monotonic() + min(seconds, MAX_PROFILE_SECONDS)
+            while time.monotonic() < deadline:
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_thread:
+                        continue
+                    name = thread_names.get(thread_id)
+                    if name is None:
+                        name = thread_names[thread_id] = next(
+                            (t.name for t in threading.enumerate() if t.ident == thread_id), str(thread_id)
+                        )
+                    samples[f"{name};{self._stack(frame)}"] += 1
+                time.sleep(self.interval)
+            return dict(samples)
+        finally:
+            self._lock.release()
+
+    def profile_collapsed(self, seconds: float) -> str:
+        """Sample all threads and render the result as collapsed stacks."""
+        samples = self.profile(seconds)
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(samples.items()))
+
+
+# Singleton instance, created on first use
+_profiler: Optional[SamplingProfiler] = None
+
+
+def get_profiler() -> SamplingProfiler:
+    global _profiler
+    if _profiler is None:
+        _profiler = SamplingProfiler()
+    return _profiler
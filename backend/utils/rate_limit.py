@@ -0,0 +1,284 @@
+from typing import Dict, Optional, Callable, List, Tuple
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+
+from backend.utils.metrics import metrics_registry
+
+# Route classes: the first pattern matching "METHOD path" wins
+ROUTE_CLASSES: List[Tuple[str, "re.Pattern"]] = [
+    # CORS preflights are answered by CORSMiddleware and shouldn't use up the user's bucket
+    ("exempt", re.compile(r"^(GET /(health|ready|metrics)?|OPTIONS .*)$")),
+    ("auth", re.compile(r"^POST /auth/(token|register)$")),
+    ("chat", re.compile(r"^POST /chat/?$")),
+    ("sync", re.compile(r"^POST /connectors/([^/]+/sync|batch/sync)$")),
+    ("default", re.compile(r".*")),
+]
+
+# Token-bucket limits per route class: (tokens per second, burst)
+DEFAULT_RATE_LIMITS: Dict[str, Tuple[float, int]] = {
+    "auth": (1.0, 10),
+    "chat": (1.0, 20),
+    "sync": (0.2, 10),
+    "default": (20.0, 100),
+}
+
+# Concurrent requests allowed per process, for expensive route classes
+DEFAULT_CONCURRENCY_LIMITS: Dict[str, int] = {
+    "chat": 32,
+    "sync": 8,
+}
+
+REQUESTS_REJECTED = metrics_registry.counter(
+    "http_requests_rejected_total", "Requests rejected by rate limiting or load shedding", ["route_class", "reason"]
+)
+EVENT_LOOP_LAG = metrics_registry.gauge(
+    "event_loop_lag_seconds", "Smoothed event loop scheduling lag"
+)
+
+
+def classify_route(method: str, path: str) -> str:
+    """Name of the route class a request belongs to."""
+    key = f"{method} {path}"
+    for name, pattern in ROUTE_CLASSES:
+        if pattern.match(key):
+            return name
+    return "default"
+
+
+class InMemoryRateLimitBackend:
+    """
+    Token buckets held in this process.
+
+    A bucket that has refilled to its burst is indistinguishable from a
+    missing one, so buckets full again are dropped every `prune_interval`
+    seconds to keep one-off clients from accumulating.
+
+    Backends implement `take(key, rate, burst)`; `blocking` backends do I/O
+    and are called from a thread.
+    """
+
+    blocking = False
+
+    def __init__(self, prune_interval: float = 60.0):
+        # key -> (tokens, updated, time the bucket is full again)
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}
+        self._lock = threading.Lock()
+        self.prune_interval = prune_interval
+        self._next_prune = 0.0
+
+    def take(self, key: str, rate: float, burst: int, now: Optional[float] = None) -> float:
+        """
+        Take one token from a bucket.
+
+        Returns:
+            0 if the request is allowed, otherwise seconds until a token is available
+        """
+        now = now if now is not None else time.monotonic()
+        with self._lock:
+            if now >= self._next_prune:
+                self._buckets = {k: bucket for k, bucket in self._buckets.items() if bucket[2] > now}
+                self._next_prune = now + self.prune_interval
+            tokens, updated, _ = self._buckets.get(key, (burst, now, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / rate
+            if wait == 0:
+                tokens -= 1
+            self._buckets[key] = (tokens, now, now + (burst - tokens) / rate)
+            return wait
+
+
+class SQLiteRateLimitBackend:
+    """
+    Token buckets shared by every process on the host.
+
+    Local stand-in for a Redis-style shared limiter: each take is one short
+    IMMEDIATE transaction, so limits hold across API workers. Rows for
+    buckets that are full again are deleted every `prune_interval` seconds.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, prune_interval: float = 60.0):
+        self.path = path
+        self.prune_interval = prune_interval
+        self._next_prune = 0.0
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        connection = self._connection()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit_buckets ("
+            " key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL, full_at REAL NOT NULL)"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS rate_limit_buckets_full_at ON rate_limit_buckets (full_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def take(self, key: str, rate: float, burst: int, now: Optional[float] = None) -> float:
+        # Wall-clock time, since monotonic clocks aren't comparable across processes
+        now = now if now is not None else time.time()
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens, updated = row if row else (burst, now)
+            tokens = min(burst, tokens + max(0.0, now - updated) * rate)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / rate
+            if wait == 0:
+                tokens -= 1
+            connection.execute(
+                "INSERT OR REPLACE INTO rate_limit_buckets (key, tokens, updated_at, full_at) VALUES (?, ?, ?, ?)",
+                (key, tokens, now, now + (burst - tokens) / rate),
+            )
+            if now >= self._next_prune:
+                self._next_prune = now + self.prune_interval
+                connection.execute("DELETE FROM rate_limit_buckets WHERE full_at <= ?", (now,))
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        return wait
+
+
+class EventLoopLagMonitor:
+    """Measures how late the event loop runs a periodic callback, smoothed with an EWMA."""
+
+    def __init__(self, interval: float = 0.05, smoothing: float = 0.2):
+        self.interval = interval
+        self.smoothing = smoothing
+        self.lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self.lag += self.smoothing * (lag - self.lag)
+            EVENT_LOOP_LAG.set(self.lag)
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware applying, in order: load shedding on event loop lag,
+    per-process concurrency caps, and token-bucket limits per user and
+    route class.
+
+    Rejections are 429 (rate limit) or 503 (overload), always with a
+    `Retry-After` header. WebSocket and lifespan traffic passes through.
+    """
+
+    def __init__(
+        self,
+        app,
+        identify: Optional[Callable[[str], Optional[str]]] = None,
+        backend=None,
+        rate_limits: Optional[Dict[str, Tuple[float, int]]] = None,
+        concurrency_limits: Optional[Dict[str, int]] = None,
+        lag_threshold: float = 0.1,
+    ):
+        self.app = app
+        self.identify = identify
+        self.backend = backend or InMemoryRateLimitBackend()
+        self.rate_limits = {**DEFAULT_RATE_LIMITS, **(rate_limits or {})}
+        self.concurrency_limits = {**DEFAULT_CONCURRENCY_LIMITS, **(concurrency_limits or {})}
+        self.lag_threshold = lag_threshold
+        self.lag_monitor = EventLoopLagMonitor()
+        self._active: Dict[str, int] = {}
+
+    def _client_key(self, scope) -> str:
+        """The authenticated user if the bearer token resolves, otherwise the client address."""
+        if self.identify is not None:
+            for name, value in scope.get("headers", []):
+                if name == b"authorization":
+                    scheme, _, token = value.decode("latin-1").partition(" ")
+                    if scheme.lower() == "bearer" and token:
+                        user_id = self.identify(token)
+                        if user_id:
+                            return f"user:{user_id}"
+                    break
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}"
+
+    def _should_shed(self) -> bool:
+        """Shed a growing share of requests as lag exceeds the threshold; all of them at twice the threshold."""
+        excess = self.lag_monitor.lag - self.lag_threshold
+        return excess > 0 and random.random() < excess / self.lag_threshold
+
+    async def _reject(self, send, status_code: int, detail: str, retry_after: float, route_class: str, reason: str):
+        REQUESTS_REJECTED.inc(route_class=route_class, reason=reason)
+        body = json.dumps({"detail": detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        self.lag_monitor.start()
+
+        route_class = classify_route(scope["method"], scope["path"])
+        if route_class == "exempt":
+            await self.app(scope, receive, send)
+            return
+
+        if self._should_shed():
+            await self._reject(send, 503, "Server is overloaded, please retry", 1, route_class, "overload")
+            return
+
+        limit = self.concurrency_limits.get(route_class)
+        if limit is not None and self._active.get(route_class, 0) >= limit:
+            await self._reject(send, 503, "Too many concurrent requests, please retry", 1, route_class, "concurrency")
+            return
+
+        # Reserve the slot before awaiting the bucket, so requests checked
+        # while others wait on the backend can't overshoot the cap
+        self._active[route_class] = self._active.get(route_class, 0) + 1
+        try:
+            rate, burst = self.rate_limits.get(route_class, self.rate_limits["default"])
+            bucket = f"{route_class}:{self._client_key(scope)}"
+            if self.backend.blocking:
+                wait = await asyncio.to_thread(self.backend.take, bucket, rate, burst)
+            else:
+                wait = self.backend.take(bucket, rate, burst)
+            if wait > 0:
+                await self._reject(send, 429, "Rate limit exceeded", wait, route_class, "rate_limit")
+                return
+            await self.app(scope, receive, send)
+        finally:
+            self._active[route_class] -= 1
+
+
+def create_rate_limit_backend():
+    """Rate limit state backend selected by RATE_LIMIT_BACKEND ("memory" or "sqlite")."""
+    if os.getenv("RATE_LIMIT_BACKEND", "memory") == "sqlite":
+        return SQLiteRateLimitBackend(os.getenv("RATE_LIMIT_DB_PATH", "data/rate_limits.db"))
+    return InMemoryRateLimitBackend()
@@ -0,0 +1,53 @@
+from typing import Any, Dict, Iterable, List, Type
+import json
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+# orjson serializes large lists of records several times faster; fall back to the stdlib without it
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize JSON-compatible content (enums and datetimes included) to bytes."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=str, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered with a compiled serializer.
+
+    Returning a response instance from a route skips FastAPI's
+    `response_model` validation and `jsonable_encoder` pass, which dominate
+    the cost of large lists. Only use it for records built by our own
+    stores, whose shape already matches the declared response model;
+    keep `response_model` on the route so the OpenAPI schema is unchanged.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def model_fields(model: Type[BaseModel]) -> List[str]:
+    """Names of a model's fields, for projecting records onto it."""
+    fields = getattr(model, "model_fields", None)
+    if fields is None:
+        fields = model.__fields__
+    return list(fields)
+
+
+def model_dict(model: BaseModel) -> Dict[str, Any]:
+    """A model instance's fields as a dict, on pydantic v1 or v2."""
+    dump = getattr(model, "model_dump", None)
+    return dump() if dump is not None else model.dict()
+
+
+def project(records: Iterable[Dict[str, Any]], fields: List[str]) -> List[Dict[str, Any]]:
+    """Keep only the given fields of each record, as response_model filtering would."""
+    return [{field: record.get(field) for field in fields} for record in records]
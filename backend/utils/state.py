@@ -0,0 +1,171 @@
+from typing import Dict, Any, Optional, List, Iterator
+import json
+import os
+import sqlite3
+import threading
+import uuid
+
+
+def new_id() -> str:
+    """Generate a record ID that is unique across worker processes without coordination."""
+    return uuid.uuid4().hex
+
+
+class MemoryCollection:
+    """
+    Records kept in this process, keyed by ID.
+
+    Collections behave like dicts of JSON-compatible records, plus a lookup
+    by owner when `owner_field` is set. Records handed out must be written
+    back (`collection[key] = record`) after changing them, since shared
+    backends return copies.
+    """
+
+    def __init__(self, name: str, owner_field: Optional[str] = None):
+        self.name = name
+        self.owner_field = owner_field
+        self._records: Dict[str, Dict[str, Any]] = {}
+        # owner -> {key: None}, an insertion-ordered set
+        self._by_owner: Dict[str, Dict[str, None]] = {}
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._records
+
+    def __getitem__(self, key: str) -> Dict[str, Any]:
+        return self._records[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._records.get(key, default)
+
+    def __setitem__(self, key: str, record: Dict[str, Any]):
+        previous = self._records.get(key)
+        self._records[key] = record
+        if not self.owner_field:
+            return
+        owner = record.get(self.owner_field)
+        if previous is not None:
+            previous_owner = previous.get(self.owner_field)
+            if previous_owner == owner:
+                # An update keeps the record's place, like the SQLite upsert keeping its seq
+                return
+            self._by_owner.get(previous_owner, {}).pop(key, None)
+        self._by_owner.setdefault(owner, {})[key] = None
+
+    def __delitem__(self, key: str):
+        if self.pop(key, None) is None:
+            raise KeyError(key)
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        record = self._records.pop(key, None)
+        if record is None:
+            return default
+        if self.owner_field:
+            self._by_owner.get(record.get(self.owner_field), {}).pop(key, None)
+        return record
+
+    def values(self) -> Iterator[Dict[str, Any]]:
+        return iter(list(self._records.values()))
+
+    def for_owner(self, owner: str) -> List[Dict[str, Any]]:
+        """Records belonging to an owner, oldest first."""
+        return [self._records[key] for key in self._by_owner.get(owner, {})]
+
+
+class SQLiteCollection:
+    """
+    Records shared by every process on the host, stored as JSON in SQLite.
+
+    Reads return fresh copies, so changes must be written back explicitly.
+    """
+
+    def __init__(self, path: str, name: str, owner_field: Optional[str] = None):
+        self.path = path
+        self.name = name
+        self.owner_field = owner_field
+        self.table = f"state_{name}"
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        connection = self._connection()
+        connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            " seq INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT NOT NULL UNIQUE,"
+            " owner TEXT, value TEXT NOT NULL)"
+        )
+        connection.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_owner ON {self.table} (owner, seq)")
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def __len__(self) -> int:
+        return self._connection().execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def __contains__(self, key: str) -> bool:
+        return self._connection().execute(
+            f"SELECT 1 FROM {self.table} WHERE key = ?", (key,)
+        ).fetchone() is not None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        row = self._connection().execute(
+            f"SELECT value FROM {self.table} WHERE key = ?", (key,)
+        ).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def __getitem__(self, key: str) -> Dict[str, Any]:
+        record = self.get(key)
+        if record is None:
+            raise KeyError(key)
+        return record
+
+    def __setitem__(self, key: str, record: Dict[str, Any]):
+        owner = record.get(self.owner_field) if self.owner_field else None
+        # Upsert keeps the original seq, so owner listings stay in creation order
+        self._connection().execute(
+            f"INSERT INTO {self.table} (key, owner, value) VALUES (?, ?, ?)"
+            " ON CONFLICT(key) DO UPDATE SET owner = excluded.owner, value = excluded.value",
+            (key, owner, json.dumps(record, default=str)),
+        )
+
+    def __delitem__(self, key: str):
+        if self.pop(key, None) is None:
+            raise KeyError(key)
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        row = self._connection().execute(
+            f"DELETE FROM {self.table} WHERE key = ? RETURNING value", (key,)
+        ).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def values(self) -> Iterator[Dict[str, Any]]:
+        rows = self._connection().execute(f"SELECT value FROM {self.table} ORDER BY seq").fetchall()
+        return (json.loads(row[0]) for row in rows)
+
+    def for_owner(self, owner: str) -> List[Dict[str, Any]]:
+        rows = self._connection().execute(
+            f"SELECT value FROM {self.table} WHERE owner = ? ORDER BY seq", (owner,)
+        ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+
+def state_backend() -> str:
+    """Selected state backend: "memory" (single process) or "sqlite" (shared by workers)."""
+    return os.getenv("STATE_BACKEND", "memory")
+
+
+def state_db_path() -> str:
+    return os.getenv("STATE_DB_PATH", "data/state.db")
+
+
+def create_collection(name: str, owner_field: Optional[str] = None):
+    """Create a collection on the backend chosen by STATE_BACKEND."""
+    if state_backend() == "sqlite":
+        return SQLiteCollection(state_db_path(), name, owner_field)
+    return MemoryCollection(name, owner_field)
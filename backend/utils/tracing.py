@@ -0,0 +1,127 @@
+from typing import Dict, Optional, Tuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+import functools
+import inspect
+import time
+
+from backend.utils.metrics import metrics_registry
+
+SPAN_DURATION = metrics_registry.histogram(
+    "span_duration_seconds", "Duration of instrumented operations", ["span"]
+)
+HTTP_REQUEST_DURATION = metrics_registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "handler", "status"]
+)
+HTTP_REQUESTS_IN_PROGRESS = metrics_registry.gauge(
+    "http_requests_in_progress", "HTTP requests currently being served"
+)
+
+# Spans recorded while serving the current request, if any
+_current_trace: ContextVar[Optional["RequestTrace"]] = ContextVar("current_trace", default=None)
+
+
+class RequestTrace:
+    """Per-request span totals, reported in the Server-Timing response header."""
+
+    def __init__(self):
+        self.spans: Dict[str, Tuple[int, float]] = {}
+
+    def record(self, name: str, seconds: float):
+        count, total = self.spans.get(name, (0, 0.0))
+        self.spans[name] = (count + 1, total + seconds)
+
+    def server_timing(self, total_seconds: float) -> str:
+        entries = [
+            f'{name.replace(".", "-")};dur={total * 1000:.2f};desc="{count}x"'
+            for name, (count, total) in self.spans.items()
+        ]
+        entries.append(f"total;dur={total_seconds * 1000:.2f}")
+        return ", ".join(entries)
+
+
+def record_span(name: str, seconds: float):
+    SPAN_DURATION.observe(seconds, span=name)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.record(name, seconds)
+
+
+@contextmanager
+def span(name: str):
+    """Time a block of code as a named span."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(name, time.perf_counter() - start)
+
+
+def traced(name: str):
+    """Decorator timing every call of a sync or async function as a named span."""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    record_span(name, time.perf_counter() - start)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record_span(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+class RequestTimingMiddleware:
+    """
+    ASGI middleware timing every HTTP request.
+
+    Observes `http_request_duration_seconds` labelled by the endpoint that
+    handled the request (not the raw path, to keep label cardinality bounded)
+    and adds a `Server-Timing` header breaking the request down by span.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace()
+        token = _current_trace.set(trace)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", trace.server_timing(time.perf_counter() - start).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        HTTP_REQUESTS_IN_PROGRESS.inc()
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            HTTP_REQUESTS_IN_PROGRESS.dec()
+            _current_trace.reset(token)
+            endpoint = scope.get("endpoint")
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - start,
+                method=scope["method"],
+                handler=getattr(endpoint, "__name__", "unmatched"),
+                status=str(status_code),
+            )
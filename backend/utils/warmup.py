@@ -0,0 +1,75 @@
+from typing import Dict, Any, Callable, Optional
+import asyncio
+import logging
+import time
+
+from backend.utils.metrics import metrics_registry
+
+logger = logging.getLogger(__name__)
+
+WARMUP_DURATION = metrics_registry.gauge(
+    "startup_warmup_seconds", "Time taken by each startup warm-up task", ["task"]
+)
+
+
+class WarmupRegistry:
+    """
+    Tasks that load heavy dependencies (indexes, model clients, imports)
+    after the server has started accepting connections.
+
+    Each task is a blocking function run in a worker thread. The process
+    reports ready (`/ready`) once every task has finished; a failed task
+    keeps it unready, since its dependency would fail on first use too.
+    Tasks must be safe to race with a request that loads the same thing
+    lazily.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[str, Callable[[], Any]] = {}
+        self._status: Dict[str, Dict[str, Any]] = {}
+        self.started = False
+
+    def register(self, name: str):
+        """Decorator registering a warm-up task under a name."""
+        def decorator(func: Callable[[], Any]):
+            self._tasks[name] = func
+            self._status[name] = {"status": "pending"}
+            return func
+        return decorator
+
+    async def _run_task(self, name: str, func: Callable[[], Any]):
+        self._status[name] = {"status": "running"}
+        start = time.perf_counter()
+        try:
+            await asyncio.to_thread(func)
+        except Exception as e:
+            logger.exception("Warm-up task %s failed", name)
+            self._status[name] = {"status": "failed", "error": str(e)}
+            return
+        seconds = time.perf_counter() - start
+        WARMUP_DURATION.set(seconds, task=name)
+        self._status[name] = {"status": "ready", "seconds": round(seconds, 4)}
+
+    async def run(self):
+        """Run every registered task, one after another to leave CPU for live requests."""
+        self.started = True
+        for name, func in list(self._tasks.items()):
+            await self._run_task(name, func)
+
+    def skip(self):
+        """Mark every task ready without running it; dependencies then load on first use."""
+        self.started = True
+        for name in self._tasks:
+            self._status[name] = {"status": "skipped"}
+
+    def is_ready(self) -> bool:
+        return self.started and all(
+            task["status"] in ("ready", "skipped") for task in self._status.values()
+        )
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {name: dict(task) for name, task in self._status.items()}
+
+
+# Singleton instance
+warmup_registry = WarmupRegistry()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Background worker pool for connector syncs and action executions.
+
+Runs job workers in separate processes, leasing jobs from the durable job
+queue shared with the API. Start the API with JOB_WORKER_MODE=external when
+running workers this way, and both with STATE_BACKEND=sqlite.
+
+Usage:
+    python -m backend.worker --processes 2 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+
+from dotenv import load_dotenv
+
+from backend.utils.job_queue import JobWorker, get_job_queue
+
+
+def run_worker(concurrency: int, poll_interval: float):
+    """Run a single worker process until it receives SIGTERM or SIGINT."""
+    # Importing the app registers the job handlers of every router
+    import backend.main  # noqa: F401
+
+    worker = JobWorker(get_job_queue(), concurrency=concurrency, poll_interval=poll_interval)
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, worker.stop)
+        await worker.run()
+
+    logging.getLogger(__name__).info("Worker %s started", worker.worker_id)
+    asyncio.run(main())
+
+
+def main():
+    load_dotenv()
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "info").upper())
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=int(os.getenv("JOB_WORKER_PROCESSES", "1")))
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("JOB_WORKER_CONCURRENCY", "4")),
+                        help="Jobs run concurrently by each process")
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    args = parser.parse_args()
+
+    # Jobs look up connectors and actions the API stored; with process-local
+    # state the worker would find none of them
+    if os.getenv("STATE_BACKEND", "memory") != "sqlite":
+        parser.error("workers need the shared state backend; set STATE_BACKEND=sqlite here and on the API")
+
+    if args.processes == 1:
+        run_worker(args.concurrency, args.poll_interval)
+        return
+
+    processes = [
+        multiprocessing.Process(target=run_worker, args=(args.concurrency, args.poll_interval))
+        for _ in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+
+    def forward(signum, frame):
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    signal.signal(signal.SIGTERM, forward)
+    signal.signal(signal.SIGINT, forward)
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Benchmark suggested-action extraction over a synthetic message corpus.
+
+Compares the combined single-pass matcher with checking each lexicon phrase
+and entity pattern separately, and measures the latency the optional LLM pass
+adds when it runs sequentially versus concurrently with answer generation.
+Answer generation is simulated by a blocking call run in a thread, as the
+chat route runs `generate_response`.
+
+Usage:
+    python -m benchmarks.action_extraction --messages 20000
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+from datetime import datetime
+
+from backend.actions.extraction import (
+    ActionExtractor,
+    ENTITY_PATTERNS,
+    INTENT_LEXICONS,
+    SuggestedActionPipeline,
+    analyze_message,
+)
+
+TEMPLATES = [
+    "Can you email {email} the latest numbers before {day}?",
+    "Schedule a meeting with {email} and {email2} {day} at {time}",
+    "Post in {channel} that the release is out",
+    "Remind me to follow up with {name} on the contract {day}",
+    "What did {name} say about the budget in last week's thread?",
+    "Summarize the design doc and send it to {email}",
+    "Book an appointment with {name} for {date} at {time}",
+    "Create a ticket for the login bug and ping {channel}",
+    "Who owns the onboarding project?",
+    "Reply to {name}'s email about the offsite and cc {email}",
+]
+NAMES = ["Alice", "Bob", "Carol", "Dan", "Erin", "Frank"]
+DAYS = ["today", "tomorrow", "Monday", "next Friday", "Wednesday"]
+TIMES = ["9am", "2:30 pm", "14:00", "noon", "11am"]
+CHANNELS = ["#eng", "#general", "#release-train", "#design"]
+
+
+def build_corpus(size: int):
+    corpus = []
+    for _ in range(size):
+        name = random.choice(NAMES)
+        text = random.choice(TEMPLATES).format(
+            email=f"{name.lower()}@example.com",
+            email2=f"{random.choice(NAMES).lower()}@corp.example.org",
+            name=name,
+            day=random.choice(DAYS),
+            time=random.choice(TIMES),
+            date=f"{random.randint(1, 12)}/{random.randint(1, 28)}",
+            channel=random.choice(CHANNELS),
+        )
+        # Vary message length with some filler context
+        corpus.append(text + " " + " ".join(random.choices(["thanks", "context", "please", "asap"], k=random.randint(0, 40))))
+    return corpus
+
+
+# Baseline: one pass per phrase and one per entity pattern
+_SEPARATE_PHRASES = [
+    (action_type, re.compile(r"\b" + re.escape(phrase) + r"\b", re.IGNORECASE))
+    for action_type, phrases in INTENT_LEXICONS.items()
+    for phrase in phrases
+]
+_SEPARATE_ENTITIES = [(name, re.compile(pattern, re.IGNORECASE)) for name, pattern in ENTITY_PATTERNS]
+
+
+def analyze_separately(message: str):
+    intents = {}
+    for action_type, pattern in _SEPARATE_PHRASES:
+        if pattern.search(message):
+            intents[action_type] = intents.get(action_type, 0) + 1
+    entities = {name: pattern.findall(message) for name, pattern in _SEPARATE_ENTITIES}
+    return intents, entities
+
+
+def throughput(func, corpus) -> float:
+    start = time.perf_counter()
+    for message in corpus:
+        func(message)
+    return len(corpus) / (time.perf_counter() - start)
+
+
+class SimulatedLLMExtractor:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def extract(self, message):
+        await asyncio.sleep(self.latency)
+        return []
+
+
+async def llm_latency(answer_latency: float, llm_latency: float, requests: int):
+    """Median added latency of the LLM pass, sequential vs overlapped with answer generation."""
+    extractor = SimulatedLLMExtractor(llm_latency)
+    pipeline = SuggestedActionPipeline(extractor, llm_grace=llm_latency)
+
+    def generate_response():
+        time.sleep(answer_latency)
+
+    async def sequential():
+        await asyncio.to_thread(generate_response)
+        await extractor.extract("")
+
+    async def concurrent():
+        extraction = pipeline.start("Email bob@example.com tomorrow")
+        await asyncio.to_thread(generate_response)
+        await extraction.result()
+
+    results = {}
+    for name, func in (("sequential", sequential), ("concurrent", concurrent)):
+        samples = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            await func()
+            samples.append((time.perf_counter() - start - answer_latency) * 1000)
+        samples.sort()
+        results[f"{name}_added_ms"] = round(samples[len(samples) // 2], 2)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=20_000)
+    parser.add_argument("--answer-latency", type=float, default=0.2, help="Simulated answer generation seconds")
+    parser.add_argument("--llm-latency", type=float, default=0.15, help="Simulated LLM extraction seconds")
+    parser.add_argument("--llm-requests", type=int, default=10)
+    args = parser.parse_args()
+
+    random.seed(0)
+    corpus = build_corpus(args.messages)
+    extractor = ActionExtractor()
+    now = datetime(2024, 1, 1, 12)
+    suggestions = sum(len(extractor.extract(message, now)) for message in corpus)
+
+    results = {
+        "messages": len(corpus),
+        "suggestions": suggestions,
+        "separate_patterns_msgs_per_sec": round(throughput(analyze_separately, corpus)),
+        "combined_matcher_msgs_per_sec": round(throughput(lambda m: analyze_message(m, now), corpus)),
+        "full_extraction_msgs_per_sec": round(throughput(lambda m: extractor.extract(m, now), corpus)),
+        **asyncio.run(llm_latency(args.answer_latency, args.llm_latency, args.llm_requests)),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark action listing as action history grows.
+
+Compares the indexed ActionStore (first page + status counts) with the old
+approach of scanning every action and filtering in Python.
+
+Usage:
+    python -m benchmarks.action_store --sizes 10000 100000 1000000
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from backend.actions.store import ActionStore
+
+STATUSES = ["pending", "approved", "rejected", "completed", "failed"]
+
+
+def build(size: int, users: int):
+    store = ActionStore()
+    flat = {}
+    start = datetime(2023, 1, 1)
+    for i in range(size):
+        action = {
+            "id": str(i),
+            "user_id": f"user{i % users}@example.com",
+            "status": random.choice(STATUSES),
+            "created_at": (start + timedelta(seconds=i)).isoformat(),
+        }
+        store.insert(action)
+        flat[action["id"]] = action
+    return store, flat
+
+
+def timed(func, repeat: int) -> float:
+    """Median latency in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    random.seed(0)
+    results = []
+    for size in args.sizes:
+        store, flat = build(size, args.users)
+        user = "user0@example.com"
+
+        def scan():
+            return [a for a in flat.values() if a["user_id"] == user and a["status"] == "pending"]
+
+        def scan_counts():
+            counts = {}
+            for a in flat.values():
+                if a["user_id"] == user:
+                    counts[a["status"]] = counts.get(a["status"], 0) + 1
+            return counts
+
+        results.append({
+            "actions": size,
+            "scan_list_ms": round(timed(scan, max(1, args.repeat // 5)), 3),
+            "indexed_list_ms": round(timed(lambda: store.list(user, status="pending", limit=50), args.repeat), 3),
+            "scan_counts_ms": round(timed(scan_counts, max(1, args.repeat // 5)), 3),
+            "indexed_counts_ms": round(timed(lambda: store.counts(user), args.repeat), 3),
+        })
+        print(json.dumps(results[-1]))
+
+    print(json.dumps({"results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark an authenticated no-op endpoint with and without the auth caches.
+
+Drives the ASGI app in-process (no sockets) with concurrent clients, so the
+numbers reflect per-request CPU in the auth dependency rather than network
+overhead.
+
+Usage:
+    python -m benchmarks.auth_cache --requests 5000 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import timedelta
+
+import httpx
+from fastapi import Depends, FastAPI
+
+from backend.api import auth
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/noop")
+    async def noop(current_user: auth.User = Depends(auth.get_current_user)):
+        return {"ok": True}
+
+    return app
+
+
+async def measure(app: FastAPI, token: str, requests: int, concurrency: int) -> float:
+    headers = {"Authorization": f"Bearer {token}"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        remaining = iter(range(requests))
+
+        async def worker():
+            for _ in remaining:
+                response = await client.get("/noop", headers=headers)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return requests / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    app = build_app()
+    token = auth.create_access_token({"sub": "user@example.com"}, expires_delta=timedelta(minutes=30))
+    token_cache_size, user_cache_size = auth.token_cache.max_size, auth.user_cache.max_size
+
+    results = {}
+    for name, enabled in (("uncached", False), ("cached", True)):
+        auth.token_cache.clear()
+        auth.user_cache.clear()
+        auth.token_cache.max_size = token_cache_size if enabled else 0
+        auth.user_cache.max_size = user_cache_size if enabled else 0
+        # Warm up the app and, when enabled, the caches
+        asyncio.run(measure(app, token, 200, args.concurrency))
+        results[f"{name}_rps"] = round(asyncio.run(measure(app, token, args.requests, args.concurrency)))
+
+    results["token_cache"] = auth.token_cache.stats()
+    results["user_cache"] = auth.user_cache.stats()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Benchmark distributed search across index nodes on localhost.
+
+Starts `--shards x --replicas` index node processes, ingests documents
+through an IndexCoordinator, and measures search latency percentiles with
+and without hedged requests. Some node responses are delayed on purpose
+(`--slow-fraction` of them by `--slow-ms`) to give the tail something to
+hedge against. Every search is also run against one in-process index
+holding the whole corpus, and the share of identical top-k lists is
+reported as `agreement`.
+
+Usage:
+    python -m benchmarks.cluster --shards 2 --replicas 2 --documents 500 --queries 200
+    python -m benchmarks.cluster --slow-fraction 0 --replicas 1
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import string
+import subprocess
+import sys
+import time
+from typing import Dict, Any, List
+
+from backend.embedding.cluster import IndexCoordinator, parse_index_nodes
+from backend.embedding.service import EmbeddingService, new_document_id
+from backend.utils.http_client import PooledHTTPClient
+
+
+def serve_node(args):
+    """Run one index node whose responses are delayed now and then."""
+    import uvicorn
+    from backend.embedding.node import create_node_app
+
+    app = create_node_app(EmbeddingService())
+    rng = random.Random(args.port)
+
+    @app.middleware("http")
+    async def inject_latency(request, call_next):
+        if request.url.path == "/search" and rng.random() < args.slow_fraction:
+            await asyncio.sleep(args.slow_ms / 1000)
+        return await call_next(request)
+
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_nodes(args) -> List[subprocess.Popen]:
+    processes = []
+    shards = []
+    for _ in range(args.shards):
+        replicas = []
+        for _ in range(args.replicas):
+            port = free_port()
+            processes.append(subprocess.Popen([
+                sys.executable, "-m", "benchmarks.cluster", "--serve-node", "--port", str(port),
+                "--slow-fraction", str(args.slow_fraction), "--slow-ms", str(args.slow_ms),
+            ], env={**os.environ, "RERANK_ENABLED": "false"}))
+            replicas.append(f"http://127.0.0.1:{port}")
+        shards.append(",".join(replicas))
+    args.index_nodes = ";".join(shards)
+    return processes
+
+
+async def wait_until_up(nodes: List[List[str]], timeout: float = 30.0):
+    client = PooledHTTPClient(max_retries=0)
+    deadline = time.time() + timeout
+    try:
+        for url in (replica for shard in nodes for replica in shard):
+            while True:
+                try:
+                    if (await client.get(f"{url}/health", conditional=False)).status_code == 200:
+                        break
+                except Exception:
+                    if time.time() > deadline:
+                        raise
+                await asyncio.sleep(0.1)
+    finally:
+        await client.aclose()
+
+
+def random_text(rng: random.Random, size: int) -> str:
+    return " ".join(
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 10))) for _ in range(size // 6)
+    )
+
+
+async def measure(coordinator: IndexCoordinator, local: EmbeddingService, queries: List[str], top_k: int) -> Dict[str, Any]:
+    latencies = []
+    agree = 0
+    for query in queries:
+        start = time.perf_counter()
+        results = await coordinator.search(query, top_k=top_k, rerank=False)
+        latencies.append((time.perf_counter() - start) * 1000)
+        expected = await local.search(query, top_k=top_k, rerank=False)
+        agree += [r["chunk_id"] for r in results] == [r["chunk_id"] for r in expected]
+    latencies.sort()
+    return {
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))], 2),
+        "p99_ms": round(latencies[int(0.99 * (len(latencies) - 1))], 2),
+        "agreement": round(agree / len(queries), 3),
+    }
+
+
+async def run(args) -> Dict[str, Any]:
+    nodes = parse_index_nodes(args.index_nodes)
+    await wait_until_up(nodes)
+    rng = random.Random(0)
+    local = EmbeddingService()
+    coordinator = IndexCoordinator(nodes, timeout=args.timeout_ms / 1000, hedge_after=args.hedge_ms / 1000)
+
+    start = time.perf_counter()
+    for i in range(args.documents):
+        content = random_text(rng, args.document_bytes)
+        metadata = {"user_id": f"user-{i % args.users}", "source_type": "bench"}
+        document_id = new_document_id(f"{i}-{content}")
+        await coordinator.process_document(content, metadata, document_id=document_id)
+        await local.process_document(content, metadata, document_id=document_id)
+    ingest_seconds = time.perf_counter() - start
+
+    queries = [random_text(rng, 40) for _ in range(args.queries)]
+    results = {
+        "ingest_docs_per_sec": round(args.documents / ingest_seconds, 1),
+        "hedged": await measure(coordinator, local, queries, args.top_k),
+    }
+    await coordinator.aclose()
+    coordinator = IndexCoordinator(nodes, timeout=args.timeout_ms / 1000, hedge_after=None)
+    results["unhedged"] = await measure(coordinator, local, queries, args.top_k)
+    results["stats"] = {
+        key: value for key, value in (await coordinator.get_stats()).items() if key != "shards"
+    }
+    await coordinator.aclose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shards", type=int, default=2)
+    parser.add_argument("--replicas", type=int, default=2)
+    parser.add_argument("--documents", type=int, default=500)
+    parser.add_argument("--document-bytes", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--timeout-ms", type=float, default=1000)
+    parser.add_argument("--hedge-ms", type=float, default=50)
+    parser.add_argument("--slow-fraction", type=float, default=0.05)
+    parser.add_argument("--slow-ms", type=float, default=200)
+    parser.add_argument("--serve-node", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve_node:
+        serve_node(args)
+        return
+
+    processes = start_nodes(args)
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Benchmark the shared connector HTTP client against a local fake provider API.
+
+Simulates repeated connector syncs polling the same set of resources and
+compares a naive client (new connection per request, no revalidation) with
+the pooled client (keep-alive per host + ETag revalidation).
+
+Usage:
+    python -m benchmarks.http_client --resources 50 --rounds 10 --concurrency 10
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from backend.utils.http_client import PooledHTTPClient
+
+
+class FakeAPIServer(ThreadingHTTPServer):
+    """Fake provider API serving JSON resources with ETags."""
+
+    daemon_threads = True
+
+    def __init__(self, address, payload_size: int):
+        super().__init__(address, FakeAPIHandler)
+        self.payload_size = payload_size
+        self.lock = threading.Lock()
+        self.reset_counters()
+
+    def reset_counters(self):
+        with self.lock:
+            self.counters = {"requests": 0, "full_responses": 0, "not_modified": 0, "connections": 0, "bytes_sent": 0}
+
+    def count(self, key: str, amount: int = 1):
+        with self.lock:
+            self.counters[key] += amount
+
+    def process_request(self, request, client_address):
+        self.count("connections")
+        super().process_request(request, client_address)
+
+
+class FakeAPIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        server.count("requests")
+        body = json.dumps({
+            "id": self.path,
+            "items": ["x" * 64] * max(1, server.payload_size // 70),
+        }).encode()
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+
+        if self.headers.get("If-None-Match") == etag:
+            server.count("not_modified")
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        server.count("full_responses")
+        server.count("bytes_sent", len(body))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+async def run_naive(rounds, concurrency: int):
+    """One fresh client (and connection) per request, like per-call handler instances."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(url):
+        async with semaphore:
+            async with httpx.AsyncClient() as client:
+                response = await client.get(url)
+                response.json()
+
+    for urls in rounds:
+        await asyncio.gather(*(fetch(url) for url in urls))
+
+
+async def run_pooled(rounds, concurrency: int):
+    """Shared pooled client with conditional revalidation."""
+    client = PooledHTTPClient(max_connections_per_host=concurrency, max_keepalive_per_host=concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(url):
+        async with semaphore:
+            await client.get_json(url)
+
+    try:
+        for urls in rounds:
+            await asyncio.gather(*(fetch(url) for url in urls))
+    finally:
+        await client.aclose()
+
+
+def measure(server, name, runner, rounds, concurrency):
+    server.reset_counters()
+    start = time.perf_counter()
+    asyncio.run(runner(rounds, concurrency))
+    elapsed = time.perf_counter() - start
+    counters = dict(server.counters)
+    requests = sum(len(urls) for urls in rounds)
+    return {
+        "client": name,
+        "requests": requests,
+        "seconds": round(elapsed, 4),
+        "requests_per_second": round(requests / elapsed, 1),
+        **counters,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resources", type=int, default=50, help="Distinct resources per sync round")
+    parser.add_argument("--rounds", type=int, default=10, help="Number of sync rounds")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--payload-size", type=int, default=8192, help="Approximate response body size in bytes")
+    args = parser.parse_args()
+
+    server = FakeAPIServer(("127.0.0.1", 0), args.payload_size)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    # Rounds are sequential syncs polling the same resources; requests within a round run concurrently
+    rounds = [[f"{base_url}/items/{i}" for i in range(args.resources)] for _ in range(args.rounds)]
+
+    try:
+        results = [
+            measure(server, "naive", run_naive, rounds, args.concurrency),
+            measure(server, "pooled", run_pooled, rounds, args.concurrency),
+        ]
+    finally:
+        server.shutdown()
+
+    naive, pooled = results
+    print(json.dumps({
+        "results": results,
+        "speedup": round(pooled["requests_per_second"] / naive["requests_per_second"], 2),
+        "redundant_downloads_avoided": naive["full_responses"] - pooled["full_responses"],
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark fetching a conversation with a long history.
+
+Serves the same 10k-message conversation through the real
+`GET /chat/conversations/{id}` route, which renders it with
+FastJSONResponse, and through an equivalent route that returns the dict
+and lets FastAPI validate and serialize it via `response_model`, as the
+route did before. Latency percentiles are reported for both.
+
+Usage:
+    python -m benchmarks.large_conversation --messages 10000 --requests 50
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("JOB_WORKER_MODE", "external")
+
+import httpx
+from fastapi import Depends
+
+from backend.api import auth, chat
+from backend.main import app
+from backend.utils.responses import ORJSON_AVAILABLE
+
+
+@app.get("/bench/validated/{conversation_id}", response_model=chat.Conversation)
+async def get_conversation_validated(conversation_id: str, current_user: auth.User = Depends(auth.get_current_user)):
+    return chat.fake_conversations_db[conversation_id]
+
+
+def seed_conversation(messages: int) -> str:
+    now = datetime.now()
+    conversation_id = "bench-conversation"
+    chat.fake_conversations_db[conversation_id] = {
+        "id": conversation_id,
+        "user_id": "user@example.com",
+        "title": "Benchmark conversation",
+        "messages": [
+            {
+                "role": "user" if i % 2 == 0 else "assistant",
+                "content": f"Message {i}: can you summarize the launch plan and the open questions from last week?",
+                "timestamp": (now + timedelta(seconds=i)).isoformat(),
+            }
+            for i in range(messages)
+        ],
+        "created_at": now.isoformat(),
+        "updated_at": now.isoformat(),
+    }
+    return conversation_id
+
+
+async def measure(url: str, headers, requests: int):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        samples = []
+        for _ in range(requests + 5):
+            start = time.perf_counter()
+            response = await client.get(url, headers=headers)
+            response.raise_for_status()
+            samples.append((time.perf_counter() - start) * 1000)
+        # The first few requests warm up the app
+        samples = sorted(samples[5:])
+        return {
+            "p50_ms": round(samples[len(samples) // 2], 2),
+            "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 2),
+            "bytes": len(response.content),
+        }, response.json()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    conversation_id = seed_conversation(args.messages)
+    token = auth.create_access_token({"sub": "user@example.com"}, expires_delta=timedelta(minutes=30))
+    headers = {"Authorization": f"Bearer {token}"}
+
+    validated, validated_body = asyncio.run(
+        measure(f"/bench/validated/{conversation_id}", headers, args.requests)
+    )
+    fast, fast_body = asyncio.run(
+        measure(f"/chat/conversations/{conversation_id}", headers, args.requests)
+    )
+    assert fast_body == validated_body, "fast path returned a different body"
+
+    print(json.dumps({
+        "messages": args.messages,
+        "orjson": ORJSON_AVAILABLE,
+        "response_model": validated,
+        "fast_json": fast,
+        "speedup": round(validated["p50_ms"] / fast["p50_ms"], 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
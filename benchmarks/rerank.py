@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark precision and latency of the re-ranking stage.
+
+Builds a synthetic corpus of topics that come in sibling pairs: siblings
+have nearly identical embeddings but distinct vocabularies, which is where
+vector search alone mixes up related documents. Queries use a topic's own
+words and an embedding near its cluster, and a result is relevant if it
+belongs to the query's topic.
+
+Reports precision@k and p50 latency for vector search alone, re-ranking
+with a cold pair cache, and re-ranking with a warm cache.
+
+Usage:
+    python -m benchmarks.rerank --chunks 20000 --queries 200 --top-k 5
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import string
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from backend.embedding.rerank import RerankingStage
+from backend.embedding.service import EmbeddingService
+
+
+class PrecomputedQueryService(EmbeddingService):
+    """Embedding service whose query embeddings come from a lookup table."""
+
+    def __init__(self, query_vectors: Dict[str, np.ndarray], **kwargs):
+        super().__init__(**kwargs)
+        self.query_vectors = query_vectors
+
+    async def embed_text(self, text: str) -> List[float]:
+        return self.query_vectors[text]
+
+
+def random_word(rng: random.Random) -> str:
+    return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9)))
+
+
+def build(args):
+    rng = random.Random(0)
+    np_rng = np.random.default_rng(0)
+    clusters = args.topics // 2
+    cluster_centroids = np_rng.standard_normal((clusters, args.dimensions)).astype(np.float32)
+    topic_centroids = np.repeat(cluster_centroids, 2, axis=0)
+    topic_centroids += 0.05 * np_rng.standard_normal(topic_centroids.shape).astype(np.float32)
+    vocabularies = [[random_word(rng) for _ in range(30)] for _ in range(args.topics)]
+    filler = [random_word(rng) for _ in range(2000)]
+
+    topics = [i % args.topics for i in range(args.chunks)]
+    chunk_ids = [f"chunk-{i}" for i in range(args.chunks)]
+    vectors = topic_centroids[topics] + 0.6 * np_rng.standard_normal((args.chunks, args.dimensions)).astype(np.float32)
+    texts = [
+        " ".join(rng.choices(vocabularies[topic], k=12) + rng.choices(filler, k=60))
+        for topic in topics
+    ]
+
+    queries = {}
+    query_topics = {}
+    for q in range(args.queries):
+        topic = rng.randrange(args.topics)
+        query = f"{q} " + " ".join(rng.sample(vocabularies[topic], 3))
+        queries[query] = topic_centroids[topic] + 0.3 * np_rng.standard_normal(args.dimensions).astype(np.float32)
+        query_topics[query] = topic
+
+    service = PrecomputedQueryService(queries)
+    service.add_embeddings(chunk_ids, vectors, [{"topic": topic} for topic in topics], texts)
+    return service, query_topics
+
+
+def run(service: EmbeddingService, query_topics: Dict[str, int], top_k: int, rerank: bool):
+    latencies = []
+    hits = 0
+
+    async def go():
+        nonlocal hits
+        for query, topic in query_topics.items():
+            start = time.perf_counter()
+            results = await service.search(query, top_k=top_k, rerank=rerank)
+            latencies.append((time.perf_counter() - start) * 1000)
+            hits += sum(result["metadata"]["topic"] == topic for result in results)
+
+    asyncio.run(go())
+    return {
+        f"precision_at_{top_k}": round(hits / (len(query_topics) * top_k), 3),
+        "p50_ms": round(statistics.median(latencies), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=20_000)
+    parser.add_argument("--topics", type=int, default=40)
+    parser.add_argument("--dimensions", type=int, default=128)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--overfetch", type=int, default=4)
+    parser.add_argument("--deadline-ms", type=float, default=50)
+    args = parser.parse_args()
+
+    service, query_topics = build(args)
+    service.reranker = RerankingStage(overfetch=args.overfetch, deadline=args.deadline_ms / 1000)
+
+    results = {"vector_only": run(service, query_topics, args.top_k, rerank=False)}
+    results["reranked_cold"] = run(service, query_topics, args.top_k, rerank=True)
+    results["reranked_warm"] = run(service, query_topics, args.top_k, rerank=True)
+    results["pair_cache"] = service.reranker.cache.stats()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Measure API cold start against a time budget.
+
+Each run starts a fresh interpreter with `-X importtime`, imports
+`backend.main` and then runs the startup warm-up tasks, so the numbers
+include nothing cached in-process. Reported:
+  - import time of `backend.main` (what delays the first /health answer)
+  - time until warm-up completes (what delays /ready)
+  - the slowest modules by self import time, to show where to cut
+  - heavy modules (numpy) that importing `backend.main` loaded, which
+    should only load on first use or during warm-up
+
+The exit status is 1 if the median import time exceeds --budget-ms or a
+heavy module was imported, so the benchmark can gate CI.
+
+Usage:
+    python -m benchmarks.startup --runs 5 --budget-ms 1000
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# Modules too heavy to load when the app is imported
+DEFERRED_MODULES = ["numpy"]
+
+CHILD_SCRIPT = """
+import asyncio, json, sys, time
+start = time.perf_counter()
+import backend.main as main
+imported = time.perf_counter()
+loaded = [module for module in %r if module in sys.modules]
+asyncio.run(main.warmup_registry.run())
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "loaded_at_import": loaded,
+    "warmup_ms": (time.perf_counter() - imported) * 1000,
+    "warmup": main.warmup_registry.status(),
+}))
+""" % DEFERRED_MODULES
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """Parse `-X importtime` output into (module, self_us, cumulative_us) rows."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        rows.append((module.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def run_once() -> Tuple[Dict, List[Tuple[str, int, int]]]:
+    env = dict(os.environ)
+    env.setdefault("JOB_WORKER_MODE", "external")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.getcwd(), env.get("PYTHONPATH")]))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD_SCRIPT],
+        capture_output=True, text=True, env=env, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1]), parse_importtime(result.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("STARTUP_BUDGET_MS", "1000")))
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest modules to list")
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    import_ms = statistics.median(run["import_ms"] for run, _ in runs)
+    warmup_ms = statistics.median(run["warmup_ms"] for run, _ in runs)
+
+    # Slowest modules by self time, taking the median over runs
+    self_times: Dict[str, List[int]] = {}
+    for _, rows in runs:
+        for module, self_us, _ in rows:
+            self_times.setdefault(module, []).append(self_us)
+    slowest = sorted(
+        ((module, statistics.median(times) / 1000) for module, times in self_times.items()),
+        key=lambda item: item[1], reverse=True,
+    )[:args.top]
+
+    report = {
+        "runs": args.runs,
+        "import_ms": round(import_ms, 1),
+        "warmup_ms": round(warmup_ms, 1),
+        "ready_ms": round(import_ms + warmup_ms, 1),
+        "budget_ms": args.budget_ms,
+        "warmup_tasks": runs[-1][0]["warmup"],
+        "slowest_modules_ms": {module: round(ms, 1) for module, ms in slowest},
+        "loaded_at_import": sorted({module for run, _ in runs for module in run["loaded_at_import"]}),
+    }
+    print(json.dumps(report, indent=2))
+
+    failed = False
+    if import_ms > args.budget_ms:
+        print(f"Import time {import_ms:.0f}ms exceeds the budget of {args.budget_ms:.0f}ms", file=sys.stderr)
+        failed = True
+    if report["loaded_at_import"]:
+        print(f"Importing backend.main loaded {', '.join(report['loaded_at_import'])}", file=sys.stderr)
+        failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
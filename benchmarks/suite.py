@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the embedding service and the API.
+
+Measures:
+  - `_split_text` throughput
+  - `process_document` ingest rate
+  - `search` latency percentiles at several index sizes, with and without filters
+    (source type, time range), with time decay and source weights, and the
+    latency MMR plus a per-document cap add per query
+  - `get_stats` latency at each index size
+  - `/chat/` and `/actions/` requests per second through an in-process ASGI client
+
+Results are written as JSON. Pass a previous result file with --compare to
+flag metrics that regressed by more than --threshold; the exit status is 1
+if any did, so the suite can gate CI.
+
+Usage:
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --output new.json --compare results.json --threshold 0.1
+    python -m benchmarks.suite --only split_text search --search-sizes 10000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import string
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Dict, Any, List
+
+# The API benchmarks measure handler cost, not the limiter or background workers
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("JOB_WORKER_MODE", "external")
+
+import numpy as np
+
+from backend.embedding.service import EmbeddingService
+
+SOURCE_TYPES = ["gmail", "slack", "google_drive", "notion", "jira"]
+
+
+def metric(value: float, unit: str, higher_is_better: bool) -> Dict[str, Any]:
+    return {"value": round(value, 4), "unit": unit, "higher_is_better": higher_is_better}
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    samples = sorted(samples)
+    def pick(q):
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+    return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99)}
+
+
+def random_text(size: int) -> str:
+    words = []
+    length = 0
+    while length < size:
+        word = "".join(random.choices(string.ascii_lowercase, k=random.randint(2, 10)))
+        # Sentences and paragraphs give the splitter natural break points
+        roll = random.random()
+        if roll < 0.08:
+            word += "."
+        elif roll < 0.1:
+            word += ".\n"
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)[:size]
+
+
+def bench_split_text(args) -> Dict[str, Any]:
+    service = EmbeddingService()
+    text = random_text(args.split_text_bytes)
+    runs = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        chunks = service._split_text(text, 1000, 200)
+        runs.append(time.perf_counter() - start)
+    seconds = statistics.median(runs)
+    return {
+        "split_text.mb_per_sec": metric(len(text) / seconds / 1e6, "MB/s", True),
+        "split_text.chunks_per_sec": metric(len(chunks) / seconds, "chunks/s", True),
+    }
+
+
+def bench_process_document(args) -> Dict[str, Any]:
+    service = EmbeddingService()
+    documents = [random_text(args.document_bytes) for _ in range(args.documents)]
+
+    async def ingest():
+        chunks = 0
+        for i, document in enumerate(documents):
+            chunk_ids = await service.process_document(document, {"source_type": SOURCE_TYPES[i % len(SOURCE_TYPES)]})
+            chunks += len(chunk_ids)
+        return chunks
+
+    start = time.perf_counter()
+    chunks = asyncio.run(ingest())
+    seconds = time.perf_counter() - start
+    return {
+        "process_document.docs_per_sec": metric(len(documents) / seconds, "docs/s", True),
+        "process_document.chunks_per_sec": metric(chunks / seconds, "chunks/s", True),
+    }
+
+
+def populate(service: EmbeddingService, size: int, dimensions: int = 128):
+    """Fill the service with random unit vectors in bulk, skipping per-chunk embedding."""
+    vectors = np.random.default_rng(0).standard_normal((size, dimensions)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    chunk_ids = [f"doc{i // 10}-{i % 10}" for i in range(size)]
+    now = time.time()
+    service.add_embeddings(chunk_ids, vectors, [
+        {
+            "document_id": f"doc{i // 10}",
+            "chunk_index": i % 10,
+            "source_type": SOURCE_TYPES[i % len(SOURCE_TYPES)],
+            # Spread over the last 90 days
+            "created_at": now - (i * 7919 % 90) * 86400,
+        }
+        for i in range(size)
+    ], [f"chunk {i}" for i in range(size)])
+
+
+def bench_search(args) -> Dict[str, Any]:
+    results = {}
+    for size in args.search_sizes:
+        service = EmbeddingService()
+        populate(service, size)
+        queries = args.queries or (50 if size <= 10_000 else 10 if size <= 100_000 else 3)
+        configurations = (
+            ("unfiltered", {}),
+            ("filtered", {"filter_criteria": {"source_type": ["gmail"]}}),
+            ("diverse", {"mmr_lambda": 0.5, "max_per_document": 2}),
+            ("last_week", {"filter_criteria": {"timestamp": {"gte": time.time() - 7 * 86400}}}),
+            ("weighted", {"time_decay": 14 * 86400, "source_weights": {"slack": 0.8, "gmail": 1.2}}),
+        )
+        for label, options in configurations:
+            samples = []
+            for q in range(queries):
+                start = time.perf_counter()
+                asyncio.run(service.search(f"query {q}", top_k=5, **options))
+                samples.append((time.perf_counter() - start) * 1000)
+            for name, value in percentiles(samples).items():
+                results[f"search.{size}.{label}.{name}_ms"] = metric(value, "ms", False)
+        added = results[f"search.{size}.diverse.p50_ms"]["value"] - results[f"search.{size}.unfiltered.p50_ms"]["value"]
+        results[f"search.{size}.diverse.added_p50_ms"] = metric(added, "ms", False)
+        start = time.perf_counter()
+        for _ in range(100):
+            service.get_stats()
+        results[f"stats.{size}.get_stats_us"] = metric((time.perf_counter() - start) * 1e4, "us", False)
+        print(f"search at {size} chunks done", file=sys.stderr)
+        del service
+    return results
+
+
+async def measure_rps(client, method: str, url: str, headers, requests: int, concurrency: int, **kwargs) -> float:
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            response = await client.request(method, url, headers=headers, **kwargs)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return requests / (time.perf_counter() - start)
+
+
+def bench_api(args) -> Dict[str, Any]:
+    import httpx
+    from backend.main import app
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await client.post("/auth/token", data={"username": "user@example.com", "password": "password"})
+            headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+            for i in range(args.seed_actions):
+                await client.post("/actions/", headers=headers, json={
+                    "type": "task", "title": f"Task {i}", "parameters": {"title": f"Task {i}"}
+                })
+
+            results = {}
+            for name, method, url, kwargs in (
+                ("chat", "POST", "/chat/", {"json": {"message": "Email bob@example.com about the launch tomorrow at 2pm"}}),
+                ("actions", "GET", "/actions/", {"params": {"status": "pending", "limit": 50}}),
+            ):
+                await measure_rps(client, method, url, headers, 50, args.concurrency, **kwargs)
+                rps = await measure_rps(client, method, url, headers, args.api_requests, args.concurrency, **kwargs)
+                results[f"api.{name}.rps"] = metric(rps, "req/s", True)
+            return results
+
+    return asyncio.run(run())
+
+
+BENCHMARKS = {
+    "split_text": bench_split_text,
+    "process_document": bench_process_document,
+    "search": bench_search,
+    "api": bench_api,
+}
+
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except Exception:
+        commit = None
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Print a comparison table and return the names of regressed metrics."""
+    regressions = []
+    print(f"{'metric':<45} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name, result in sorted(current.items()):
+        previous = baseline.get(name)
+        if previous is None or not previous["value"]:
+            print(f"{name:<45} {'-':>12} {result['value']:>12.4g}")
+            continue
+        change = (result["value"] - previous["value"]) / previous["value"]
+        worse = -change if result["higher_is_better"] else change
+        flag = ""
+        if worse > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<45} {previous['value']:>12.4g} {result['value']:>12.4g} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="Run only these benchmarks")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative change counted as a regression")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--split-text-bytes", type=int, default=5_000_000)
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--document-bytes", type=int, default=20_000)
+    parser.add_argument("--search-sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, help="Queries per search configuration (default scales with size)")
+    parser.add_argument("--seed-actions", type=int, default=1000)
+    parser.add_argument("--api-requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    random.seed(0)
+    results: Dict[str, Any] = {}
+    for name in args.only or BENCHMARKS:
+        start = time.perf_counter()
+        results.update(BENCHMARKS[name](args))
+        print(f"{name} finished in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+    report = {"environment": environment(), "results": results}
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} metric(s) regressed by more than {args.threshold:.0%}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark durable ingest into the embedding service.
+
+Ingests the same documents through `process_document` into an in-memory
+index and into durable indexes (`EmbeddingService.open`) under each
+write-ahead log fsync policy, with several concurrent writers so group
+commit has something to group. Reports documents and chunks per second,
+fsyncs per document, and how long reopening the index takes with the
+whole log to replay versus after a snapshot.
+
+Usage:
+    python -m benchmarks.wal --documents 2000 --concurrency 16
+    python -m benchmarks.wal --policies group none --dir /mnt/ssd/wal-bench
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import shutil
+import string
+import tempfile
+import time
+from typing import Dict, Any, List
+
+from backend.embedding.service import EmbeddingService
+from backend.embedding.wal import FSYNC_POLICIES, WAL_FSYNCS
+
+
+def random_text(rng: random.Random, size: int) -> str:
+    words = []
+    length = 0
+    while length < size:
+        word = "".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 10)))
+        words.append(word + ("." if rng.random() < 0.08 else ""))
+        length += len(word) + 1
+    return " ".join(words)[:size]
+
+
+async def ingest(service: EmbeddingService, documents: List[str], concurrency: int) -> int:
+    remaining = iter(enumerate(documents))
+    chunks = 0
+
+    async def writer():
+        nonlocal chunks
+        for i, document in remaining:
+            chunk_ids = await service.process_document(document, {"source_type": "bench", "user_id": f"u{i % 10}"})
+            chunks += len(chunk_ids)
+
+    await asyncio.gather(*(writer() for _ in range(concurrency)))
+    return chunks
+
+
+def bench_policy(policy: str, documents: List[str], args, directory: str) -> Dict[str, Any]:
+    data_dir = tempfile.mkdtemp(prefix=f"wal-{policy}-", dir=directory)
+    try:
+        if policy == "memory":
+            service = EmbeddingService()
+        else:
+            service = EmbeddingService.open(
+                data_dir, fsync=policy, group_commit_interval=args.group_commit_ms / 1000
+            )
+        fsyncs = WAL_FSYNCS.get()
+        start = time.perf_counter()
+        chunks = asyncio.run(ingest(service, documents, args.concurrency))
+        seconds = time.perf_counter() - start
+        result = {
+            "docs_per_sec": round(len(documents) / seconds, 1),
+            "chunks_per_sec": round(chunks / seconds, 1),
+            "fsyncs_per_doc": round((WAL_FSYNCS.get() - fsyncs) / len(documents), 3),
+        }
+        if policy == "memory":
+            return result
+
+        result["wal_mb"] = round(service.wal_size() / 1e6, 2)
+        service.close()
+        start = time.perf_counter()
+        service = EmbeddingService.open(data_dir, fsync=policy)
+        result["reopen_replay_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        start = time.perf_counter()
+        service.snapshot()
+        result["snapshot_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        service.close()
+        start = time.perf_counter()
+        service = EmbeddingService.open(data_dir, fsync=policy)
+        result["reopen_snapshot_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        assert service.get_stats()["chunk_count"] == chunks
+        service.close()
+        return result
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--document-bytes", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--group-commit-ms", type=float, default=0)
+    parser.add_argument("--policies", nargs="+", default=["memory", *FSYNC_POLICIES],
+                        choices=["memory", *FSYNC_POLICIES])
+    parser.add_argument("--dir", default=None, help="Directory to create the indexes in (default: system temp)")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    documents = [random_text(rng, args.document_bytes) for _ in range(args.documents)]
+    results = {policy: bench_policy(policy, documents, args, args.dir) for policy in args.policies}
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -30,9 +30,12 @@ import {
 } from '@mui/icons-material';
 import axios from 'axios';
 import { format } from 'date-fns';
+import { eventsAPI } from '../services/api';
 
 export default function Actions() {
   const [actions, setActions] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const [tabValue, setTabValue] = useState('pending');
@@ -44,14 +47,35 @@ export default function Actions() {
     fetchActions(tabValue);
   }, [tabValue]);
   
+  // Apply pushed action updates instead of re-fetching
+  useEffect(() => {
+    return eventsAPI.subscribe((event) => {
+      if (event.type !== 'action.created' && event.type !== 'action.updated') return;
+      const updated = event.data.action;
+      const matchesTab = !tabValue || updated.status === tabValue;
+      
+      setActions((prev) => {
+        const exists = prev.some((action) => action.id === updated.id);
+        if (!matchesTab) {
+          return prev.filter((action) => action.id !== updated.id);
+        }
+        if (exists) {
+          return prev.map((action) => (action.id === updated.id ? updated : action));
+        }
+        return [updated, ...prev];
+      });
+    });
+  }, [tabValue]);
+  
   // Fetch actions from API
   const fetchActions = async (status) => {
     try {
       setLoading(true);
       setError(null);
       
-      const response = await axios.get(`/actions${status ? `?status=${status}` : ''}`);
+      const response = await axios.get('/actions', { params: status ? { status } : {} });
       setActions(response.data.actions);
+      setNextCursor(response.data.next_cursor);
     } catch (error) {
       console.error('Error fetching actions:', error);
       setError('Failed to load actions. Please try again.');
@@ -60,6 +84,24 @@ export default function Actions() {
     }
   };
   
+  // Fetch the next page of actions
+  const fetchMoreActions = async () => {
+    try {
+      setLoadingMore(true);
+      
+      const params = { cursor: nextCursor };
+      if (tabValue) params.status = tabValue;
+      const response = await axios.get('/actions', { params });
+      setActions((prev) => [...prev, ...response.data.actions]);
+      setNextCursor(response.data.next_cursor);
+    } catch (error) {
+      console.error('Error fetching actions:', error);
+      setError('Failed to load actions. Please try again.');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+  
   // Handle tab change
   const handleTabChange = (event, newValue) => {
     setTabValue(newValue);
@@ -305,6 +347,14 @@ export default function Actions() {
         </Grid>
       )}
       
+      {!loading && nextCursor && (
+        <Box sx={{ display: 'flex', justifyContent: 'center', mt: 3 }}>
+          <Button variant="outlined" onClick={fetchMoreActions} disabled={loadingMore}>
+            {loadingMore ? <CircularProgress size={20} /> : 'Load more'}
+          </Button>
+        </Box>
+      )}
+      
       {/* Action details dialog */}
       <Dialog open={openDialog} onClose={handleCloseDialog} maxWidth="sm" fullWidth>
         {selectedAction && (
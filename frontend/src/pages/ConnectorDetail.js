@@ -45,6 +45,7 @@ import {
 } from '@mui/icons-material';
 import axios from 'axios';
 import { format } from 'date-fns';
+import { eventsAPI } from '../services/api';
 
 export default function ConnectorDetail() {
   const { connectorId } = useParams();
@@ -65,6 +66,18 @@ export default function ConnectorDetail() {
     fetchConnectorDetails();
   }, [connectorId]);
   
+  // Refresh when a sync of this connector finishes
+  useEffect(() => {
+    return eventsAPI.subscribe((event) => {
+      if (
+        (event.type === 'sync.completed' || event.type === 'sync.failed') &&
+        event.data.connector_id === connectorId
+      ) {
+        fetchConnectorDetails();
+      }
+    });
+  }, [connectorId]);
+  
   // Fetch connector details from API
   const fetchConnectorDetails = async () => {
     try {
@@ -151,12 +164,9 @@ export default function ConnectorDetail() {
       // In a real implementation, you would call an API to sync the connector
       await axios.post(`/connectors/${connectorId}/sync`);
       
+      // Details are refreshed when the sync.completed event arrives
       alert('Sync started. This may take a few minutes.');
-      
-      // Refresh connector details after a short delay
-      setTimeout(() => {
-        fetchConnectorDetails();
-      }, 2000);
+      setLoading(false);
     } catch (error) {
       console.error('Error syncing connector:', error);
       alert('Failed to sync connector. Please try again.');
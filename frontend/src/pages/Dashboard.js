@@ -45,6 +45,7 @@ export default function Dashboard() {
     conversations: [],
     connectors: [],
     actions: [],
+    pendingActionCount: 0,
     sources: {},
   });
   
@@ -61,16 +62,18 @@ export default function Dashboard() {
       
       // In a real implementation, you would have a dedicated endpoint for dashboard stats
       // For this demo, we'll make separate requests and combine the data
-      const [conversationsRes, connectorsRes, actionsRes] = await Promise.all([
+      const [conversationsRes, connectorsRes, actionsRes, actionCountsRes] = await Promise.all([
         axios.get('/chat/conversations'),
         axios.get('/connectors'),
-        axios.get('/actions'),
+        axios.get('/actions', { params: { status: 'pending', limit: 5 } }),
+        axios.get('/actions/counts'),
       ]);
       
       setStats({
         conversations: conversationsRes.data.conversations.slice(0, 5),
         connectors: connectorsRes.data.connectors,
-        actions: actionsRes.data.actions.filter(a => a.status === 'pending'),
+        actions: actionsRes.data.actions,
+        pendingActionCount: actionCountsRes.data.counts.pending || 0,
         sources: countSourceTypes(connectorsRes.data.connectors),
       });
     } catch (error) {
@@ -229,7 +232,7 @@ export default function Dashboard() {
           >
             <ActionsIcon sx={{ fontSize: 48, mb: 1 }} />
             <Typography variant="h4" component="div">
-              {stats.actions.length}
+              {stats.pendingActionCount}
             </Typography>
             <Typography variant="body2">Pending Actions</Typography>
           </Paper>
@@ -109,11 +109,17 @@ export const chatAPI = {
 
 // Actions API
 export const actionsAPI = {
-  getActions: (status = null) => {
-    const params = status ? { status } : {};
+  getActions: (status = null, cursor = null, limit = 50) => {
+    const params = { limit };
+    if (status) params.status = status;
+    if (cursor) params.cursor = cursor;
     return api.get('/actions', { params });
   },
   
+  getActionCounts: () => {
+    return api.get('/actions/counts');
+  },
+  
   getAction: (id) => {
     return api.get(`/actions/${id}`);
   },
@@ -131,4 +137,47 @@ export const actionsAPI = {
   },
 };
 
+// Events API
+export const eventsAPI = {
+  // Open the per-user event channel; returns a function that closes it.
+  // Reconnects with backoff so status updates keep arriving without polling.
+  subscribe: (onEvent) => {
+    const baseURL = api.defaults.baseURL.replace(/^http/, 'ws');
+    let socket = null;
+    let retryDelay = 1000;
+    let retryTimer = null;
+    let closed = false;
+    
+    const connect = () => {
+      const token = localStorage.getItem('token');
+      if (!token || closed) return;
+      
+      socket = new WebSocket(`${baseURL}/events/ws?token=${encodeURIComponent(token)}`);
+      socket.onopen = () => {
+        retryDelay = 1000;
+      };
+      socket.onmessage = (message) => {
+        const event = JSON.parse(message.data);
+        if (event.type !== 'ping') {
+          onEvent(event);
+        }
+      };
+      socket.onclose = () => {
+        if (!closed) {
+          retryTimer = setTimeout(connect, retryDelay);
+          retryDelay = Math.min(retryDelay * 2, 30000);
+        }
+      };
+    };
+    
+    connect();
+    
+    return () => {
+      closed = true;
+      clearTimeout(retryTimer);
+      if (socket) socket.close();
+    };
+  },
+};
+
 export default api;
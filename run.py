@@ -10,6 +10,16 @@ if __name__ == "__main__":
     host = os.getenv("API_HOST", "0.0.0.0")
     port = int(os.getenv("API_PORT", "8000"))
     reload = os.getenv("DEBUG", "false").lower() == "true"
+    workers = int(os.getenv("WORKERS", "1"))
+    
+    if workers > 1:
+        # Worker processes share no memory, so state must live where all of them can see it;
+        # a process-local backend (even one set in .env) would split users, buckets and events per worker
+        for name in ("STATE_BACKEND", "EVENT_BACKEND", "RATE_LIMIT_BACKEND"):
+            if os.environ.get(name, "sqlite") != "sqlite":
+                print(f"WORKERS={workers}: overriding {name}={os.environ[name]} with the shared sqlite backend")
+            os.environ[name] = "sqlite"
+        reload = False
     
     # Start the FastAPI server
     uvicorn.run(
@@ -17,6 +27,7 @@ if __name__ == "__main__":
         host=host,
         port=port,
         reload=reload,
+        workers=workers,
         log_level=os.getenv("LOG_LEVEL", "info").lower()
     )
     
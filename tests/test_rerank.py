@@ -0,0 +1,20 @@
+import numpy as np
+
+from backend.embedding.rerank import BaseReranker, RerankingStage, content_hash
+
+
+class FixedReranker(BaseReranker):
+    def score_batch(self, query, texts):
+        return np.full(len(texts), 0.5, dtype=np.float32)
+
+
+def test_deadline_keeps_unscored_candidates_in_place():
+    stage = RerankingStage(FixedReranker(), weight=1.0, batch_size=2, deadline=0.0)
+    results = [{"content": f"chunk {i}", "score": 0.9 - i / 10} for i in range(4)]
+    # chunk 3 has a cached score; the deadline leaves the rest unscored
+    stage.cache.set((content_hash("query"), content_hash("chunk 3")), 0.5)
+
+    ranked = stage.rerank("query", results)
+
+    assert [result["content"] for result in ranked] == ["chunk 0", "chunk 1", "chunk 2", "chunk 3"]
+    assert "rerank_score" in ranked[3] and "rerank_score" not in ranked[0]
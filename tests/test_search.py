@@ -0,0 +1,24 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.embedding.node import create_node_app
+from backend.embedding.service import EmbeddingService
+
+
+def test_search_rejects_max_per_document_below_one():
+    service = EmbeddingService()
+
+    with pytest.raises(ValueError):
+        asyncio.run(service.search("quarterly report", max_per_document=0))
+    with pytest.raises(ValueError):
+        asyncio.run(service.search("quarterly report", mmr_lambda=0.5, max_per_document=0))
+
+
+def test_node_rejects_max_per_document_below_one():
+    client = TestClient(create_node_app(EmbeddingService()))
+
+    response = client.post("/search", json={"query": "quarterly report", "max_per_document": 0})
+
+    assert response.status_code == 422
@@ -0,0 +1,30 @@
+import pytest
+
+from backend.utils.state import MemoryCollection, SQLiteCollection
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def collection(request, tmp_path):
+    if request.param == "memory":
+        return MemoryCollection("records", owner_field="user_id")
+    return SQLiteCollection(str(tmp_path / "state.db"), "records", owner_field="user_id")
+
+
+def test_for_owner_keeps_creation_order_when_records_are_saved_again(collection):
+    for key in ("a", "b", "c"):
+        collection[key] = {"id": key, "user_id": "alice", "status": "pending"}
+
+    record = collection["a"]
+    record["status"] = "connected"
+    collection["a"] = record
+
+    assert [record["id"] for record in collection.for_owner("alice")] == ["a", "b", "c"]
+    assert collection.for_owner("alice")[0]["status"] == "connected"
+
+
+def test_for_owner_follows_owner_changes(collection):
+    collection["a"] = {"id": "a", "user_id": "alice"}
+    collection["a"] = {"id": "a", "user_id": "bob"}
+
+    assert collection.for_owner("alice") == []
+    assert [record["id"] for record in collection.for_owner("bob")] == ["a"]